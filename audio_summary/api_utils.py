@@ -49,7 +49,7 @@ def get_gemini_default_config()->dict[str, float]:
         "temperature": 0.9,
         "top_p": 0.95,
         "top_k": 32,
-        "max_output_tokens": 1024,
+        "max_output_tokens": 4096,
     }
 
 def get_gemini_default_safety_setting()->list[dict[str, str]]:
@@ -98,5 +98,5 @@ def get_openai_default_config() -> dict:
     return {
         "model": "gpt-4.1-mini",
         "temperature": 0.7,
-        "max_tokens": 1024,
+        "max_tokens": 4096,
     }
@@ -6,19 +6,37 @@ from string import Template
 import math
 import textwrap
 import shutil
-from typing import Literal
+import subprocess
+import threading
+import weakref
+import contextlib
+from dataclasses import dataclass
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, AsyncIterable, AsyncIterator, Callable, Iterable, Literal
 import asyncio
+import typing_extensions
 
-import librosa
-from openai import AsyncOpenAI
-from openai.types.audio import Transcription
-import google.generativeai as genai
-
-from audio_summary.exceptions import GeminiSummarizedFailed, OpenaiApiKeyNotFound
+from audio_summary.exceptions import GeminiSummarizedFailed, OpenaiApiKeyNotFound, TranscriptionFailed
 from audio_summary.api_utils import *
+from audio_summary.probe import get_duration, probe
+from audio_summary.silence import DEFAULT_TOLERANCE, detect_cuts
+from audio_summary.transcode import (
+    COPY, WHISPER_CONTENT_LIMIT_IN_BYTES, ChunkFormat, ChunkPlan, ashrink_bytes, ashrink_chunk, pipe_format, plan_chunks,
+)
+from audio_summary.cache import TranscriptCache
+from audio_summary.checkpoint import FAILED, JobCheckpoint
+from audio_summary.summarizer import asummarize_transcript, split_text_chunks
+from audio_summary.transcriber import TranscriptionBackend, WhisperDispatcher, get_dispatcher, make_dispatcher
+from audio_summary.local_whisper import get_local_backend
+from audio_summary.workspace import in_workspace, scratch_dir, sweep_orphans
 import audio_summary.prompts.lang as lang
 
-__WHISPER_CONTENT_LIMIT_IN_BYTES:int = 26214400
+if TYPE_CHECKING:
+    # The SDKs are imported by the providers that use them, so a run only pays for the one it selects.
+    import openai
+    import google.generativeai as genai
+
+__WHISPER_CONTENT_LIMIT_IN_BYTES:int = WHISPER_CONTENT_LIMIT_IN_BYTES
 
 lang_map:dict[str, str] = {
     "original": lang.ORIGINAL,
@@ -26,26 +44,103 @@ lang_map:dict[str, str] = {
     "en": lang.EN,
 }
 
-def convert_mov_to_mp4(input_file: str, output_file: str) -> str:
+def convert_mov_to_mp4(input_file: str, output_file: str | None = None) -> str:
     """
     Convert a .mov file to .mp4 format using ffmpeg.
 
     Args:
         input_file (str): Path to the input .mov file.
-        output_file (str): Path to the output .mp4 file.
+        output_file (str | None, optional): Path to the output .mp4 file. Defaults to a file in a
+            scratch directory of the running job, removed with its workspace.
+
+    Raises:
+        RuntimeError: Raised if ffmpeg exits with a non-zero status.
 
     Returns:
         str: Path to the converted .mp4 file.
     """
-    ffmpeg_exec = "ffmpeg"
-    cmd = f"{ffmpeg_exec} -i \"{input_file}\" -c:v copy -c:a copy \"{output_file}\""
-    res = os.popen(cmd)
-    print(res.read())
-    res.close()
+    if output_file is None:
+        b_fn = os.path.splitext(os.path.basename(input_file))[0]
+        output_file = os.path.join(scratch_dir("video"), f"{b_fn}.mp4")
+    cmd = [
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-nostdin", "-y",
+        "-i", input_file, "-c:v", "copy", "-c:a", "copy", output_file,
+    ]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(output_file)
+        raise RuntimeError(f"ffmpeg exited with status {proc.returncode}: {proc.stderr.strip()}")
     return output_file
 
+def _split_audio_segment(
+    fn: str,
+    duration: float,
+    output_dir: str,
+    segment_times: list[float] | None = None,
+    fmt: ChunkFormat = COPY,
+) -> list[str]:
+    """
+    Split an audio file with a single ffmpeg invocation using the segment muxer.
+
+    Args:
+        fn (str): Path to the input audio file.
+        duration (float): Duration of each segment in seconds.
+        output_dir (str): Output directory to save the segmented audio files.
+        segment_times (list[float] | None, optional): Explicit cut times in seconds, used instead
+            of fixed `duration` cuts. Defaults to None.
+        fmt (ChunkFormat, optional): Encoding of the chunks. Defaults to a stream copy.
+
+    Raises:
+        RuntimeError: Raised if ffmpeg exits with a non-zero status or writes no segment.
+
+    Returns:
+        list[str]: Ordered list of paths to the segmented audio files.
+    """
+    b_fn, ext = os.path.splitext(os.path.basename(fn))
+    ext = fmt.ext or ext
+    pattern = os.path.join(output_dir, f"{b_fn.replace('%', '%%')}_%d{ext}")
+    segment_list = os.path.join(output_dir, f".{b_fn}_segments.txt")
+    if segment_times:
+        split_opts = ["-segment_times", ",".join(f"{t:.3f}" for t in segment_times)]
+    else:
+        split_opts = ["-segment_time", str(duration)]
+    cmd = [
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+        "-i", fn,
+        "-vn", *fmt.args,
+        "-f", "segment",
+        *split_opts,
+        "-segment_start_number", "1",
+        "-reset_timestamps", "1",
+        "-segment_list", segment_list,
+        "-segment_list_type", "flat",
+        pattern,
+    ]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg exited with status {proc.returncode}: {proc.stderr.strip()}")
+
+    with open(segment_list, "r") as f:
+        results = [
+            os.path.join(output_dir, os.path.basename(line.strip()))
+            for line in f if line.strip()
+        ]
+    os.remove(segment_list)
+
+    if not results:
+        raise RuntimeError(f"ffmpeg wrote no segment for \"{fn}\".")
+    return results
+
+
 def split_audio(
-    fn: str, duration: float = 600, output_dir: str = "./.tmp_audio"
+    fn: str,
+    duration: float = 600,
+    output_dir: str | None = None,
+    mode: Literal["segment", "silence", "loop"] = "segment",
+    tolerance: float = DEFAULT_TOLERANCE,
+    fmt: ChunkFormat = COPY,
+    segment_times: list[float] | None = None,
 ) -> list[str]:
     """
     Split an audio file into segments.
@@ -53,7 +148,15 @@ def split_audio(
     Args:
         fn (str): Path to the input audio file.
         duration (float, optional): Duration of each segment in seconds. Defaults to 600.
-        output_dir (str, optional): Output directory to save the segmented audio files. Defaults to "./.tmp_audio".
+        output_dir (str | None, optional): Output directory to save the segmented audio files. Defaults to a
+            scratch directory of the running job (see `audio_summary.workspace`).
+        mode (Literal["segment", "silence", "loop"], optional): "segment" cuts every chunk in one ffmpeg run with
+            the segment muxer; "silence" does the same but moves each cut to the nearest pause;
+            "loop" spawns one ffmpeg per chunk. Defaults to "segment".
+        tolerance (float, optional): Largest shift of a cut in seconds in "silence" mode. Defaults to 30.
+        fmt (ChunkFormat, optional): Encoding of the chunks, e.g. from `plan_chunks`. Defaults to a stream copy.
+        segment_times (list[float] | None, optional): Cut times already found by `detect_cuts`, so
+            "silence" mode does not analyse the audio again. Defaults to None.
 
     Raises:
         RuntimeError: Raised if ffmpeg execution fails.
@@ -62,19 +165,33 @@ def split_audio(
         list[str]: List of paths to the segmented audio files.
     """
     duration = float(duration)
+    output_dir = output_dir or scratch_dir("chunks")
+    if mode == "segment":
+        os.makedirs(output_dir, exist_ok=True)
+        return _split_audio_segment(fn, duration, output_dir, fmt=fmt)
+    elif mode == "silence":
+        os.makedirs(output_dir, exist_ok=True)
+        cuts = segment_times if segment_times is not None else detect_cuts(fn, duration, tolerance)
+        if not cuts:
+            # Shorter than one chunk plus the tolerance: keep it whole.
+            return _split_audio_segment(fn, duration + tolerance, output_dir, fmt=fmt)
+        return _split_audio_segment(fn, duration, output_dir, segment_times=cuts, fmt=fmt)
+    elif mode != "loop":
+        raise ValueError(f"Unsupported split mode: {mode}")
+
     ffmpeg_exec = "ffmpeg"
     cmd = Template(
         (
             f"{ffmpeg_exec} "
             f"-i \"{fn}\" "
-            f"-vn -acodec copy "
+            f"-vn {' '.join(fmt.args)} "
             f"-ss $start_time "
             f"-t {duration} "
             f"\"$output\" "
         )
     )
 
-    total_len: float = librosa.get_duration(path=fn)
+    total_len: float = get_duration(fn)
     results = []
 
     if not os.path.exists(output_dir):
@@ -85,7 +202,7 @@ def split_audio(
 
     for i in range(math.ceil(total_len / duration)):
         b_fn, ext = os.path.splitext(os.path.basename(fn))
-        o_fn = f"{b_fn}_{i+1}{ext}"
+        o_fn = f"{b_fn}_{i+1}{fmt.ext or ext}"
         full_o_fn = os.path.join(output_dir, o_fn)
         start_time = i * duration
         exec = cmd.substitute(
@@ -105,128 +222,713 @@ def split_audio(
         raise RuntimeError("ffmpeg may not executed successfully.")
 
 
+async def _aextract_chunk(fn: str, start_time: float, duration: float, output: str, fmt: ChunkFormat = COPY) -> str:
+    """
+    Asynchronously cut one chunk out of an audio file with an ffmpeg subprocess.
+
+    Args:
+        fn (str): Path to the input audio file.
+        start_time (float): Offset of the chunk in seconds.
+        duration (float): Duration of the chunk in seconds.
+        output (str): Path of the chunk to write.
+        fmt (ChunkFormat, optional): Encoding of the chunk. Defaults to a stream copy.
+
+    Raises:
+        RuntimeError: Raised if ffmpeg exits with a non-zero status.
+
+    Returns:
+        str: Path to the written chunk.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+        "-ss", str(start_time),
+        "-i", fn,
+        "-vn", *fmt.args,
+        "-t", str(duration),
+        output,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg exited with status {proc.returncode}: {stderr.decode(errors='replace').strip()}")
+    return output
+
+
+@dataclass(frozen=True)
+class MemoryChunk:
+    """
+    Encoded audio chunk held in memory instead of on disk.
+
+    Attributes:
+        name (str): File name of the chunk; its extension tells Whisper the format.
+        data (bytes): Encoded chunk.
+        duration (float): Duration in seconds.
+    """
+    name: str
+    data: bytes
+    duration: float
+
+    def __str__(self) -> str:
+        return self.name
+
+
+async def _aextract_chunk_bytes(fn: str, start_time: float, duration: float, fmt: ChunkFormat) -> bytes:
+    """
+    Asynchronously cut one chunk out of an audio file and read it from the ffmpeg stdout pipe.
+
+    Args:
+        fn (str): Path to the input audio file.
+        start_time (float): Offset of the chunk in seconds.
+        duration (float): Duration of the chunk in seconds.
+        fmt (ChunkFormat): Encoding of the chunk; must have a pipe muxer.
+
+    Raises:
+        RuntimeError: Raised if ffmpeg exits with a non-zero status.
+
+    Returns:
+        bytes: Encoded chunk.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-hide_banner", "-loglevel", "error",
+        "-ss", str(start_time),
+        "-i", fn,
+        "-vn", *fmt.args,
+        "-t", str(duration),
+        "-f", fmt.muxer, "pipe:1",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    data, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg exited with status {proc.returncode}: {stderr.decode(errors='replace').strip()}")
+    return data
+
+
+async def asplit_audio(
+    fn: str,
+    duration: float = 600,
+    output_dir: str | None = None,
+    workers: int | None = None,
+    fmt: ChunkFormat = COPY,
+    segment_times: list[float] | None = None,
+    in_memory: bool = False,
+    indices: Iterable[int] | None = None,
+    limiter: asyncio.Semaphore | None = None,
+) -> AsyncIterator[tuple[int, str | MemoryChunk]]:
+    """
+    Split an audio file with parallel ffmpeg subprocesses, yielding chunks as they are cut.
+
+    Args:
+        fn (str): Path to the input audio file.
+        duration (float, optional): Duration of each segment in seconds. Defaults to 600.
+        output_dir (str | None, optional): Output directory to save the segmented audio files. Defaults to a
+            scratch directory of the running job (see `audio_summary.workspace`).
+        workers (int | None, optional): Maximum number of concurrent ffmpeg processes. Defaults to the CPU count.
+        fmt (ChunkFormat, optional): Encoding of the chunks. Defaults to a stream copy.
+        segment_times (list[float] | None, optional): Explicit cut times in seconds, e.g. from
+            `detect_cuts`, used instead of fixed `duration` cuts. Defaults to None.
+        in_memory (bool, optional): Read each chunk from the ffmpeg stdout pipe into a `MemoryChunk`
+            instead of writing it to `output_dir`. Defaults to False.
+        indices (Iterable[int] | None, optional): Only cut the chunks of these orders, e.g. the ones a
+            resumed job is still missing. Defaults to every chunk.
+        limiter (asyncio.Semaphore | None, optional): ffmpeg slots shared with other files, e.g. of a
+            batch; each cut holds one. Defaults to None.
+
+    Raises:
+        RuntimeError: Raised if any ffmpeg execution fails.
+
+    Yields:
+        tuple[int, str | MemoryChunk]: Order of the chunk in the sequence and the path to the chunk
+            (or the chunk itself), in completion order.
+    """
+    duration = float(duration)
+    workers = workers or os.cpu_count() or 1
+    total_len: float = await asyncio.to_thread(get_duration, fn)
+    b_fn, ext = os.path.splitext(os.path.basename(fn))
+    if in_memory:
+        fmt = pipe_format((await asyncio.to_thread(probe, fn)).codec, fmt)
+    else:
+        output_dir = output_dir or scratch_dir("chunks")
+        os.makedirs(output_dir, exist_ok=True)
+    ext = fmt.ext or ext
+    if segment_times is not None:
+        starts = [0.0, *segment_times]
+    else:
+        starts = [i * duration for i in range(math.ceil(total_len / duration))]
+    ends = [*starts[1:], total_len]
+    order = sorted(set(indices)) if indices is not None else list(range(len(starts)))
+    n_chunks = len(order)
+
+    async def _cut(i: int) -> tuple[int, str | MemoryChunk]:
+        start, length = starts[i], ends[i] - starts[i]
+        async with limiter or contextlib.nullcontext():
+            if in_memory:
+                data = await _aextract_chunk_bytes(fn, start, length, fmt)
+                return i, MemoryChunk(f"{b_fn}_{i+1}{ext}", data, length)
+            full_o_fn = os.path.join(output_dir, f"{b_fn}_{i+1}{ext}")
+            return i, await _aextract_chunk(fn, start, length, full_o_fn, fmt)
+
+    # New cuts are only started while the consumer keeps pulling, so a slow
+    # consumer holds back the splitter instead of letting chunks pile up on disk.
+    next_i = 0
+    pending: set[asyncio.Task] = set()
+    try:
+        while next_i < n_chunks or pending:
+            while next_i < n_chunks and len(pending) < workers:
+                pending.add(asyncio.create_task(_cut(order[next_i])))
+                next_i += 1
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for d in done:
+                yield d.result()
+    finally:
+        for t in pending:
+            t.cancel()
+
+
+async def _achunk_duration(audio: str | MemoryChunk) -> float:
+    """Duration of a chunk on disk or in memory."""
+    if isinstance(audio, MemoryChunk):
+        return audio.duration
+    return await asyncio.to_thread(get_duration, audio)
+
+
+@typing_extensions.deprecated("async_send_to_whisper is deprecated; use agather_transcription or astream_transcription instead.")
 async def async_send_to_whisper(
         audio: str,
         tmp_dir:os.PathLike,
         order_:int, 
-    ) -> Transcription:
+        dispatcher:TranscriptionBackend | None=None,
+        cache:TranscriptCache | None=None,
+    ) -> os.PathLike:
     """
     Asynchronously send an audio file to OpenAI Whisper for transcription.
 
+    Deprecated: `main` keeps transcripts in memory; use `agather_transcription`
+    or `astream_transcription` instead.
+
     Args:
         audio (str): Path to the input audio file.
         tmp_dir (os.PathLike): Temporary directory to store transcription files.
         order_ (int): Order of the audio file in the sequence.
+        dispatcher (TranscriptionBackend | None, optional): Backend to send through. Defaults to the shared Whisper dispatcher.
+        cache (TranscriptCache | None, optional): Transcript cache. On a hit no request is sent. Defaults to None.
 
     Returns:
-        Transcription: Transcription object containing the text transcription.
-    """
-    client = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY", ''))
-    audio_file = open(audio, "rb")
-    carry_on = "N"
-    audio_size = os.path.getsize(audio)
-    if audio_size>__WHISPER_CONTENT_LIMIT_IN_BYTES:
-        print(f"🟡 Maximum content size limit of OpenAI Whisper ({__WHISPER_CONTENT_LIMIT_IN_BYTES} bytes) exceeded (\"{audio}\"={audio_size} bytes read)")
-        carry_on = input("Do you want to continue?(y/N)")
-    else:
-        carry_on = 'y'
+        os.PathLike: Path to the file holding the transcribed text.
+    """
+    return _write_chunk_transcript(tmp_dir, order_, await _atranscribe(audio, dispatcher, cache))
 
-    if carry_on.lower().strip() not in ['y', 'yes']:
-        raise InterruptedError(f"Process is interrupted manually due to file size exceeding. (\"{audio}\"={audio_size} bytes read)")
-    transcription: Transcription = await client.audio.transcriptions.create(
-        model="whisper-1", file=audio_file
-    )
-    audio_file.close()
 
+def _write_chunk_transcript(tmp_dir:os.PathLike, order_:int, text:str) -> str:
     tmp_transcription_fn = os.path.join(tmp_dir, f".{order_}.txt")
     with open(tmp_transcription_fn, "w") as f:
-        f.write(textwrap.fill(transcription.text))
-
+        f.write(text)
     return tmp_transcription_fn
 
+
+async def _atranscribe(
+        audio: str | MemoryChunk,
+        dispatcher:TranscriptionBackend | None=None,
+        cache:TranscriptCache | None=None,
+    ) -> str:
+    """
+    Asynchronously send an audio file to OpenAI Whisper and return the wrapped text.
+
+    A chunk over the Whisper size limit is re-encoded to 16 kHz mono Opus before upload.
+
+    Args:
+        audio (str | MemoryChunk): Path to the input audio file, or a chunk held in memory.
+        dispatcher (TranscriptionBackend | None, optional): Backend to send through. Defaults to the shared Whisper dispatcher.
+        cache (TranscriptCache | None, optional): Transcript cache. On a hit no request is sent. Defaults to None.
+
+    Returns:
+        str: Transcribed text wrapped by `textwrap.fill`.
+    """
+    dispatcher = dispatcher or get_dispatcher()
+    in_memory = isinstance(audio, MemoryChunk)
+    cache_key = None
+    if cache is not None:
+        cache_key = await asyncio.to_thread(cache.key, audio.data if in_memory else audio, dispatcher.model)
+        if (text := await asyncio.to_thread(cache.get, cache_key)) is not None:
+            return textwrap.fill(text)
+
+    audio_size = len(audio.data) if in_memory else os.path.getsize(audio)
+    upload = (audio.name, audio.data) if in_memory else audio
+    if isinstance(dispatcher, WhisperDispatcher) and audio_size>__WHISPER_CONTENT_LIMIT_IN_BYTES:
+        # Never wait for a human: shrink the chunk to 16 kHz mono Opus instead.
+        print(f"🟡 Maximum content size limit of OpenAI Whisper ({__WHISPER_CONTENT_LIMIT_IN_BYTES} bytes) exceeded (\"{audio}\"={audio_size} bytes read), transcoding to Opus")
+        if in_memory:
+            upload = (os.path.splitext(audio.name)[0] + ".ogg", await ashrink_bytes(audio.data))
+        else:
+            upload = await ashrink_chunk(audio)
+    try:
+        text = await dispatcher.transcribe(upload)
+    finally:
+        if not in_memory and upload != audio:
+            os.remove(upload)
+    if cache is not None:
+        await asyncio.to_thread(cache.put, cache_key, text)
+    return textwrap.fill(text)
+
 _now = time.strftime("%Y%m%d-%H%M%S", time.localtime(time.time()))
+async def _aiter_chunks(
+        audio_files:list[os.PathLike] | AsyncIterable[tuple[int, os.PathLike]],
+    ) -> AsyncIterator[tuple[int, os.PathLike]]:
+    """Iterate `(order, path)` pairs from either a list of paths or an async chunk stream."""
+    if isinstance(audio_files, AsyncIterable):
+        async for i, a in audio_files:
+            yield i, a
+    else:
+        for i, a in enumerate(audio_files):
+            yield i, a
+
+
+async def agather_transcription(
+        audio_files:list[os.PathLike | MemoryChunk] | AsyncIterable[tuple[int, os.PathLike | MemoryChunk]],
+        dispatcher:TranscriptionBackend | None=None,
+        cache:TranscriptCache | None=None,
+        on_chunk:Callable[[int, str], None] | None=None,
+        workers:int | None=None,
+    ) -> list[str]:
+    """
+    Transcribe chunks concurrently and keep the transcripts in memory.
+
+    At most `workers` chunks are in flight; the next chunk is only pulled from
+    `audio_files` once one of them is transcribed, so a streamed split never
+    holds more chunks than the backend can take. Chunks shorter than 5 seconds
+    are skipped.
+
+    Args:
+        audio_files (list[os.PathLike | MemoryChunk] | AsyncIterable[tuple[int, os.PathLike | MemoryChunk]]): Chunks,
+            or an async stream of `(order, chunk)` pairs such as `asplit_audio(in_memory=True)`.
+        dispatcher (TranscriptionBackend | None, optional): Backend that transcribes each chunk. Defaults to the shared one.
+        cache (TranscriptCache | None, optional): Transcript cache consulted before each request. Defaults to None.
+        on_chunk (Callable[[int, str], None] | None, optional): Called with the order and transcript of each
+            chunk as soon as it is transcribed, e.g. to checkpoint it. Defaults to None.
+        workers (int | None, optional): Maximum chunks in flight. Defaults to the concurrency of the backend.
+
+    Raises:
+        Exception: The first splitter or transcription error, after the other requests are cancelled.
+
+    Returns:
+        list[str]: Transcript of each non-skipped chunk, in chunk order.
+    """
+    dispatcher = dispatcher or get_dispatcher()
+    slots = asyncio.Semaphore(workers or dispatcher.concurrency)
+
+    async def _transcribe(i:int, a:os.PathLike | MemoryChunk) -> str:
+        try:
+            text = await _atranscribe(a, dispatcher, cache)
+        finally:
+            slots.release()
+        if on_chunk is not None:
+            on_chunk(i, text)
+        return text
+
+    print("👉 Sending to OpenAI Whisper-1...")
+    tasks: dict[int, asyncio.Task] = {}
+    try:
+        async for i, a in _aiter_chunks(audio_files):
+            if await _achunk_duration(a) < 5:
+                print((
+                    f"⚠️ WARNING: '{a}' "
+                    "less then 5 seconds. File skipped. "
+                ))
+                continue
+            await slots.acquire()
+            tasks[i] = asyncio.create_task(_transcribe(i, a))
+        return list(await asyncio.gather(*(tasks[i] for i in sorted(tasks))))
+    finally:
+        for t in tasks.values():
+            t.cancel()
+
+
+@typing_extensions.deprecated("adump_transcription is deprecated; use agather_transcription or astream_transcription instead.")
 async def adump_transcription(
-        audio_files:list[os.PathLike], 
-        now:str=_now)->list[os.PathLike]:
+        audio_files:list[os.PathLike] | AsyncIterable[tuple[int, os.PathLike]], 
+        now:str=_now,
+        dispatcher:TranscriptionBackend | None=None,
+        cache:TranscriptCache | None=None)->list[os.PathLike]:
     """
     Asynchronously dump transcriptions for multiple audio files.
 
+    Deprecated: a thin wrapper over `agather_transcription` that writes each
+    transcript to its own file; use `agather_transcription` or
+    `astream_transcription` instead.
+
     Args:
-        audio_files (list[os.PathLike]): List of paths to the input audio files.
+        audio_files (list[os.PathLike] | AsyncIterable[tuple[int, os.PathLike]]): List of paths to the
+            input audio files, or an async stream of `(order, path)` pairs such as `asplit_audio`.
+            Streamed chunks are sent to Whisper as soon as they arrive.
         now (str, optional): Current timestamp string. Defaults to current time in the specified format.
+        dispatcher (TranscriptionBackend | None, optional): Backend that transcribes each chunk, e.g. the
+            Whisper dispatcher that bounds, rate-limits and retries requests. Defaults to the shared one.
+        cache (TranscriptCache | None, optional): Transcript cache consulted before each request. Defaults to None.
 
     Returns:
-        list[os.PathLike]: List of paths to the dumped transcription files.
+        list[os.PathLike]: List of paths to the dumped transcription files, in chunk order, or an empty
+            list if any chunk failed.
     """
-    transcription_list = []
-    tmp_dir = f".tmp_transcriptions_{now}"
-    os.makedirs(tmp_dir)
-    print("👉 Sending to OpenAI Whisper-1...")
-    tasks = []
-    for i, a in enumerate(audio_files):
-        if librosa.get_duration(path=a) < 5:
-            print((
-                f"⚠️ WARNING: '{a}' "
-                "less then 5 seconds. File skipped. "
-            ))
-            continue
-        tasks.append(asyncio.create_task(
-            async_send_to_whisper(a, tmp_dir, i)
-        ))
-    transcription_list = await asyncio.gather(*tasks,return_exceptions=True)
-    if True in (issubclass(t.__class__, Exception) for t in transcription_list):
-        print(*transcription_list, sep='\n')
+    # Unique per job, so concurrent jobs started in the same second never share it.
+    tmp_dir = scratch_dir(f"transcriptions_{now}")
+    dumped: dict[int, str] = {}
+
+    def _dump(i:int, text:str):
+        dumped[i] = _write_chunk_transcript(tmp_dir, i, text)
+
+    try:
+        await agather_transcription(audio_files, dispatcher, cache, on_chunk=_dump)
+    except Exception as e:
+        print(e)
         shutil.rmtree(tmp_dir)
         return []
-    return transcription_list
+    return [dumped[i] for i in sorted(dumped)]
 
 
-async def _summarize(*, content:str, by_:Literal["gemini", "openai"]='gemini', resp_lang:str):
+async def astream_transcription(
+        audio_files:list[os.PathLike] | AsyncIterable[tuple[int, os.PathLike]],
+        output:os.PathLike,
+        workers:int=4,
+        remove_chunks:bool=False,
+        dispatcher:TranscriptionBackend | None=None,
+        cache:TranscriptCache | None=None,
+        on_chunk:Callable[[int, str], None] | None=None,
+        done:dict[int, str] | None=None,
+    ) -> list[str]:
     """
-    Summarize content using Gemini or OpenAI.
+    Transcribe chunks through a producer/consumer queue and write the transcript incrementally.
+
+    Chunks flow from `audio_files` into a bounded queue consumed by `workers`
+    transcription workers. Transcripts are kept in memory, reassembled in
+    chunk order as they arrive and appended to `output` as soon as every
+    earlier chunk is done.
 
     Args:
-        content (str): Input content to be summarized.
-        by_ (Literal["gemini"], optional): Summarization method. Defaults to 'gemini'.
-        resp_lang (str): Language for response.
+        audio_files (list[os.PathLike] | AsyncIterable[tuple[int, os.PathLike]]): List of paths to the
+            input audio files, or an async stream of `(order, path)` pairs such as `asplit_audio`.
+        output (os.PathLike): Path of the transcript to write.
+        workers (int, optional): Number of concurrent transcription workers. Defaults to 4.
+        remove_chunks (bool, optional): Delete each chunk once it is transcribed. Defaults to False.
+        dispatcher (TranscriptionBackend | None, optional): Backend that transcribes each chunk, e.g. the
+            Whisper dispatcher that bounds, rate-limits and retries requests. Defaults to the shared one.
+        cache (TranscriptCache | None, optional): Transcript cache consulted before each request. Defaults to None.
+        on_chunk (Callable[[int, str], None] | None, optional): Called with the order and transcript of each
+            chunk as soon as it is transcribed, e.g. to checkpoint it. Defaults to None.
+        done (dict[int, str] | None, optional): Transcripts of chunks finished by an earlier run, by order;
+            `audio_files` then only holds the missing chunks. Defaults to None.
+
+    Raises:
+        Exception: Any splitter or Whisper error is re-raised after the pipeline is cancelled.
 
     Returns:
-        str: Summary of the input content.
+        list[str]: Transcript of each non-skipped chunk, in order. Joined with a trailing
+            newline each, they are identical to what is written to `output`.
     """
-    if by_ == "gemini":
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers)
+    texts: dict[int, str] = dict(done or {})
+    parts: list[str] = []
+    next_idx = 0
+    t0 = time.time()
+
+    with open(output, "w", encoding="utf8") as out:
+
+        def _flush():
+            nonlocal next_idx
+            while next_idx in texts:
+                text = texts.pop(next_idx)
+                if text is not None:
+                    if not parts:
+                        print(f"✍️ First transcript written after {round(time.time() - t0, 2)}s.")
+                    parts.append(text)
+                    out.write(text + "\n")
+                    out.flush()
+                next_idx += 1
+
+        async def _produce():
+            async for i, a in _aiter_chunks(audio_files):
+                if await _achunk_duration(a) < 5:
+                    print((
+                        f"⚠️ WARNING: '{a}' "
+                        "less then 5 seconds. File skipped. "
+                    ))
+                    texts[i] = None
+                    _flush()
+                    continue
+                await queue.put((i, a))
+
+        async def _consume():
+            while True:
+                i, a = await queue.get()
+                try:
+                    texts[i] = await _atranscribe(a, dispatcher, cache)
+                    if on_chunk is not None:
+                        on_chunk(i, texts[i])
+                    if remove_chunks and not isinstance(a, MemoryChunk):
+                        os.remove(a)
+                    _flush()
+                finally:
+                    queue.task_done()
+
+        print("👉 Streaming to OpenAI Whisper-1...")
+        _flush()
+        consumers = [asyncio.create_task(_consume()) for _ in range(workers)]
+        producer = asyncio.create_task(_produce())
+        tasks = [producer, *consumers]
         try:
-            genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-            model = genai.GenerativeModel(model_name="gemini-1.5-pro",
-                                  generation_config=get_gemini_default_config(),
-                                  safety_settings=get_gemini_default_safety_setting())
-            prompt_parts = get_prompt_parts(content, resp_lang)
-            response = model.generate_content(prompt_parts)
-            return response.text
-        except Exception as e:
-            raise e
-    elif by_ == "openai":
+            # Consumers only ever finish by raising, so whichever side fails
+            # first surfaces here and the rest of the pipeline is cancelled.
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for d in done:
+                d.result()
+            tasks.append(asyncio.create_task(queue.join()))
+            done, _ = await asyncio.wait(tasks[1:], return_when=asyncio.FIRST_COMPLETED)
+            for d in done:
+                d.result()
+        finally:
+            for t in tasks:
+                t.cancel()
+    return parts
+
+
+class SummaryProvider(ABC):
+    """Async interface shared by the summarization providers."""
+
+    name: str
+
+    def __init__(self, api_key:str | None=None):
+        """
+        Args:
+            api_key (str | None, optional): API key of the provider, e.g. the one of the job being
+                summarized. Defaults to the provider's environment variable.
+        """
+        self.api_key = api_key
+
+    @abstractmethod
+    async def asummarize(self, content:str, resp_lang:str) -> str:
+        """
+        Summarize content into meeting minutes.
+
+        Args:
+            content (str): Input content to be summarized.
+            resp_lang (str): Language for response.
+
+        Returns:
+            str: Summary of the input content.
+        """
+
+    async def astream(self, content:str, resp_lang:str) -> AsyncIterator[str]:
+        """
+        Summarize content into meeting minutes, yielding text as it is generated.
+
+        Providers without token streaming yield the whole summary at once.
+
+        Args:
+            content (str): Input content to be summarized.
+            resp_lang (str): Language for response.
+
+        Yields:
+            str: Next piece of the summary.
+        """
+        yield await self.asummarize(content, resp_lang)
+
+
+async def _aiter_in_thread(fn:Callable[[], Iterable[str]]) -> AsyncIterator[str]:
+    """Iterate a blocking iterator in a worker thread without stalling the event loop."""
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    done = object()
+
+    def _pump():
         try:
-            if "OPENAI_API_KEY" not in os.environ:
-                raise OpenaiApiKeyNotFound("OPENAI_API_KEY not found in environmental variables.")
-            client = AsyncOpenAI(api_key=os.environ["OPENAI_API_KEY"])
-            # This is an async function, but we are in a sync function.
-            # We need to run this in an event loop.
-            # However, the parent main() is already an async function,
-            # so we can make _summarize async as well.
-            client = AsyncOpenAI(api_key=os.environ["OPENAI_API_KEY"])
-            prompt_parts = get_openai_prompt_parts(content=content, resp_lang=resp_lang)
-            config = get_openai_default_config()
-            response = await client.chat.completions.create(
-                messages=prompt_parts,
-                **config
-            )
-            return response.choices[0].message.content
+            for item in fn():
+                loop.call_soon_threadsafe(queue.put_nowait, (item, None))
         except Exception as e:
-            raise e
-    else:
+            loop.call_soon_threadsafe(queue.put_nowait, (None, e))
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, (done, None))
+
+    worker = loop.run_in_executor(None, _pump)
+    while True:
+        item, error = await queue.get()
+        if error is not None:
+            raise error
+        if item is done:
+            break
+        yield item
+    await worker
+
+
+class OpenAISummaryProvider(SummaryProvider):
+    """Summarize with the OpenAI chat completions API through one client per event loop."""
+
+    name = "openai"
+    _clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, openai.AsyncOpenAI]]" = weakref.WeakKeyDictionary()
+
+    def _client(self) -> "openai.AsyncOpenAI":
+        import openai
+
+        api_key = self.api_key if self.api_key is not None else os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            raise OpenaiApiKeyNotFound("OPENAI_API_KEY not found in environmental variables.")
+        clients = self._clients.setdefault(asyncio.get_running_loop(), {})
+        if api_key not in clients:
+            clients[api_key] = openai.AsyncOpenAI(api_key=api_key)
+        return clients[api_key]
+
+    async def asummarize(self, content:str, resp_lang:str) -> str:
+        client = self._client()
+        prompt_parts = get_openai_prompt_parts(content=content, resp_lang=resp_lang)
+        config = get_openai_default_config()
+        response = await client.chat.completions.create(
+            messages=prompt_parts,
+            **config
+        )
+        return response.choices[0].message.content
+
+    async def astream(self, content:str, resp_lang:str) -> AsyncIterator[str]:
+        client = self._client()
+        prompt_parts = get_openai_prompt_parts(content=content, resp_lang=resp_lang)
+        config = get_openai_default_config()
+        response = await client.chat.completions.create(
+            messages=prompt_parts,
+            stream=True,
+            **config
+        )
+        async for chunk in response:
+            if chunk.choices and (delta := chunk.choices[0].delta.content):
+                yield delta
+
+
+class GeminiSummaryProvider(SummaryProvider):
+    """
+    Summarize with Gemini without blocking the event loop.
+
+    The SDK call is synchronous, so it runs in a worker thread. The configured
+    `GenerativeModel` is built once per API key and settings and then reused.
+    """
+
+    name = "gemini"
+    model_name = "gemini-1.5-pro"
+    _models: dict[tuple, "genai.GenerativeModel"] = {}
+    _configured_key: str | None = None
+    _lock = threading.Lock()
+
+    def _model(self) -> "genai.GenerativeModel":
+        api_key = self.api_key if self.api_key is not None else os.environ.get("GOOGLE_API_KEY")
+        if not api_key:
+            raise GeminiApiKeyNotFound("GOOGLE_API_KEY not found in environmental variables.")
+        generation_config = get_gemini_default_config()
+        safety_settings = get_gemini_default_safety_setting()
+        key = (api_key, self.model_name, repr(generation_config), repr(safety_settings))
+        with self._lock:
+            if key not in self._models:
+                import google.generativeai as genai
+
+                from google.generativeai import client as genai_client
+
+                if GeminiSummaryProvider._configured_key != api_key:
+                    genai.configure(api_key=api_key)
+                    GeminiSummaryProvider._configured_key = api_key
+                model = genai.GenerativeModel(model_name=self.model_name,
+                                      generation_config=generation_config,
+                                      safety_settings=safety_settings)
+                # `configure` is process-wide and the model would pick up its client on first use,
+                # i.e. with whichever key was configured last; bind the client of this key now.
+                if getattr(model, "_client", None) is None:
+                    model._client = genai_client.get_default_generative_client()
+                self._models[key] = model
+            return self._models[key]
+
+    async def asummarize(self, content:str, resp_lang:str) -> str:
+        model = self._model()
+        prompt_parts = get_prompt_parts(content, resp_lang)
+        response = await asyncio.to_thread(model.generate_content, prompt_parts)
+        return response.text
+
+    async def astream(self, content:str, resp_lang:str) -> AsyncIterator[str]:
+        model = self._model()
+        prompt_parts = get_prompt_parts(content, resp_lang)
+
+        def _chunks():
+            for chunk in model.generate_content(prompt_parts, stream=True):
+                yield chunk.text
+
+        async for text in _aiter_in_thread(_chunks):
+            if text:
+                yield text
+
+
+_summary_providers:dict[str, type[SummaryProvider]] = {
+    OpenAISummaryProvider.name: OpenAISummaryProvider,
+    GeminiSummaryProvider.name: GeminiSummaryProvider,
+}
+
+
+def get_summary_provider(by_:Literal["gemini", "openai"], api_key:str | None=None) -> SummaryProvider:
+    """
+    Get the summarization provider by name.
+
+    Args:
+        by_ (Literal["gemini", "openai"]): Provider name.
+        api_key (str | None, optional): API key of the provider. Defaults to its environment variable.
+
+    Raises:
+        ValueError: Raised if the provider is not supported.
+
+    Returns:
+        SummaryProvider: Provider instance.
+    """
+    if by_ not in _summary_providers:
         raise ValueError(f"Unsupported summarization provider: {by_}")
+    return _summary_providers[by_](api_key)
+
 
+def clear_summary_provider_cache():
+    """Drop cached clients and models, e.g. after rotating API keys."""
+    OpenAISummaryProvider._clients.clear()
+    GeminiSummaryProvider._models.clear()
+    GeminiSummaryProvider._configured_key = None
 
+
+async def _summarize(*, content:str, by_:Literal["gemini", "openai"]='gemini', resp_lang:str, api_key:str | None=None):
+    """
+    Summarize content using Gemini or OpenAI.
+
+    Args:
+        content (str): Input content to be summarized.
+        by_ (Literal["gemini", "openai"], optional): Summarization provider. Defaults to 'gemini'.
+        resp_lang (str): Language for response.
+        api_key (str | None, optional): API key of the provider. Defaults to its environment variable.
+
+    Returns:
+        str: Summary of the input content.
+    """
+    provider = get_summary_provider(by_, api_key)
+    return await provider.asummarize(content, resp_lang)
+
+
+async def _asummarize_stream(
+        *, content:str, by_:Literal["gemini", "openai"]='gemini', resp_lang:str, api_key:str | None=None,
+    ) -> AsyncIterator[str]:
+    """
+    Summarize content using Gemini or OpenAI, yielding tokens as they are generated.
+
+    Args:
+        content (str): Input content to be summarized.
+        by_ (Literal["gemini", "openai"], optional): Summarization provider. Defaults to 'gemini'.
+        resp_lang (str): Language for response.
+        api_key (str | None, optional): API key of the provider. Defaults to its environment variable.
+
+    Yields:
+        str: Next piece of the summary.
+    """
+    provider = get_summary_provider(by_, api_key)
+    async for token in provider.astream(content, resp_lang):
+        yield token
+
+
+@in_workspace
 async def main(*,
     fp:os.PathLike,
     duration:int | float,
@@ -235,96 +937,292 @@ async def main(*,
     summarize:bool,
     summarize_by:Literal["gemini", "openai"]="openai",
     local_transcription:bool=True,
+    split_mode:Literal["segment", "silence", "loop", "parallel"]="segment",
+    split_workers:int | None=None,
+    split_tolerance:float=DEFAULT_TOLERANCE,
+    pipeline:Literal["batch", "stream"]="batch",
+    transcribe_workers:int=4,
+    whisper_concurrency:int | None=None,
+    whisper_rpm:float | None=None,
+    dispatcher:TranscriptionBackend | None=None,
+    cache:TranscriptCache | bool | None=True,
+    summary_mode:Literal["auto", "single", "map-reduce"]="auto",
+    summary_concurrency:int=4,
+    stream_summary:bool=False,
+    on_summary_token:Callable[[str], None] | None=None,
+    vad:bool=False,
+    transcode:Literal["auto", "copy", "opus"]="auto",
+    transfer:Literal["disk", "memory"]="disk",
+    on_progress:Callable[[str, float], None] | None=None,
+    job_id:str | None=None,
+    summary_output:os.PathLike | None=None,
+    ffmpeg_limiter:asyncio.Semaphore | None=None,
+    summary_limiter:asyncio.Semaphore | None=None,
+    openai_api_key:str | None=None,
+    google_api_key:str | None=None,
 ):
     now = time.strftime("%Y%m%d-%H%M%S", time.localtime(time.time()))
-    OPENAI_API_KEY: str = os.environ.get("OPENAI_API_KEY", '')
+    # Keys of this run, e.g. of the session that submitted the job; the environment is only the default.
+    if openai_api_key is None:
+        openai_api_key = os.environ.get("OPENAI_API_KEY", '')
+    if google_api_key is None:
+        google_api_key = os.environ.get("GOOGLE_API_KEY", '')
     
-    if "OPENAI_API_KEY" not in os.environ.keys():
+    if not local_transcription and not openai_api_key:
         raise OpenaiApiKeyNotFound("OPENAI_API_KEY not found in environmental variables.")
 
     if summarize:
-        if summarize_by == "gemini" and ("GOOGLE_API_KEY" not in os.environ.keys()):
+        if summarize_by == "gemini" and not google_api_key:
             raise GeminiApiKeyNotFound("GOOGLE_API_KEY not found in environmental variables.")
-        elif summarize_by == "openai" and ("OPENAI_API_KEY" not in os.environ.keys()):
+        elif summarize_by == "openai" and not openai_api_key:
             raise OpenaiApiKeyNotFound("OPENAI_API_KEY not found in environmental variables for summarization.")
+    summary_api_key = google_api_key if summarize_by == "gemini" else openai_api_key
 
     if not output:
         output = f"{os.path.basename(fp)}_{now}.txt"
+    # Everything a resumed run needs to repeat this one; the cache and callbacks belong to each run.
+    job_params = dict(
+        fp=fp, duration=duration, lang_=lang_, output=output, summarize=summarize, summarize_by=summarize_by,
+        local_transcription=local_transcription, split_mode=split_mode, split_workers=split_workers,
+        split_tolerance=split_tolerance, pipeline=pipeline, transcribe_workers=transcribe_workers,
+        whisper_concurrency=whisper_concurrency, whisper_rpm=whisper_rpm, summary_mode=summary_mode,
+        summary_concurrency=summary_concurrency, vad=vad, transcode=transcode, transfer=transfer,
+        summary_output=summary_output,
+    )
+
+    if cache is True:
+        cache = TranscriptCache()
+    elif not cache:
+        cache = None
 
     audio_files = []
-    tmp_audio_dir = "./.tmp_audio"
+    chunk_texts: list[str] = []
+    full_text = ""
+    tmp_audio_dir = ""
+    checkpoint: JobCheckpoint | None = None
+    # `fp` may be swapped for a converted or trimmed copy below; outputs are named after the source.
+    source_fp = fp
     _, origin_ext = os.path.splitext(os.path.basename(fp))
     is_text_file:bool = origin_ext.lower() in ('.txt', '.md')
 
     if origin_ext.lower() == '.mov':
-        mp4_fp = os.path.splitext(fp)[0] + '.mp4'
-        fp = convert_mov_to_mp4(fp, mp4_fp)
+        # Converted inside the workspace of this run, not next to the source.
+        fp = await asyncio.to_thread(convert_mov_to_mp4, fp)
 
-    if not is_text_file and not local_transcription:
-        print(
-            f"You are using OPEN AI API: {OPENAI_API_KEY[:10]}*****************",
-        )
-        if librosa.get_duration(path=fp) > duration:
-            audio_files = split_audio(fp, duration=duration, output_dir=tmp_audio_dir)
+    def _progress(stage:str, fraction:float):
+        if on_progress is not None:
+            on_progress(stage, fraction)
+
+    def _ffmpeg_slot():
+        return ffmpeg_limiter or contextlib.nullcontext()
+
+    if not is_text_file:
+        _progress("transcribing", 0.05)
+        checkpoint = JobCheckpoint.open(job_params, job_id)
+        texts = checkpoint.transcripts()
+        starts = checkpoint.starts
+        if texts:
+            print(f"♻️ Resuming job {checkpoint.job_id}: {len(texts)} chunk(s) already transcribed")
+        else:
+            print(f"🧾 Job {checkpoint.job_id} is checkpointed in {checkpoint.dir}")
+        # In the workspace of this run, so concurrent jobs never share or delete each other's chunks.
+        tmp_audio_dir = scratch_dir("chunks")
+        if local_transcription:
+            print("Use on-premise speech to text. ")
         else:
+            print(
+                f"You are using OPEN AI API: {openai_api_key[:10]}*****************",
+            )
+        if vad:
+            b_fn = os.path.splitext(os.path.basename(fp))[0]
+            speech_fp = os.path.join(checkpoint.dir, f"{b_fn}.speech.mp3")
+            if starts is not None and os.path.exists(speech_fp):
+                # Trimmed by the interrupted run; the recorded chunk starts refer to this file.
+                fp = speech_fp
+            else:
+                from audio_summary.vad import trim_silence
+
+                async with _ffmpeg_slot():
+                    vad_result = await asyncio.to_thread(trim_silence, fp, speech_fp)
+                vad_result.save(os.path.splitext(output)[0] + ".vad.json")
+                print(
+                    f"🔇 Voice activity trimming removed {vad_result.seconds_saved:.1f}s of "
+                    f"{vad_result.original_seconds:.1f}s, about {vad_result.bytes_saved} bytes of upload. "
+                    f"Transcript timestamps refer to the trimmed audio; see the *.vad.json time map."
+                )
+                fp = vad_result.path
+        info = await asyncio.to_thread(probe, fp)
+        if not local_transcription:
+            plan = plan_chunks(info, duration, mode=transcode)
+        else:
+            # Local transcription has no upload limit.
+            plan = ChunkPlan(duration=float(duration), format=COPY, estimated_bytes=0)
+        if plan.duration < duration or plan.transcode:
+            print(
+                f"👉 Chunks of {plan.duration:.0f}s"
+                + (f" as {plan.format.ext[1:]} at {plan.format.bit_rate // 1000} kbps" if plan.transcode else "")
+                + f", about {plan.estimated_bytes / 1048576:.1f} MB each"
+            )
+        is_split = info.duration > plan.duration or plan.transcode
+        if starts is not None:
+            # Resumed: cut the same chunks as the interrupted run, but only the missing ones.
+            missing = [i for i in range(len(starts)) if i not in texts]
+            if not missing:
+                audio_files = []
+            elif not is_split:
+                audio_files.append(os.path.realpath(fp))
+            else:
+                audio_files = asplit_audio(
+                    fp, duration=plan.duration, output_dir=tmp_audio_dir, workers=split_workers, fmt=plan.format,
+                    segment_times=starts[1:], in_memory=transfer == "memory", indices=missing,
+                    limiter=ffmpeg_limiter,
+                )
+        elif is_split:
+            cuts = None
+            if split_mode == "silence":
+                async with _ffmpeg_slot():
+                    cuts = await asyncio.to_thread(detect_cuts, fp, plan.duration, split_tolerance)
+            if cuts is not None:
+                starts = [0.0, *cuts]
+            else:
+                starts = [i * plan.duration for i in range(max(1, math.ceil(info.duration / plan.duration)))]
+            if transfer == "memory" or split_mode == "parallel":
+                audio_files = asplit_audio(
+                    fp, duration=plan.duration, output_dir=tmp_audio_dir, workers=split_workers, fmt=plan.format,
+                    segment_times=starts[1:], in_memory=transfer == "memory", limiter=ffmpeg_limiter,
+                )
+            else:
+                async with _ffmpeg_slot():
+                    audio_files = await asyncio.to_thread(
+                        split_audio, fp, duration=plan.duration, output_dir=tmp_audio_dir, mode=split_mode,
+                        tolerance=split_tolerance, fmt=plan.format, segment_times=cuts,
+                    )
+                if cuts is None:
+                    starts = [i * plan.duration for i in range(len(audio_files))]
+            checkpoint.set_starts(starts)
+        else:
+            starts = [0.0]
+            checkpoint.set_starts(starts)
             audio_files.append(os.path.realpath(fp))
 
-        transcription_list = await adump_transcription(audio_files, now)
-        shutil.rmtree(tmp_audio_dir)
-
-        full_text = ""
-        for t in transcription_list:
-            print(transcription_list)
-            with open(t, "r") as f:
-                full_text += f.read() + "\n"
-        if full_text:
-            with open(output, "w", encoding="utf8") as f:
-                f.write(full_text)
-            print(f'✅ Transcription finished: {output}')
-            shutil.rmtree(os.path.dirname(transcription_list[0]))
+        def _on_chunk(i:int, text:str):
+            texts[i] = text
+            checkpoint.save_transcript(i, text)
 
+        own_dispatcher: WhisperDispatcher | None = None
+        if local_transcription:
+            backend = get_local_backend()
+        elif dispatcher is not None:
+            # Shared by the caller, e.g. by every file of a batch.
+            backend = dispatcher
         else:
-            _msg = "❗️Interrupted by errors."
-            print('\x1b[33;20m' + _msg + '\x1b[0m')
-            sys.exit(1)
-
-    if not is_text_file and local_transcription:
-        print("Use on-premise speech to text. ")
-        transcript = speech_to_text(audio_fn=fp)
-        if transcript:
-            with open(output, "w", encoding="utf8") as f:
-                f.write(transcript)
+            # The limits of this run apply to this run only, never to other jobs in the process.
+            backend = own_dispatcher = make_dispatcher(
+                max_in_flight=whisper_concurrency, requests_per_minute=whisper_rpm, api_key=openai_api_key
+            )
+        error: Exception | None = None
+        try:
+            if pipeline == "stream":
+                await astream_transcription(
+                    audio_files, output, workers=transcribe_workers, remove_chunks=is_split,
+                    dispatcher=backend, cache=cache, on_chunk=_on_chunk, done=dict(texts),
+                )
+            else:
+                await agather_transcription(audio_files, dispatcher=backend, cache=cache, on_chunk=_on_chunk)
+        except Exception as e:
+            print(e)
+            error = e
+        finally:
+            shutil.rmtree(tmp_audio_dir, ignore_errors=True)
+            if own_dispatcher is not None:
+                await own_dispatcher.aclose()
+        chunk_texts = [texts[i] for i in sorted(texts)]
+        full_text = "".join(t + "\n" for t in chunk_texts)
+        if full_text and error is None:
+            if pipeline != "stream":
+                with open(output, "w", encoding="utf8") as f:
+                    f.write(full_text)
             print(f'✅ Transcription finished: {output}')
 
-        else:
-            _msg = "❗️Interrupted by errors."
+        if cache is not None:
+            print(f"🗃️ Transcript cache: {cache.hits} hit(s), {cache.misses} miss(es)")
+        if error is not None or not full_text:
+            # Finished chunks stay in the checkpoint, so a resumed run only pays for the rest.
+            checkpoint.update(status=FAILED, error=str(error or "Nothing was transcribed."))
+            _msg = (
+                f"❗️Interrupted by errors. {len(texts)} chunk transcript(s) are kept; "
+                f"resume with `--resume {checkpoint.job_id}`."
+            )
             print('\x1b[33;20m' + _msg + '\x1b[0m')
-            sys.exit(1)
+            raise TranscriptionFailed(
+                f"Transcription of job {checkpoint.job_id} failed: {error or 'nothing was transcribed'}"
+            ) from error
 
     res_text = ""
     if summarize:
+        _progress("summarizing", 0.6)
         if is_text_file:
             with open(fp, 'r') as f:
                 full_text = f.read()
+        if not chunk_texts:
+            chunk_texts = split_text_chunks(full_text)
+        fn, _ = os.path.splitext(os.path.basename(source_fp))
+        _output_f = summary_output or f"meeting-minutes_{fn}_{now}.md"
+
+        async def _alimited_summarize(content:str) -> str:
+            async with summary_limiter or contextlib.nullcontext():
+                return await _summarize(content=content, by_=summarize_by, resp_lang=lang_, api_key=summary_api_key)
+
+        async def _astream_final(content:str) -> str:
+            # Stream the final summary straight into the minutes file and the caller.
+            parts = []
+            t0 = time.time()
+            async with summary_limiter or contextlib.nullcontext():
+                with open(_output_f, 'w') as f:
+                    async for token in _asummarize_stream(
+                        content=content, by_=summarize_by, resp_lang=lang_, api_key=summary_api_key,
+                    ):
+                        if not parts:
+                            print(f"✍️ First summary token after {round(time.time() - t0, 2)}s.")
+                        parts.append(token)
+                        f.write(token)
+                        f.flush()
+                        if on_summary_token is not None:
+                            on_summary_token(token)
+            return "".join(parts)
+
         try:
             print(f"👉 Start to summarize with {summarize_by.upper()}...")
-            res_text = await _summarize(content=full_text, by_=summarize_by, resp_lang=lang_)
-            fn, _ = os.path.splitext(os.path.basename(fp))
+            res_text = await asummarize_transcript(
+                chunk_texts,
+                _alimited_summarize,
+                content=full_text,
+                mode=summary_mode,
+                concurrency=summary_concurrency,
+                final_fn=_astream_final if stream_summary else None,
+            )
             if res_text:
-                _output_f = f"meeting-minutes_{fn}_{now}.md"
-                with open(_output_f, 'w') as f:
-                    f.write(res_text)
+                if not stream_summary:
+                    with open(_output_f, 'w') as f:
+                        f.write(res_text)
                 print(f'✅ Summary finished: {_output_f}')
+                if checkpoint is not None:
+                    checkpoint.remove()
             else: 
                 raise GeminiSummarizedFailed("Sorry...summary seems failed....")
         except Exception as e:
             print("🟥",e)
+            if checkpoint is not None:
+                checkpoint.update(status=FAILED, error=str(e))
+                print(f"🟡 The transcript is kept; resume the summary with `--resume {checkpoint.job_id}`.")
         finally:
             print("All tasks done, exit.")
             return full_text, res_text
 
         
     else:
+        if checkpoint is not None:
+            checkpoint.remove()
         print((
             f"🟡 \"{os.path.basename(fp)}\" is a text file. "
             "Set `--summary true` if you need a summary"
@@ -346,7 +1244,40 @@ async def run():
         description="Upload an audio file and make it transcription by OpenAI-Whisper"
     )
     parser.add_argument(
-        "-f", "--file", required=True, type=str, help="The path of the audio file."
+        "-f", "--file", required=False, type=str,
+        help=(
+            "The path of the audio file, or a directory or quoted glob pattern (e.g. \"recordings/*.m4a\") "
+            "to process many files in one run. Required unless `--resume` is given."
+        ),
+    )
+    parser.add_argument(
+        "--output-dir",
+        required=False,
+        type=str,
+        default=".",
+        help="Directory of the transcripts and minutes when `-f` is a directory or glob pattern. Default=current directory.",
+    )
+    parser.add_argument(
+        "--batch-files",
+        required=False,
+        type=int,
+        default=4,
+        help=(
+            "Files processed at once when `-f` is a directory or glob pattern. Their ffmpeg processes "
+            "(`--split-workers`), Whisper requests (`--whisper-concurrency`, `--whisper-rpm`) and "
+            "summarization calls (`--summary-concurrency`) share batch-wide limits. Default=4."
+        ),
+    )
+    parser.add_argument(
+        "--resume",
+        required=False,
+        type=str,
+        default=None,
+        metavar="JOB",
+        help=(
+            "Resume a failed job by its id with the options it was started with: only chunks without "
+            "a checkpointed transcript are transcribed again, then the summary is made."
+        ),
     )
     parser.add_argument(
         "-o",
@@ -380,6 +1311,30 @@ async def run():
         help="Summarization provider to use.",
         choices=["gemini", "openai"],
     )
+    parser.add_argument(
+        "--summary-mode",
+        required=False,
+        type=str,
+        default="auto",
+        help=(
+            "`single` summarizes the whole transcript in one prompt, `map-reduce` summarizes "
+            "sections concurrently and merges them, `auto` uses map-reduce only for transcripts "
+            "that exceed the model context. Default=auto."
+        ),
+        choices=["auto", "single", "map-reduce"],
+    )
+    parser.add_argument(
+        "--summary-concurrency",
+        required=False,
+        type=int,
+        default=4,
+        help="Maximum concurrent summarization calls in map-reduce mode. Default=4.",
+    )
+    parser.add_argument(
+        "--no-stream-summary",
+        action="store_true",
+        help="Write the summary only once it is complete instead of streaming it into the minutes file.",
+    )
     parser.add_argument(
         "--duration",
         required=False,
@@ -391,22 +1346,176 @@ async def run():
         "--local-transcription",
         type=bool,
         default=False, 
-        help="Whether to use local whisper from HF. Default=False."
+        help="Whether to transcribe on this machine with faster-whisper (CPU, int8) instead of the OpenAI API. Default=False."
+    )
+    parser.add_argument(
+        "--split-mode",
+        required=False,
+        type=str,
+        default="segment",
+        help=(
+            "How to cut the audio: one ffmpeg run with the segment muxer, the same with cuts moved "
+            "to the nearest pause, one ffmpeg per chunk, or concurrent ffmpeg processes that stream "
+            "chunks to Whisper as they are cut. Default=segment."
+        ),
+        choices=["segment", "silence", "loop", "parallel"],
+    )
+    parser.add_argument(
+        "--vad",
+        action="store_true",
+        help=(
+            "Compress silences longer than 2 seconds before transcription. Transcript timestamps "
+            "then refer to the trimmed audio; the mapping back to the original offsets and the "
+            "seconds and bytes saved are written next to the transcript as `*.vad.json`."
+        ),
+    )
+    parser.add_argument(
+        "--transcode",
+        required=False,
+        type=str,
+        default="auto",
+        help=(
+            "Chunk encoding for the Whisper API. `auto` copies the audio stream when chunks fit under "
+            "the 25 MB limit and otherwise transcodes to 16 kHz mono Opus, `copy` never transcodes, "
+            "`opus` always does. Chunks are shortened if they would still be too large. Default=auto."
+        ),
+        choices=["auto", "copy", "opus"],
+    )
+    parser.add_argument(
+        "--transfer",
+        required=False,
+        type=str,
+        default="disk",
+        help=(
+            "`disk` writes chunks and transcripts to per-job temporary directories. `memory` pipes each "
+            "chunk from ffmpeg into memory, uploads it from there and keeps transcripts in memory. Default=disk."
+        ),
+        choices=["disk", "memory"],
+    )
+    parser.add_argument(
+        "--split-tolerance",
+        required=False,
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Largest shift of a cut in seconds for `--split-mode silence`. Default=30.",
+    )
+    parser.add_argument(
+        "--pipeline",
+        required=False,
+        type=str,
+        default="batch",
+        help=(
+            "`batch` splits everything, then transcribes everything. `stream` queues chunks to "
+            "transcription workers and writes the transcript incrementally. Default=batch."
+        ),
+        choices=["batch", "stream"],
+    )
+    parser.add_argument(
+        "--transcribe-workers",
+        required=False,
+        type=int,
+        default=4,
+        help="Number of concurrent Whisper workers for `--pipeline stream`. Default=4.",
+    )
+    parser.add_argument(
+        "--whisper-concurrency",
+        required=False,
+        type=int,
+        default=None,
+        help="Maximum Whisper requests in flight. Default=WHISPER_MAX_IN_FLIGHT or 4.",
+    )
+    parser.add_argument(
+        "--whisper-rpm",
+        required=False,
+        type=float,
+        default=None,
+        help="Maximum Whisper requests per minute. Default=WHISPER_RPM or 50.",
+    )
+    parser.add_argument(
+        "--no-transcript-cache",
+        action="store_true",
+        help="Always send chunks to Whisper instead of reusing cached transcripts.",
+    )
+    parser.add_argument(
+        "--split-workers",
+        required=False,
+        type=int,
+        default=None,
+        help="Maximum number of concurrent ffmpeg processes for `--split-mode parallel`. Default=CPU count.",
     )
     args = parser.parse_args()
+    # Workspaces of runs that crashed are never removed by their own process.
+    sweep_orphans()
+    if args.resume:
+        try:
+            params = JobCheckpoint.load(args.resume).params
+        except FileNotFoundError as e:
+            parser.error(str(e))
+        try:
+            await main(
+                **params,
+                job_id=args.resume,
+                cache=not args.no_transcript_cache,
+                stream_summary=not args.no_stream_summary,
+            )
+        except TranscriptionFailed:
+            sys.exit(1)
+        return
+    if not args.file:
+        parser.error("the following arguments are required: -f/--file")
     fp: str = args.file
     output: str = args.output
-    summarize:bool = args.summarize 
-    duration:int = args.duration 
-    lang_:str = lang_map[args.lang.replace('_', '-').lower()]
-    summarize_by:str = args.summarize_by
-
-    await main(
-        fp=fp,
-        output=output,
-        summarize=summarize,
-        summarize_by=summarize_by,
-        duration=duration,
-        lang_=lang_,
-        local_transcription=args.local_transcription
+    options = dict(
+        summarize=args.summarize,
+        summarize_by=args.summarize_by,
+        duration=args.duration,
+        lang_=lang_map[args.lang.replace('_', '-').lower()],
+        local_transcription=args.local_transcription,
+        split_mode=args.split_mode,
+        split_tolerance=args.split_tolerance,
+        vad=args.vad,
+        transcode=args.transcode,
+        transfer=args.transfer,
+        pipeline=args.pipeline,
+        transcribe_workers=args.transcribe_workers,
+        cache=not args.no_transcript_cache,
+        summary_mode=args.summary_mode,
+        stream_summary=not args.no_stream_summary,
     )
+
+    if not os.path.isfile(fp):
+        from audio_summary.batch import arun_batch, collect_inputs
+
+        inputs = collect_inputs(fp)
+        if not inputs:
+            parser.error(f"No input files found for \"{fp}\"")
+        if output:
+            parser.error("-o/--output names a single transcript; use --output-dir with a directory or glob pattern")
+        print(f"📚 Batch of {len(inputs)} file(s) -> {args.output_dir}")
+        report = await arun_batch(
+            inputs,
+            args.output_dir,
+            files_in_flight=args.batch_files,
+            ffmpeg_workers=args.split_workers,
+            summary_concurrency=args.summary_concurrency,
+            whisper_concurrency=args.whisper_concurrency,
+            whisper_rpm=args.whisper_rpm,
+            **options,
+        )
+        print(report.format())
+        if report.failed:
+            sys.exit(1)
+        return
+
+    try:
+        await main(
+            fp=fp,
+            output=output,
+            split_workers=args.split_workers,
+            whisper_concurrency=args.whisper_concurrency,
+            whisper_rpm=args.whisper_rpm,
+            summary_concurrency=args.summary_concurrency,
+            **options,
+        )
+    except TranscriptionFailed:
+        sys.exit(1)
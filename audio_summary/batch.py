@@ -0,0 +1,208 @@
+"""
+Batch mode: transcribe and summarize many recordings in one process.
+
+Every file runs `main` on the same event loop, so imports, API clients and
+the Whisper dispatcher are set up once. A bounded number of files is in
+flight at a time, and their ffmpeg processes, Whisper requests and
+summarization calls draw from pools shared by the whole batch.
+"""
+import os
+import glob
+import time
+import asyncio
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from audio_summary.app import main
+from audio_summary.probe import probe
+from audio_summary.transcriber import make_dispatcher
+
+DEFAULT_FILES_IN_FLIGHT = 4
+# Media types the Streamlit uploader accepts; a directory is scanned for these only.
+MEDIA_EXTENSIONS = (".wav", ".mp3", ".m4a", ".mp4", ".mov", ".webm")
+DONE = "done"
+FAILED = "failed"
+
+
+def collect_inputs(source: str) -> list[str]:
+    """
+    Expand a directory or a glob pattern to the files of a batch.
+
+    Args:
+        source (str): Directory, whose media files are taken (not recursively), or a glob
+            pattern such as "recordings/**/*.m4a".
+
+    Returns:
+        list[str]: Sorted file paths.
+    """
+    if os.path.isdir(source):
+        return sorted(
+            entry.path for entry in os.scandir(source)
+            if entry.is_file() and os.path.splitext(entry.name)[1].lower() in MEDIA_EXTENSIONS
+        )
+    return sorted(p for p in glob.glob(source, recursive=True) if os.path.isfile(p))
+
+
+def _output_names(inputs: list[str]) -> list[str]:
+    """Base names for the outputs, made unique when two inputs share a name."""
+    names = []
+    seen: dict[str, int] = {}
+    for fp in inputs:
+        name = os.path.splitext(os.path.basename(fp))[0]
+        seen[name] = seen.get(name, 0) + 1
+        names.append(name if seen[name] == 1 else f"{name}_{seen[name]}")
+    return names
+
+
+@dataclass
+class FileReport:
+    """
+    Outcome of one file of a batch.
+
+    Attributes:
+        path (str): Input file.
+        status (str): "done" or "failed".
+        audio_seconds (float): Duration of the recording; 0 for text files.
+        elapsed (float): Wall time from start to finish of the file, including waits for shared pools.
+        transcript (str): Path of the transcript.
+        summary (str): Path of the minutes, or "" if none were written.
+        error (str): Error message of a failed file.
+    """
+    path: str
+    status: str
+    audio_seconds: float
+    elapsed: float
+    transcript: str
+    summary: str = ""
+    error: str = ""
+
+    @property
+    def speed(self) -> float:
+        """Seconds of audio processed per second of wall time."""
+        return self.audio_seconds / self.elapsed if self.elapsed > 0 else 0.0
+
+
+@dataclass
+class BatchReport:
+    """
+    Per-file and aggregate throughput of a batch.
+
+    Attributes:
+        files (list[FileReport]): One report per input, in input order.
+        elapsed (float): Wall time of the whole batch.
+    """
+    files: list[FileReport] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def audio_seconds(self) -> float:
+        return sum(f.audio_seconds for f in self.files)
+
+    @property
+    def failed(self) -> list[FileReport]:
+        return [f for f in self.files if f.status == FAILED]
+
+    @property
+    def speed(self) -> float:
+        """Seconds of audio processed per second of wall time, over the whole batch."""
+        return self.audio_seconds / self.elapsed if self.elapsed > 0 else 0.0
+
+    def format(self) -> str:
+        """Render the report as a plain-text table."""
+        width = max([len(os.path.basename(f.path)) for f in self.files] + [4])
+        lines = [f"{'File':<{width}}  {'Status':<6}  {'Audio':>9}  {'Elapsed':>9}  {'Speed':>7}"]
+        for f in self.files:
+            lines.append(
+                f"{os.path.basename(f.path):<{width}}  {f.status:<6}  {f.audio_seconds:>8.1f}s  "
+                f"{f.elapsed:>8.1f}s  {f.speed:>6.1f}x" + (f"  {f.error}" if f.error else "")
+            )
+        lines.append(
+            f"{'Total':<{width}}  {len(self.files) - len(self.failed)}/{len(self.files):<4}  "
+            f"{self.audio_seconds:>8.1f}s  {self.elapsed:>8.1f}s  {self.speed:>6.1f}x"
+        )
+        return "\n".join(lines)
+
+
+async def _aaudio_seconds(fp: str) -> float:
+    if os.path.splitext(fp)[1].lower() in (".txt", ".md"):
+        return 0.0
+    try:
+        return (await asyncio.to_thread(probe, fp)).duration
+    except Exception:
+        return 0.0
+
+
+async def arun_batch(
+    inputs: list[str],
+    output_dir: str,
+    *,
+    files_in_flight: int = DEFAULT_FILES_IN_FLIGHT,
+    ffmpeg_workers: int | None = None,
+    summary_concurrency: int = 4,
+    whisper_concurrency: int | None = None,
+    whisper_rpm: float | None = None,
+    runner: Callable[..., Awaitable[tuple[str, str]]] = main,
+    **kwargs,
+) -> BatchReport:
+    """
+    Transcribe and optionally summarize many files with shared bounded pools.
+
+    Up to `files_in_flight` files run at once. All of them share one pool of
+    `ffmpeg_workers` ffmpeg slots (splitting, silence detection and VAD), one
+    Whisper dispatcher with a global in-flight and rate limit, and one pool
+    of `summary_concurrency` summarization calls. A failed file is reported
+    and does not stop the others.
+
+    Args:
+        inputs (list[str]): Input files, e.g. from `collect_inputs`.
+        output_dir (str): Directory of the transcripts ("<name>.txt") and minutes ("meeting-minutes_<name>.md").
+        files_in_flight (int, optional): Files processed at once. Defaults to 4.
+        ffmpeg_workers (int | None, optional): ffmpeg processes at once across the batch. Defaults to the CPU count.
+        summary_concurrency (int, optional): Summarization calls at once across the batch. Defaults to 4.
+        whisper_concurrency (int | None, optional): Whisper requests in flight across the batch.
+            Defaults to WHISPER_MAX_IN_FLIGHT or 4.
+        whisper_rpm (float | None, optional): Whisper requests per minute across the batch. Defaults to WHISPER_RPM or 50.
+        runner (Callable[..., Awaitable[tuple[str, str]]], optional): Pipeline of one file. Defaults to `main`.
+        **kwargs: Other keyword arguments of `main`, applied to every file.
+
+    Returns:
+        BatchReport: Per-file and aggregate throughput.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    dispatcher = make_dispatcher(max_in_flight=whisper_concurrency, requests_per_minute=whisper_rpm)
+    ffmpeg_workers = ffmpeg_workers or os.cpu_count() or 1
+    file_slots = asyncio.Semaphore(files_in_flight)
+    ffmpeg_limiter = asyncio.Semaphore(ffmpeg_workers)
+    summary_limiter = asyncio.Semaphore(summary_concurrency)
+
+    async def _run_one(fp: str, name: str) -> FileReport:
+        transcript = os.path.join(output_dir, f"{name}.txt")
+        summary = os.path.join(output_dir, f"meeting-minutes_{name}.md")
+        async with file_slots:
+            t0 = time.time()
+            audio_seconds = await _aaudio_seconds(fp)
+            try:
+                _, res_text = await runner(
+                    **kwargs,
+                    fp=fp,
+                    output=transcript,
+                    summary_output=summary,
+                    split_workers=ffmpeg_workers,
+                    summary_concurrency=summary_concurrency,
+                    ffmpeg_limiter=ffmpeg_limiter,
+                    summary_limiter=summary_limiter,
+                    dispatcher=dispatcher,
+                )
+            except (Exception, SystemExit) as e:
+                return FileReport(fp, FAILED, audio_seconds, time.time() - t0, transcript, error=str(e) or e.__class__.__name__)
+        if kwargs.get("summarize") and not res_text:
+            # The transcript was written; only the minutes are missing, as in the server jobs.
+            return FileReport(fp, FAILED, audio_seconds, time.time() - t0, transcript, error="Summarization failed.")
+        return FileReport(fp, DONE, audio_seconds, time.time() - t0, transcript, summary if res_text else "")
+
+    t0 = time.time()
+    try:
+        files = await asyncio.gather(*(_run_one(fp, name) for fp, name in zip(inputs, _output_names(inputs))))
+    finally:
+        await dispatcher.aclose()
+    return BatchReport(files=list(files), elapsed=time.time() - t0)
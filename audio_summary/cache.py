@@ -0,0 +1,160 @@
+import os
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+
+DEFAULT_TRANSCRIPT_CACHE_DIR = os.path.join("~", ".cache", "audio_summary", "transcripts")
+DEFAULT_TRANSCRIPT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def get_cache_dir() -> str:
+    """Get the transcript cache directory from TRANSCRIPT_CACHE_DIR or the default."""
+    return os.path.expanduser(os.getenv("TRANSCRIPT_CACHE_DIR", DEFAULT_TRANSCRIPT_CACHE_DIR))
+
+
+def get_cache_max_bytes() -> int:
+    """Get the transcript cache size bound from TRANSCRIPT_CACHE_MAX_BYTES or the default."""
+    return int(os.getenv("TRANSCRIPT_CACHE_MAX_BYTES", DEFAULT_TRANSCRIPT_CACHE_MAX_BYTES))
+
+
+class TranscriptCache:
+    """
+    Content-addressed on-disk transcript cache with size-bounded LRU eviction.
+
+    Entries are keyed by the SHA-256 of the audio chunk plus the model name,
+    so re-running the same recording with another language or summarizer
+    reuses the transcripts. Recency is tracked through each entry's mtime.
+    Each instance counts its own hits and misses, so one instance per job
+    reports that job's numbers. The size of the cache is tracked as entries
+    are written, so the directory is only scanned once the bound is passed.
+    """
+
+    def __init__(self, cache_dir: str | os.PathLike | None = None, max_bytes: int | None = None):
+        """
+        Args:
+            cache_dir (str | os.PathLike | None, optional): Cache directory. Defaults to TRANSCRIPT_CACHE_DIR
+                or "~/.cache/audio_summary/transcripts".
+            max_bytes (int | None, optional): Size bound of the cache. Defaults to TRANSCRIPT_CACHE_MAX_BYTES or 256 MiB.
+        """
+        self.cache_dir = Path(cache_dir if cache_dir is not None else get_cache_dir())
+        self.max_bytes = max_bytes if max_bytes is not None else get_cache_max_bytes()
+        self.hits = 0
+        self.misses = 0
+        # Size as of the last scan plus the entries written since; None before the first scan.
+        self._usage: int | None = None
+        self._usage_lock = threading.Lock()
+
+    @staticmethod
+    def key(audio: str | os.PathLike | bytes, model: str) -> str:
+        """
+        Compute the cache key of an audio chunk.
+
+        Args:
+            audio (str | os.PathLike | bytes): Path to the audio chunk, or the encoded chunk itself.
+            model (str): Transcription model name.
+
+        Returns:
+            str: Hex digest identifying the chunk content and model.
+        """
+        h = hashlib.sha256()
+        if isinstance(audio, (bytes, bytearray, memoryview)):
+            h.update(audio)
+        else:
+            with open(audio, "rb") as f:
+                while block := f.read(_HASH_BLOCK_SIZE):
+                    h.update(block)
+        h.update(b"\0" + model.encode())
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.txt"
+
+    def get(self, key: str) -> str | None:
+        """
+        Look up a transcript and mark it as recently used.
+
+        Args:
+            key (str): Cache key from `key`.
+
+        Returns:
+            str | None: Cached transcript, or None on a miss.
+        """
+        path = self._path(key)
+        try:
+            text = path.read_text(encoding="utf8")
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return text
+
+    def put(self, key: str, text: str):
+        """
+        Store a transcript atomically, evicting down to `max_bytes` once the cache outgrows it.
+
+        Entries written by other processes are only counted by the next
+        scan, which the first `put` of every instance runs.
+
+        Args:
+            key (str): Cache key from `key`.
+            text (str): Transcript to store.
+        """
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = text.encode("utf8")
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".", suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._usage_lock:
+            if self._usage is not None:
+                self._usage += len(data) - replaced
+            due = self._usage is None or self._usage > self.max_bytes
+        if due:
+            self.evict()
+
+    def evict(self, max_bytes: int | None = None) -> int:
+        """
+        Remove least recently used entries until the cache fits in `max_bytes`.
+
+        Args:
+            max_bytes (int | None, optional): Size bound to enforce. Defaults to `self.max_bytes`.
+
+        Returns:
+            int: Number of evicted entries.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        if not self.cache_dir.exists():
+            return 0
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob("*/*.txt"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        evicted = 0
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            evicted += 1
+        with self._usage_lock:
+            self._usage = total
+        return evicted
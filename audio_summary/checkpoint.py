@@ -0,0 +1,187 @@
+"""
+Per-job checkpoints, so a failed transcription resumes where it stopped.
+
+Each job has a directory holding a JSON manifest (the `main` parameters,
+a fingerprint of the source recording and the start time of every chunk)
+and one transcript file per finished chunk. Both are written atomically,
+so a crash at any point leaves every finished chunk readable. Resuming a
+job re-cuts and re-transcribes only the chunks without a transcript.
+
+A run without a job id gets one derived from its source and options, so
+running the same command again after a failure picks up its checkpoint.
+"""
+import os
+import json
+import hashlib
+import time
+import shutil
+import tempfile
+from pathlib import Path
+
+RUNNING = "running"
+FAILED = "failed"
+
+
+def get_checkpoint_dir() -> str:
+    """Get the checkpoint directory from APP_CHECKPOINT_DIR, or a `.jobs` directory next to APP_FILE_DUMP."""
+    dump_dir = os.getenv("APP_FILE_DUMP", "file_dump")
+    return os.getenv("APP_CHECKPOINT_DIR", os.path.normpath(dump_dir) + ".jobs")
+
+
+def _atomic_write(path: Path, text: str):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _fingerprint(fp: str | os.PathLike) -> dict:
+    st = os.stat(fp)
+    return {"size": st.st_size, "mtime": st.st_mtime}
+
+
+# Where the results go does not change which chunks are cut and transcribed.
+_OUTPUT_PARAMS = ("output", "summary_output")
+
+
+def derive_job_id(params: dict) -> str:
+    """
+    Derive the job id of a run from its source recording and options.
+
+    Args:
+        params (dict): JSON-serializable keyword arguments of `main`; `params["fp"]` is the source.
+
+    Returns:
+        str: The same id for the same source file and options, whatever the output paths.
+    """
+    options = {k: v for k, v in params.items() if k not in _OUTPUT_PARAMS}
+    options["fp"] = os.path.abspath(params["fp"])
+    options["source"] = _fingerprint(params["fp"])
+    return hashlib.sha256(json.dumps(options, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+
+class JobCheckpoint:
+    """Manifest and finished chunk transcripts of one job."""
+
+    def __init__(self, job_id: str, root: str | os.PathLike | None = None):
+        """
+        Args:
+            job_id (str): Job id.
+            root (str | os.PathLike | None, optional): Checkpoint directory. Defaults to APP_CHECKPOINT_DIR
+                or "<APP_FILE_DUMP>.jobs".
+        """
+        self.job_id = job_id
+        self.dir = Path(root if root is not None else get_checkpoint_dir()) / job_id
+        self.manifest_path = self.dir / "manifest.json"
+
+    @classmethod
+    def open(
+        cls,
+        params: dict,
+        job_id: str | None = None,
+        root: str | os.PathLike | None = None,
+    ) -> "JobCheckpoint":
+        """
+        Open the checkpoint of a job, creating it if needed.
+
+        An existing checkpoint whose source recording changed since it was
+        written is started over, since its chunks no longer match.
+
+        Args:
+            params (dict): JSON-serializable keyword arguments of `main`; `params["fp"]` is the source.
+            job_id (str | None, optional): Job id. Defaults to `derive_job_id(params)`.
+            root (str | os.PathLike | None, optional): Checkpoint directory. Defaults to `get_checkpoint_dir()`.
+
+        Returns:
+            JobCheckpoint: Checkpoint with status "running".
+        """
+        checkpoint = cls(job_id or derive_job_id(params), root)
+        source = _fingerprint(params["fp"])
+        try:
+            manifest = checkpoint.read()
+        except FileNotFoundError:
+            manifest = None
+        if manifest is None or manifest.get("source") != source:
+            shutil.rmtree(checkpoint.dir, ignore_errors=True)
+            checkpoint.dir.mkdir(parents=True)
+            manifest = {"job_id": checkpoint.job_id, "created": time.time(), "source": source, "starts": None}
+        manifest.update(params=params, status=RUNNING, error="")
+        checkpoint._write(manifest)
+        return checkpoint
+
+    @classmethod
+    def load(cls, job_id: str, root: str | os.PathLike | None = None) -> "JobCheckpoint":
+        """
+        Look up the checkpoint of an earlier run.
+
+        Args:
+            job_id (str): Job id.
+            root (str | os.PathLike | None, optional): Checkpoint directory. Defaults to `get_checkpoint_dir()`.
+
+        Raises:
+            FileNotFoundError: Raised if the job has no checkpoint.
+
+        Returns:
+            JobCheckpoint: Existing checkpoint.
+        """
+        checkpoint = cls(job_id, root)
+        if not checkpoint.manifest_path.exists():
+            raise FileNotFoundError(f"No checkpoint for job {job_id} in {checkpoint.dir.parent}")
+        return checkpoint
+
+    def read(self) -> dict:
+        """Read the manifest."""
+        with open(self.manifest_path, "r", encoding="utf8") as f:
+            return json.load(f)
+
+    def _write(self, manifest: dict):
+        _atomic_write(self.manifest_path, json.dumps(manifest, indent=2))
+
+    def update(self, **values):
+        """Update fields of the manifest, e.g. `status` and `error`."""
+        manifest = self.read()
+        manifest.update(values)
+        self._write(manifest)
+
+    @property
+    def params(self) -> dict:
+        """Keyword arguments of `main` the job was started with."""
+        return self.read()["params"]
+
+    @property
+    def starts(self) -> list[float] | None:
+        """Start time of every chunk in seconds, or None before the recording was split."""
+        return self.read()["starts"]
+
+    def set_starts(self, starts: list[float]):
+        """Record the start time of every chunk, so a resumed run cuts the same chunks."""
+        self.update(starts=[float(s) for s in starts])
+
+    def _chunk_path(self, order: int) -> Path:
+        return self.dir / f"chunk_{order:05d}.txt"
+
+    def save_transcript(self, order: int, text: str):
+        """
+        Store the transcript of one finished chunk atomically.
+
+        Args:
+            order (int): Order of the chunk in the sequence.
+            text (str): Transcript of the chunk.
+        """
+        _atomic_write(self._chunk_path(order), text)
+
+    def transcripts(self) -> dict[int, str]:
+        """
+        Read the transcripts of every finished chunk.
+
+        Returns:
+            dict[int, str]: Transcript by chunk order.
+        """
+        return {
+            int(path.stem.split("_")[1]): path.read_text(encoding="utf8")
+            for path in self.dir.glob("chunk_*.txt")
+        }
+
+    def remove(self):
+        """Delete the checkpoint once the job's results are written."""
+        shutil.rmtree(self.dir, ignore_errors=True)
@@ -5,4 +5,7 @@ class GeminiApiKeyNotFound(Exception):
     pass
 
 class GeminiSummarizedFailed(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class TranscriptionFailed(Exception):
+    pass
@@ -0,0 +1,147 @@
+"""
+CPU-only local transcription with faster-whisper (CTranslate2, int8 quantized).
+
+Install the optional dependency with `pip install "audio-summary[local]"`.
+"""
+import io
+import os
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import IO
+
+from audio_summary.transcriber import TranscriptionBackend
+
+DEFAULT_LOCAL_WHISPER_MODEL = "small"
+DEFAULT_LOCAL_WHISPER_COMPUTE_TYPE = "int8"
+
+
+@functools.lru_cache(maxsize=None)
+def load_model(model_size: str = DEFAULT_LOCAL_WHISPER_MODEL, compute_type: str = DEFAULT_LOCAL_WHISPER_COMPUTE_TYPE, cpu_threads: int = 0):
+    """
+    Load a faster-whisper model once per process.
+
+    Args:
+        model_size (str, optional): Model size or path, e.g. "small" or "large-v3". Defaults to "small".
+        compute_type (str, optional): CTranslate2 compute type. Defaults to "int8".
+        cpu_threads (int, optional): Threads per model; 0 lets CTranslate2 decide. Defaults to 0.
+
+    Raises:
+        ImportError: Raised if faster-whisper is not installed.
+
+    Returns:
+        faster_whisper.WhisperModel: Loaded model.
+    """
+    try:
+        from faster_whisper import WhisperModel
+    except ImportError as e:
+        raise ImportError(
+            "Local transcription requires faster-whisper. Install it with `pip install \"audio-summary[local]\"`."
+        ) from e
+    return WhisperModel(model_size, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+
+
+_worker_model_args: tuple = ()
+
+
+def _init_worker(model_size: str, compute_type: str, cpu_threads: int):
+    """Process pool initializer: load the model before the first chunk arrives."""
+    global _worker_model_args
+    _worker_model_args = (model_size, compute_type, cpu_threads)
+    load_model(*_worker_model_args)
+
+
+def _transcribe_in_worker(file: str | tuple[str, bytes], language: str | None = None) -> str:
+    """Transcribe one chunk with the model of the current process."""
+    model = load_model(*_worker_model_args)
+    audio = io.BytesIO(file[1]) if isinstance(file, tuple) else file
+    segments, _ = model.transcribe(audio, language=language)
+    return "".join(seg.text for seg in segments).strip()
+
+
+class LocalWhisperBackend(TranscriptionBackend):
+    """
+    Transcribe chunks with faster-whisper over a pool of worker processes.
+
+    Each worker loads the model once in its initializer and reuses it for
+    every chunk it receives, so a long file keeps all cores busy.
+    """
+
+    def __init__(
+        self,
+        *,
+        model_size: str | None = None,
+        compute_type: str | None = None,
+        workers: int | None = None,
+        language: str | None = None,
+        use_processes: bool = True,
+    ):
+        """
+        Args:
+            model_size (str | None, optional): Model size or path. Defaults to LOCAL_WHISPER_MODEL or "small".
+            compute_type (str | None, optional): CTranslate2 compute type. Defaults to LOCAL_WHISPER_COMPUTE_TYPE or "int8".
+            workers (int | None, optional): Worker processes. Defaults to LOCAL_WHISPER_WORKERS or a quarter of the CPUs.
+            language (str | None, optional): Spoken language code; None auto-detects. Defaults to None.
+            use_processes (bool, optional): Use a process pool; False runs in one thread of this process. Defaults to True.
+        """
+        cpu_count = os.cpu_count() or 1
+        self.model_size = model_size or os.getenv("LOCAL_WHISPER_MODEL", DEFAULT_LOCAL_WHISPER_MODEL)
+        self.compute_type = compute_type or os.getenv("LOCAL_WHISPER_COMPUTE_TYPE", DEFAULT_LOCAL_WHISPER_COMPUTE_TYPE)
+        self.workers = workers or int(os.getenv("LOCAL_WHISPER_WORKERS", max(1, cpu_count // 4)))
+        self.language = language
+        self.use_processes = use_processes
+        self.cpu_threads = max(1, cpu_count // self.workers)
+        self.model = f"faster-whisper-{self.model_size}-{self.compute_type}"
+        self._executor: Executor | None = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            init_args = (self.model_size, self.compute_type, self.cpu_threads)
+            if self.use_processes:
+                # spawn: forking a process that already runs an event loop and threads is unsafe.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=init_args,
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, initializer=_init_worker, initargs=init_args
+                )
+        return self._executor
+
+    @property
+    def concurrency(self) -> int:
+        return self.workers if self.use_processes else 1
+
+    async def transcribe(self, file: str | tuple[str, bytes] | IO[bytes]) -> str:
+        if not isinstance(file, (str, tuple)):
+            file = (getattr(file, "name", "audio"), file.read())
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), _transcribe_in_worker, file, self.language
+        )
+
+    async def aclose(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_local_backend: LocalWhisperBackend | None = None
+
+
+def get_local_backend() -> LocalWhisperBackend:
+    """
+    Get the process-wide local backend, so the worker pool and its loaded models are reused across jobs.
+
+    Returns:
+        LocalWhisperBackend: Shared backend.
+    """
+    global _local_backend
+    if _local_backend is None:
+        _local_backend = LocalWhisperBackend()
+    return _local_backend
+
@@ -0,0 +1,141 @@
+import os
+import json
+import wave
+import functools
+import subprocess
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    """
+    Summary of a media file's first audio stream.
+
+    Attributes:
+        path (str): Real path of the probed file.
+        duration (float): Duration in seconds.
+        codec (str | None): Audio codec name, e.g. "mp3" or "pcm_s16le".
+        bit_rate (int | None): Bit rate in bits per second.
+        channels (int | None): Number of audio channels.
+        sample_rate (int | None): Sample rate in Hz.
+        size (int): File size in bytes.
+    """
+    path: str
+    duration: float
+    codec: str | None
+    bit_rate: int | None
+    channels: int | None
+    sample_rate: int | None
+    size: int
+
+
+def _probe_wav(path: str, size: int) -> MediaInfo:
+    """
+    Read duration and format from a PCM WAV header without decoding samples.
+
+    Raises:
+        wave.Error: Raised if the file is not a plain PCM WAV.
+        EOFError: Raised if the header is truncated.
+    """
+    with wave.open(path, "rb") as w:
+        channels = w.getnchannels()
+        sample_rate = w.getframerate()
+        sample_width = w.getsampwidth()
+        frames = w.getnframes()
+    codec = "pcm_u8" if sample_width == 1 else f"pcm_s{sample_width * 8}le"
+    return MediaInfo(
+        path=path,
+        duration=frames / sample_rate if sample_rate else 0.0,
+        codec=codec,
+        bit_rate=sample_rate * channels * sample_width * 8,
+        channels=channels,
+        sample_rate=sample_rate,
+        size=size,
+    )
+
+
+def _to_int(value) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _probe_ffprobe(path: str, size: int) -> MediaInfo:
+    """
+    Read duration and format from the container headers with ffprobe.
+
+    Raises:
+        RuntimeError: Raised if ffprobe exits with a non-zero status.
+    """
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration,bit_rate:stream=codec_type,codec_name,channels,sample_rate,bit_rate,duration",
+        "-of", "json",
+        path,
+    ]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffprobe exited with status {proc.returncode}: {proc.stderr.strip()}")
+
+    data = json.loads(proc.stdout or "{}")
+    fmt = data.get("format", {})
+    audio = next(
+        (s for s in data.get("streams", []) if s.get("codec_type") == "audio"),
+        {},
+    )
+    duration = fmt.get("duration") or audio.get("duration") or 0.0
+    return MediaInfo(
+        path=path,
+        duration=float(duration),
+        codec=audio.get("codec_name"),
+        bit_rate=_to_int(audio.get("bit_rate")) or _to_int(fmt.get("bit_rate")),
+        channels=_to_int(audio.get("channels")),
+        sample_rate=_to_int(audio.get("sample_rate")),
+        size=size,
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _probe_cached(path: str, mtime_ns: int, size: int) -> MediaInfo:
+    if os.path.splitext(path)[1].lower() == ".wav":
+        try:
+            return _probe_wav(path, size)
+        except (wave.Error, EOFError):
+            pass
+    return _probe_ffprobe(path, size)
+
+
+def probe(path: os.PathLike) -> MediaInfo:
+    """
+    Probe a media file, memoized per path and modification time.
+
+    PCM WAV files are read from their header directly; everything else goes
+    through a single ffprobe call that only parses container headers.
+
+    Args:
+        path (os.PathLike): Path to the media file.
+
+    Raises:
+        FileNotFoundError: Raised if the file does not exist.
+        RuntimeError: Raised if ffprobe cannot read the file.
+
+    Returns:
+        MediaInfo: Duration, codec, bit rate, channels, sample rate and size.
+    """
+    real_path = os.path.realpath(path)
+    st = os.stat(real_path)
+    return _probe_cached(real_path, st.st_mtime_ns, st.st_size)
+
+
+def get_duration(path: os.PathLike) -> float:
+    """
+    Get the duration of a media file in seconds.
+
+    Args:
+        path (os.PathLike): Path to the media file.
+
+    Returns:
+        float: Duration in seconds.
+    """
+    return probe(path).duration
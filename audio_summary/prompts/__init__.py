@@ -4,6 +4,8 @@ from audio_summary.prompts.lang import *
 
 __all__ = [
     "MEETING_MINUTES_SECRETARY",
+    "SECTION_OF_LONG_MEETING",
+    "MERGE_SECTION_MINUTES",
     "RESPONSE_IN_MARKDOWN",
     # Lang
     "ORIGINAL",
@@ -5,4 +5,16 @@ MEETING_MINUTES_SECRETARY = (
     "the difficult issue everybody was arguing hardly, "
     "the conclusion of the meeting, "
     "and the action items to follow up."
-)
\ No newline at end of file
+)
+
+SECTION_OF_LONG_MEETING = (
+    "This is part {index} of {total} of a long meeting transcription. "
+    "Note down the meeting minutes of this part only, as detail as possible; "
+    "they will be merged with the minutes of the other parts later."
+)
+
+MERGE_SECTION_MINUTES = (
+    "The following are the meeting minutes of consecutive parts of one meeting. "
+    "Merge them into a single meeting minutes, "
+    "removing duplicates while keeping every topic, argued issue, conclusion and action item."
+)
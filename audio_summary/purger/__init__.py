@@ -7,15 +7,23 @@
 from audio_summary.purger.purger import (
     Purger,
     setup_purger,
+    get_shared_purger,
+    get_quota_purger,
     start_scheduler,
     stop_scheduler,
-    purge_now
+    start_in_process_scheduler,
+    purge_now,
+    purge_cache_now
 )
 
 __all__ = [
     'Purger',
     'setup_purger',
+    'get_shared_purger',
+    'get_quota_purger',
     'start_scheduler',
     'stop_scheduler',
-    'purge_now'
+    'start_in_process_scheduler',
+    'purge_now',
+    'purge_cache_now'
 ]
@@ -8,14 +8,16 @@
 import os
 import sys
 import argparse
-import time
 from typing import List, Optional
 
+from audio_summary.cache import TranscriptCache
 from audio_summary.purger.purger import (
     setup_purger,
     start_scheduler,
     stop_scheduler,
-    purge_now
+    wait_scheduler,
+    purge_now,
+    purge_cache_now
 )
 
 
@@ -30,6 +32,7 @@ def parse_args():
             "檔案清理工具 - 清理應用程式產生的檔案\n"
             "Example: audio_summary_purger --purge-now --dump-dir $APP_FILE_DUMP\n"
             "Example: audio_summary_purger --start-scheduler --dump-dir $APP_FILE_DUMP\n"
+            "Example: audio_summary_purger --start-scheduler --interval-minutes 15 --min-free-bytes 5000000000\n"
             
         )
     )
@@ -46,6 +49,11 @@ def parse_args():
         action="store_true", 
         help="啟動清理排程器"
     )
+    action_group.add_argument(
+        "--purge-cache",
+        action="store_true",
+        help="立即依 LRU 淘汰逐字稿快取"
+    )
     
     # 配置選項
     parser.add_argument(
@@ -59,6 +67,21 @@ def parse_args():
         choices=["daily", "weekly", "monthly"],
         help="清理頻率 (預設: 每日)"
     )
+    parser.add_argument(
+        "--interval-minutes",
+        type=float,
+        help="每隔固定分鐘清理，設定時取代 --frequency (預設: PURGE_INTERVAL_MINUTES 環境變數，未設定則依頻率)"
+    )
+    parser.add_argument(
+        "--min-free-bytes",
+        type=int,
+        help="磁碟可用空間下限（位元組），低於下限時立即清理 (預設: PURGE_MIN_FREE_BYTES 環境變數，未設定則不檢查)"
+    )
+    parser.add_argument(
+        "--disk-check-seconds",
+        type=float,
+        help="檢查磁碟可用空間的間隔（秒） (預設: PURGE_DISK_CHECK_SECONDS 環境變數或 60)"
+    )
     parser.add_argument(
         "--age-days", 
         type=int, 
@@ -74,6 +97,47 @@ def parse_args():
         action="store_true", 
         help="僅模擬清理，不實際刪除檔案"
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        help="要管理的逐字稿快取目錄 (預設: TRANSCRIPT_CACHE_DIR 環境變數，未設定則不管理快取)"
+    )
+    parser.add_argument(
+        "--cache-max-bytes",
+        type=int,
+        help="逐字稿快取容量上限（位元組） (預設: TRANSCRIPT_CACHE_MAX_BYTES 環境變數或 256 MiB)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="刪除檔案的執行緒數 (預設: PURGE_WORKERS 環境變數或 8)"
+    )
+    parser.add_argument(
+        "--max-bytes",
+        type=int,
+        help="目錄容量上限（位元組），超過時由最舊的檔案開始淘汰 (預設: PURGE_MAX_BYTES 環境變數，未設定則不限制)"
+    )
+    parser.add_argument(
+        "--low-water",
+        type=float,
+        help="超過容量上限時淘汰至上限的比例 (預設: PURGE_LOW_WATER 環境變數或 0.8)"
+    )
+    parser.add_argument(
+        "--order-by",
+        type=str,
+        choices=["mtime", "atime"],
+        help="容量淘汰的順序依據 (預設: PURGE_ORDER_BY 環境變數或 mtime)"
+    )
+    parser.add_argument(
+        "--rescan-hours",
+        type=float,
+        help="使用清理索引時完整掃描的間隔（小時），0 表示本次完整掃描並重建索引 (預設: PURGE_RESCAN_HOURS 環境變數或 24)"
+    )
+    parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help="不使用清理索引，每次完整掃描"
+    )
     parser.add_argument(
         "--log-level", 
         type=str, 
@@ -101,7 +165,18 @@ def main():
         file_types=file_types,
         enabled=True,
         dry_run=args.dry_run,
-        log_level=args.log_level
+        log_level=args.log_level,
+        cache_dir=args.cache_dir,
+        cache_max_bytes=args.cache_max_bytes,
+        workers=args.workers,
+        max_bytes=args.max_bytes,
+        low_water=args.low_water,
+        order_by=args.order_by,
+        use_index=False if args.no_index else None,
+        rescan_hours=args.rescan_hours,
+        interval_minutes=args.interval_minutes,
+        min_free_bytes=args.min_free_bytes,
+        disk_check_seconds=args.disk_check_seconds
     )
     
     # 執行動作
@@ -110,15 +185,22 @@ def main():
         purged_count = purge_now(purger)
         print(f"已清理 {purged_count} 個檔案")
     
+    elif args.purge_cache:
+        # 立即淘汰逐字稿快取
+        if purger.cache_dir is None:
+            purger.cache_dir = TranscriptCache().cache_dir
+        evicted_count = purge_cache_now(purger)
+        print(f"已淘汰 {evicted_count} 個快取項目")
+
     elif args.start_scheduler:
         # 啟動排程器
-        start_scheduler(purger)
+        if not start_scheduler(purger):
+            sys.exit(1)
         print("排程器已啟動。按 Ctrl+C 停止...")
         
         try:
-            # 保持程式運行
-            while True:
-                time.sleep(1)
+            # 保持程式運行，直到排程器停止
+            wait_scheduler()
         except KeyboardInterrupt:
             # 停止排程器
             stop_scheduler()
@@ -0,0 +1,267 @@
+"""
+清理索引 (Purge index)
+
+以 SQLite 表記錄應用程式寫入的檔案（路徑、大小、mtime 與到期時間），
+排程清理只需查詢已到期的範圍，成本與過期檔案數成正比，而非目錄內的檔案總數。
+索引在清理時才與檔案系統比對；未登記的檔案由定期的完整掃描補上。
+佇列中、執行中或失敗待重試的工作所用的檔案記錄為釘選，不會因容量淘汰而刪除。
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import contextlib
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger('file_purger')
+
+DEFAULT_PURGE_AGE_DAYS = 7
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS files (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime REAL NOT NULL,
+        expires REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS files_expires ON files (expires)",
+    "CREATE INDEX IF NOT EXISTS files_mtime ON files (mtime)",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS pins (path TEXT PRIMARY KEY)",
+)
+
+# (路徑, 大小, mtime, 到期時間)
+Row = Tuple[str, int, float, float]
+
+
+def get_index_path(dump_dir: Optional[str] = None) -> str:
+    """取得清理索引的資料庫路徑
+
+    放在清理目錄之外，避免索引本身被清理。
+
+    Args:
+        dump_dir (Optional[str], optional): 清理目錄。預設為環境變數 APP_FILE_DUMP 或 "file_dump"
+
+    Returns:
+        str: 環境變數 PURGE_INDEX_DB，或 "<清理目錄>.index.sqlite3"
+    """
+    if os.getenv("PURGE_INDEX_DB"):
+        return os.path.expanduser(os.getenv("PURGE_INDEX_DB"))
+    dump_dir = dump_dir or os.getenv("APP_FILE_DUMP", "file_dump")
+    return os.path.normpath(os.path.abspath(dump_dir)) + ".index.sqlite3"
+
+
+def is_within(path: str, root: str) -> bool:
+    """檢查路徑是否位於目錄之內
+
+    Args:
+        path (str): 檔案路徑
+        root (str): 目錄
+
+    Returns:
+        bool: 是否位於目錄之內
+    """
+    path, root = os.path.abspath(path), os.path.abspath(root)
+    return path != root and os.path.commonpath([path, root]) == root
+
+
+class PurgeIndex:
+    """SQLite 清理索引，可由多個執行緒與行程同時使用"""
+
+    def __init__(self, path: str):
+        """初始化索引
+
+        Args:
+            path (str): 資料庫檔案
+        """
+        self.path = os.fspath(path)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def register(self, path: str, age_days: float, stat: Optional[os.stat_result] = None):
+        """登記或更新一個檔案
+
+        Args:
+            path (str): 檔案路徑
+            age_days (float): 檔案保存期限（天）
+            stat (Optional[os.stat_result], optional): 檔案的 stat 結果。預設為重新 stat
+        """
+        stat = stat or os.stat(path)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO files (path, size, mtime, expires) VALUES (?, ?, ?, ?)",
+                (os.path.abspath(path), stat.st_size, stat.st_mtime, stat.st_mtime + age_days * 86400),
+            )
+
+    def expired(self, now: float) -> List[Row]:
+        """查詢已到期的檔案
+
+        Args:
+            now (float): 現在時間
+
+        Returns:
+            List[Row]: 依到期時間排序的檔案
+        """
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT path, size, mtime, expires FROM files WHERE expires <= ? ORDER BY expires", (now,)
+            ).fetchall()
+
+    def oldest(self) -> Iterator[Row]:
+        """依 mtime 由舊到新產生所有檔案"""
+        with self._connect() as conn:
+            yield from conn.execute("SELECT path, size, mtime, expires FROM files ORDER BY mtime")
+
+    def usage(self) -> int:
+        """已登記檔案的總大小（位元組）"""
+        with self._connect() as conn:
+            return conn.execute("SELECT COALESCE(SUM(size), 0) FROM files").fetchone()[0]
+
+    def forget(self, paths: Iterable[str]):
+        """移除檔案的登記與釘選
+
+        Args:
+            paths (Iterable[str]): 檔案路徑
+        """
+        paths = [(p,) for p in paths]
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM files WHERE path = ?", paths)
+            conn.executemany("DELETE FROM pins WHERE path = ?", paths)
+
+    def pin(self, paths: Iterable[str]):
+        """釘選檔案，使其不因容量淘汰而刪除；到期清理不受影響
+
+        Args:
+            paths (Iterable[str]): 檔案路徑
+        """
+        with self._connect() as conn:
+            conn.executemany("INSERT OR IGNORE INTO pins (path) VALUES (?)", ((os.path.abspath(p),) for p in paths))
+
+    def unpin(self, paths: Iterable[str]):
+        """取消檔案的釘選
+
+        Args:
+            paths (Iterable[str]): 檔案路徑
+        """
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM pins WHERE path = ?", ((os.path.abspath(p),) for p in paths))
+
+    def pinned(self) -> Set[str]:
+        """已釘選檔案的絕對路徑"""
+        with self._connect() as conn:
+            return {row[0] for row in conn.execute("SELECT path FROM pins")}
+
+    def replace_all(self, rows: Iterable[Row], scanned_at: float):
+        """以完整掃描的結果重建索引
+
+        Args:
+            rows (Iterable[Row]): 掃描後留下的檔案
+            scanned_at (float): 掃描時間
+        """
+        with self._connect() as conn:
+            conn.execute("DELETE FROM files")
+            conn.executemany(
+                "INSERT OR REPLACE INTO files (path, size, mtime, expires) VALUES (?, ?, ?, ?)",
+                ((os.path.abspath(p), size, mtime, expires) for p, size, mtime, expires in rows),
+            )
+            # 已被清理的檔案不再保留釘選
+            conn.execute("DELETE FROM pins WHERE path NOT IN (SELECT path FROM files)")
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('full_scan', ?)", (scanned_at,))
+
+    def last_full_scan(self) -> Optional[float]:
+        """上次完整掃描的時間；從未掃描時為 None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'full_scan'").fetchone()
+        return row[0] if row else None
+
+
+@lru_cache(maxsize=None)
+def _open_index(path: str) -> PurgeIndex:
+    return PurgeIndex(path)
+
+
+def register_file(path: str, dump_dir: Optional[str] = None) -> bool:
+    """登記應用程式剛寫入的檔案，使其不需完整掃描即可依到期時間清理
+
+    只登記清理目錄內的檔案。登記失敗只記錄警告，不影響呼叫端。
+
+    Args:
+        path (str): 檔案路徑
+        dump_dir (Optional[str], optional): 清理目錄。預設為環境變數 APP_FILE_DUMP 或 "file_dump"
+
+    Returns:
+        bool: 是否已登記
+    """
+    if os.getenv("PURGE_USE_INDEX", "True").lower() != "true":
+        return False
+    dump_dir = dump_dir or os.getenv("APP_FILE_DUMP", "file_dump")
+    if not is_within(path, dump_dir):
+        return False
+    try:
+        age_days = float(os.getenv("PURGE_AGE_DAYS", DEFAULT_PURGE_AGE_DAYS))
+        _open_index(get_index_path(dump_dir)).register(path, age_days)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning("無法登記清理索引: %s - %s", path, e)
+        return False
+    return True
+
+
+def _set_pinned(paths: Iterable[str], pinned: bool, dump_dir: Optional[str]) -> bool:
+    dump_dir = dump_dir or os.getenv("APP_FILE_DUMP", "file_dump")
+    paths = [p for p in paths if is_within(p, dump_dir)]
+    if not paths:
+        return False
+    try:
+        index = _open_index(get_index_path(dump_dir))
+        if pinned:
+            index.pin(paths)
+        else:
+            index.unpin(paths)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning("無法更新清理索引的釘選: %s - %s", paths, e)
+        return False
+    return True
+
+
+def pin_files(paths: Iterable[str], dump_dir: Optional[str] = None) -> bool:
+    """釘選工作仍需要的檔案（例如上傳檔），使容量或磁碟空間淘汰略過它們
+
+    不論是否使用索引清理都會記錄；只釘選清理目錄內的檔案。失敗只記錄警告，不影響呼叫端。
+
+    Args:
+        paths (Iterable[str]): 檔案路徑
+        dump_dir (Optional[str], optional): 清理目錄。預設為環境變數 APP_FILE_DUMP 或 "file_dump"
+
+    Returns:
+        bool: 是否已釘選
+    """
+    return _set_pinned(paths, True, dump_dir)
+
+
+def unpin_files(paths: Iterable[str], dump_dir: Optional[str] = None) -> bool:
+    """取消 `pin_files` 的釘選，例如工作完成後
+
+    Args:
+        paths (Iterable[str]): 檔案路徑
+        dump_dir (Optional[str], optional): 清理目錄。預設為環境變數 APP_FILE_DUMP 或 "file_dump"
+
+    Returns:
+        bool: 是否已取消釘選
+    """
+    return _set_pinned(paths, False, dump_dir)
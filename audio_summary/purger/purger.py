@@ -6,12 +6,20 @@
 
 import os
 import time
+import heapq
+import shutil
 import logging
+import sqlite3
 import threading
 import schedule
 from pathlib import Path
-from datetime import datetime, timedelta
-from typing import List, Optional, Set, Union, Callable
+from datetime import datetime
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterator, List, Optional, Set, Union, Callable
+
+from audio_summary.cache import TranscriptCache
+from audio_summary.purger.index import PurgeIndex, _open_index, get_index_path, is_within
+from audio_summary.workspace import get_workspace_root, sweep_orphans
 
 # 設定日誌
 logging.basicConfig(
@@ -27,11 +35,25 @@ DEFAULT_PURGE_FILE_TYPES = None  # None 表示所有類型
 DEFAULT_PURGE_ENABLED = True
 DEFAULT_PURGE_DRY_RUN = False
 DEFAULT_PURGE_LOG_LEVEL = "INFO"
+DEFAULT_PURGE_WORKERS = 8  # 刪除在網路儲存上多為 I/O 等待，執行緒數可高於 CPU 數
+DEFAULT_PURGE_BATCH_SIZE = 256
+DEFAULT_PURGE_MAX_BYTES = None  # None 表示不限制容量
+DEFAULT_PURGE_LOW_WATER = 0.8  # 超過容量上限時，淘汰至上限的此比例
+DEFAULT_PURGE_ORDER_BY = "mtime"  # mtime 或 atime
+DEFAULT_PURGE_RESCAN_HOURS = 24  # 使用索引時，完整掃描的間隔
+DEFAULT_PURGE_INTERVAL_MINUTES = None  # None 表示依 frequency 於 03:00 清理
+DEFAULT_PURGE_MIN_FREE_BYTES = None  # None 表示不檢查磁碟可用空間
+DEFAULT_PURGE_DISK_CHECK_SECONDS = 60
 
-# 排程器
-scheduler = None
+# 排程器：執行緒睡到下一個排程時間，停止時由事件喚醒
+scheduler = schedule.Scheduler()
 scheduler_thread = None
-is_running = False
+_stop_event = threading.Event()
+_scheduler_lock = threading.Lock()
+
+# 伺服器共用的清理器
+_shared_purger = None
+_shared_purger_lock = threading.Lock()
 
 
 class Purger:
@@ -45,7 +67,20 @@ class Purger:
         file_types: Optional[List[str]] = DEFAULT_PURGE_FILE_TYPES,
         enabled: bool = DEFAULT_PURGE_ENABLED,
         dry_run: bool = DEFAULT_PURGE_DRY_RUN,
-        log_level: str = DEFAULT_PURGE_LOG_LEVEL
+        log_level: str = DEFAULT_PURGE_LOG_LEVEL,
+        cache_dir: Optional[Union[str, Path]] = None,
+        cache_max_bytes: Optional[int] = None,
+        workers: int = DEFAULT_PURGE_WORKERS,
+        batch_size: int = DEFAULT_PURGE_BATCH_SIZE,
+        max_bytes: Optional[int] = DEFAULT_PURGE_MAX_BYTES,
+        low_water: float = DEFAULT_PURGE_LOW_WATER,
+        order_by: str = DEFAULT_PURGE_ORDER_BY,
+        index_path: Optional[Union[str, Path]] = None,
+        rescan_hours: float = DEFAULT_PURGE_RESCAN_HOURS,
+        workspace_root: Optional[Union[str, Path]] = None,
+        interval_minutes: Optional[float] = DEFAULT_PURGE_INTERVAL_MINUTES,
+        min_free_bytes: Optional[int] = DEFAULT_PURGE_MIN_FREE_BYTES,
+        disk_check_seconds: float = DEFAULT_PURGE_DISK_CHECK_SECONDS
     ):
         """初始化清理器
 
@@ -57,13 +92,45 @@ class Purger:
             enabled (bool, optional): 是否啟用自動清理。預設為 True
             dry_run (bool, optional): 是否僅模擬清理（不實際刪除）。預設為 False
             log_level (str, optional): 日誌級別。預設為 "INFO"
+            cache_dir (Optional[Union[str, Path]], optional): 逐字稿快取目錄。預設為 None，表示不管理快取
+            cache_max_bytes (Optional[int], optional): 逐字稿快取容量上限（位元組）。預設為快取本身的設定
+            workers (int, optional): 刪除檔案的執行緒數。預設為 8
+            batch_size (int, optional): 每批交給執行緒刪除的檔案數。預設為 256
+            max_bytes (Optional[int], optional): 目錄容量上限（位元組），超過時由最舊的檔案開始淘汰。預設為 None，表示不限制
+            low_water (float, optional): 淘汰至容量上限的此比例為止。預設為 0.8
+            order_by (str, optional): 淘汰順序依據，可為 "mtime" 或 "atime"。預設為 "mtime"
+            index_path (Optional[Union[str, Path]], optional): 清理索引的資料庫路徑。預設為 None，表示每次完整掃描
+            rescan_hours (float, optional): 使用索引時，完整掃描以修正索引的間隔（小時）；0 表示每次完整掃描。預設為 24
+            workspace_root (Optional[Union[str, Path]], optional): 工作區根目錄，其中的工作區以整個目錄為單位清理。預設為 APP_WORKSPACE_DIR 或系統暫存目錄
+            interval_minutes (Optional[float], optional): 排程清理的間隔（分鐘），設定時取代 frequency。預設為 None
+            min_free_bytes (Optional[int], optional): 磁碟可用空間下限（位元組），低於下限時立即清理至回到下限。預設為 None，表示不檢查
+            disk_check_seconds (float, optional): 排程器檢查磁碟可用空間的間隔（秒）。預設為 60
         """
         self.dump_dir = Path(dump_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.cache_max_bytes = cache_max_bytes
         self.frequency = frequency
         self.age_days = age_days
         self.file_types = file_types
         self.enabled = enabled
         self.dry_run = dry_run
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        if order_by not in ("mtime", "atime"):
+            raise ValueError(f"order_by must be 'mtime' or 'atime', got {order_by!r}")
+        self.max_bytes = max_bytes
+        self.low_water = low_water
+        self.order_by = order_by
+        self.index = PurgeIndex(os.fspath(index_path)) if index_path is not None else None
+        self.rescan_hours = rescan_hours
+        self.workspace_root = Path(workspace_root) if workspace_root is not None else Path(get_workspace_root())
+        self.interval_minutes = interval_minutes
+        self.min_free_bytes = min_free_bytes
+        self.disk_check_seconds = disk_check_seconds
+        # 上次清理後的使用量，加上之後寫入的檔案；None 表示尚未掃描
+        self.usage_bytes: Optional[int] = None
+        self._usage_lock = threading.Lock()
+        self._purging = threading.Lock()
         
         # 設定日誌級別
         log_level_dict = {
@@ -77,78 +144,497 @@ class Purger:
         
         # 確保目錄存在
         if not self.dump_dir.exists():
-            logger.info(f"創建目錄: {self.dump_dir}")
+            logger.info("創建目錄: %s", self.dump_dir)
             self.dump_dir.mkdir(parents=True, exist_ok=True)
             
-        logger.info(f"清理器已初始化: 目錄={self.dump_dir}, 頻率={self.frequency}, 保存期限={self.age_days}天")
+        logger.info("清理器已初始化: 目錄=%s, 頻率=%s, 保存期限=%s天", self.dump_dir, self.frequency, self.age_days)
 
-    def purge_files(self) -> int:
+    def purge_files(self, free_bytes: int = 0) -> int:
         """執行檔案清理
 
+        先以整個目錄為單位清理已無執行中工作的工作區，再清理檔案。使用索引且上次
+        完整掃描未逾 `rescan_hours` 時，只查詢索引中已到期的檔案；否則完整掃描目錄
+        並重建索引。
+
+        Args:
+            free_bytes (int, optional): 至少要釋放的位元組數，例如磁碟可用空間的不足量；過期檔案
+                不足時，由最舊的檔案開始淘汰。預設為 0
+
         Returns:
-            int: 已清理的檔案數量
+            int: 已清理的檔案與工作區數量
         """
         if not self.enabled:
             logger.info("清理已禁用，跳過")
             return 0
             
         if not self.dump_dir.exists():
-            logger.warning(f"目錄不存在: {self.dump_dir}")
+            logger.warning("目錄不存在: %s", self.dump_dir)
             return 0
             
-        # 計算截止日期
-        cutoff_date = datetime.now() - timedelta(days=self.age_days)
-        cutoff_timestamp = cutoff_date.timestamp()
-        
-        logger.info(f"開始清理: 目錄={self.dump_dir}, 保存期限={self.age_days}天, 日期早於 {cutoff_date.strftime('%Y-%m-%d %H:%M:%S')} 的檔案將被清理")
+        # 計算截止時間（整次清理只取一次現在時間）
+        now = time.time()
+        cutoff_timestamp = now - self.age_days * 86400
         
-        # 計數器
-        purged_count = 0
+        logger.info(
+            "開始清理: 目錄=%s, 保存期限=%s天, 日期早於 %s 的檔案將被清理",
+            self.dump_dir, self.age_days, datetime.fromtimestamp(cutoff_timestamp).strftime('%Y-%m-%d %H:%M:%S')
+        )
+
+        workspaces = self.purge_workspaces()
+        if self.index is not None and not self._needs_full_scan(now):
+            return workspaces + self._purge_indexed(now, free_bytes)
+        return workspaces + self._purge_scan(now, cutoff_timestamp, free_bytes)
+
+    def purge_workspaces(self) -> int:
+        """清理孤立的工作區
+
+        工作區是單一工作的暫存目錄，整個目錄一併刪除，不逐檔判斷。擁有者行程已結束
+        的工作區立即清理；其他主機建立、無法確認擁有者的工作區超過保存期限才清理。
+        執行中工作的工作區不會被清理。
+
+        Returns:
+            int: 已清理的工作區數量
+        """
+        removed, freed = sweep_orphans(
+            self.workspace_root, stale_after=self.age_days * 86400, dry_run=self.dry_run
+        )
+        if removed:
+            logger.info("已清理 %d 個孤立的工作區 (%d bytes): %s", removed, freed, self.workspace_root)
+        return 0 if self.dry_run else removed
+
+    def _needs_full_scan(self, now: float) -> bool:
+        """索引未曾建立、已過期，或容量淘汰需要索引沒有的 atime 時，需完整掃描"""
+        if self.max_bytes is not None and self.order_by == "atime":
+            return True
+        last = self.index.last_full_scan()
+        return last is None or now - last >= self.rescan_hours * 3600
+
+    def _purge_scan(self, now: float, cutoff_timestamp: float, free_bytes: int = 0) -> int:
+        """完整掃描目錄並清理
+
+        以 `os.scandir` 迭代走訪目錄並沿用 `DirEntry` 的屬性，過期檔案分批交給
+        有上限的執行緒池刪除。設定容量上限時，掃描同時累計使用量，若超過上限，
+        將未過期且未被工作釘選的檔案依 mtime 或 atime 建成堆積，由最舊的開始淘汰至低水位；需釋放
+        `free_bytes` 時亦同。使用索引時，以留下的檔案重建索引。
+
+        Returns:
+            int: 已清理的檔案數量
+        """
         skipped_count = 0
+        file_types = set(self.file_types) if self.file_types is not None else None
+        evicting = self.max_bytes is not None or free_bytes > 0
+        need_stat = evicting or self.index is not None
+        usage = 0
+        expired_bytes = 0
+        candidates = []  # (時間, 路徑, 大小)，需淘汰時可淘汰的檔案
+        kept = []  # (路徑, 大小, mtime, 到期時間)，用於重建索引
+        evicted = set()
+        pinned = self._pinned() if evicting else set()
         
-        # 獲取所有檔案
-        for file_path in self.dump_dir.glob('**/*'):
-            if not file_path.is_file():
-                continue
-                
-            # 檢查檔案類型
-            if self.file_types is not None:
-                file_ext = file_path.suffix.lower()
-                if file_ext not in self.file_types:
-                    logger.debug(f"跳過不符合類型的檔案: {file_path}")
+        with _BatchDeleter(self.workers, self.batch_size) as deleter:
+            for entry in _iter_files(str(self.dump_dir), skip={os.path.abspath(self.workspace_root)}):
+                # 檢查檔案類型（不需記錄使用量時不需 stat）
+                matches = file_types is None or os.path.splitext(entry.name)[1].lower() in file_types
+                if not matches and not need_stat:
+                    logger.debug("跳過不符合類型的檔案: %s", entry.path)
                     skipped_count += 1
                     continue
-            
-            # 檢查檔案年齡
-            file_mtime = file_path.stat().st_mtime
-            if file_mtime >= cutoff_timestamp:
-                logger.debug(f"跳過較新的檔案: {file_path}")
-                skipped_count += 1
-                continue
-                
-            # 清理檔案
-            file_age_days = (datetime.now().timestamp() - file_mtime) / 86400
+
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue  # 掃描期間已被刪除
+                expires = stat.st_mtime + self.age_days * 86400
+                if not matches:
+                    logger.debug("跳過不符合類型的檔案: %s", entry.path)
+                    usage += stat.st_size
+                    kept.append((entry.path, stat.st_size, stat.st_mtime, expires))
+                    skipped_count += 1
+                    continue
+
+                # 檢查檔案年齡
+                if stat.st_mtime >= cutoff_timestamp:
+                    logger.debug("跳過較新的檔案: %s", entry.path)
+                    skipped_count += 1
+                    usage += stat.st_size
+                    if self.index is not None:
+                        kept.append((entry.path, stat.st_size, stat.st_mtime, expires))
+                    if evicting and os.path.abspath(entry.path) not in pinned:
+                        candidates.append((getattr(stat, f"st_{self.order_by}"), entry.path, stat.st_size))
+                    continue
+
+                expired_bytes += stat.st_size
+                if self.dry_run:
+                    logger.info("[DRY RUN] 將刪除: %s (已存在 %.1f 天)", entry.path, (now - stat.st_mtime) / 86400)
+                    continue
+                deleter.add(entry.path)
+
+            target = self._evict_target(usage, free_bytes - expired_bytes)
+            if target is not None:
+                usage = self._evict(usage, target, candidates, deleter, evicted)
+        purged_count = deleter.deleted
+
+        if not self.dry_run:
+            if self.max_bytes is not None:
+                with self._usage_lock:
+                    self.usage_bytes = usage
+            if self.index is not None:
+                self.index.replace_all((row for row in kept if row[0] not in evicted), now)
+        logger.info("清理完成: 已刪除 %d 個檔案, 已跳過 %d 個檔案", purged_count, skipped_count)
+        return purged_count
+
+    def _purge_indexed(self, now: float, free_bytes: int = 0) -> int:
+        """依索引清理，成本與已到期的檔案數成正比
+
+        到期的登記在此時才與檔案系統比對：已消失的檔案移除登記，被改寫過的
+        檔案依新的 mtime 更新到期時間。
+
+        Returns:
+            int: 已清理的檔案數量
+        """
+        file_types = set(self.file_types) if self.file_types is not None else None
+        forgotten = set()
+        freed = 0
+
+        def _purgeable(path: str, size: int, mtime: float) -> Optional[os.stat_result]:
+            if not is_within(path, str(self.dump_dir)):
+                forgotten.add(path)
+                return None
+            if file_types is not None and os.path.splitext(path)[1].lower() not in file_types:
+                return None
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                forgotten.add(path)
+                return None
+            if stat.st_mtime != mtime or stat.st_size != size:
+                self.index.register(path, self.age_days, stat)
+            return stat
+
+        with _BatchDeleter(self.workers, self.batch_size) as deleter:
+            for path, size, mtime, _ in self.index.expired(now):
+                stat = _purgeable(path, size, mtime)
+                if stat is None or stat.st_mtime + self.age_days * 86400 > now:
+                    continue
+                if self.dry_run:
+                    logger.info("[DRY RUN] 將刪除: %s (已存在 %.1f 天)", path, (now - stat.st_mtime) / 86400)
+                    continue
+                deleter.add(path)
+                forgotten.add(path)
+                freed += stat.st_size
+
+            if self.max_bytes is not None or free_bytes > 0:
+                usage = self.index.usage() - freed
+                target = self._evict_target(usage, free_bytes - freed)
+                if target is not None:
+                    # 只讀取淘汰所需的最舊登記
+                    candidates = []
+                    need = usage - target
+                    pinned = self._pinned()
+                    for path, size, mtime, _ in self.index.oldest():
+                        if need <= 0:
+                            break
+                        if path in forgotten or path in pinned:
+                            continue
+                        if (stat := _purgeable(path, size, mtime)) is None:
+                            if path in forgotten:  # 已消失的檔案不再計入使用量
+                                usage -= size
+                                need -= size
+                            continue
+                        candidates.append((stat.st_mtime, path, stat.st_size))
+                        need -= stat.st_size
+                    evicted = set()
+                    usage = self._evict(usage, target, candidates, deleter, evicted)
+                    forgotten |= evicted
+                if not self.dry_run and self.max_bytes is not None:
+                    with self._usage_lock:
+                        self.usage_bytes = usage
+        purged_count = deleter.deleted
+
+        if not self.dry_run:
+            self.index.forget(forgotten)
+        logger.info("依索引清理完成: 已刪除 %d 個檔案", purged_count)
+        return purged_count
+
+    def _pinned(self) -> Set[str]:
+        """佇列中、執行中或失敗待重試的工作所釘選的檔案，不列入淘汰候選
+
+        不使用索引清理時，仍讀取預設索引路徑中的釘選（若存在）。
+        """
+        index = self.index
+        if index is None:
+            path = get_index_path(str(self.dump_dir))
+            if not os.path.exists(path):
+                return set()
+            index = _open_index(path)
+        try:
+            return index.pinned()
+        except sqlite3.Error as e:
+            logger.warning("無法讀取釘選的檔案: %s", e)
+            return set()
+
+    def _evict_target(self, usage: int, free_bytes: int) -> Optional[int]:
+        """計算淘汰後的目標使用量
+
+        Args:
+            usage (int): 目前使用量（位元組）
+            free_bytes (int): 過期檔案之外仍需釋放的位元組數
+
+        Returns:
+            Optional[int]: 超過容量上限時為低水位，需釋放空間時再扣除不足量，取較低者；不需淘汰時為 None
+        """
+        targets = []
+        if self.max_bytes is not None and usage > self.max_bytes:
+            targets.append(int(self.max_bytes * self.low_water))
+        if free_bytes > 0:
+            targets.append(max(0, usage - free_bytes))
+        return min(targets) if targets else None
+
+    def _evict(self, usage: int, target: int, candidates: list, deleter: "_BatchDeleter", evicted: Set[str]) -> int:
+        """將候選檔案建成堆積，由最舊的開始淘汰至目標使用量
+
+        Args:
+            usage (int): 目前使用量（位元組）
+            target (int): 目標使用量（位元組）
+            candidates (list): (時間, 路徑, 大小) 的候選檔案
+            deleter (_BatchDeleter): 刪除器
+            evicted (Set[str]): 收集已淘汰的路徑
+
+        Returns:
+            int: 淘汰後的使用量
+        """
+        logger.info("使用量 %d bytes，依 %s 淘汰至 %d bytes", usage, self.order_by, target)
+        heapq.heapify(candidates)
+        while candidates and usage > target:
+            _, path, size = heapq.heappop(candidates)
+            usage -= size
             if self.dry_run:
-                logger.info(f"[DRY RUN] 將刪除: {file_path} (已存在 {file_age_days:.1f} 天)")
+                logger.info("[DRY RUN] 將因容量淘汰刪除: %s (%d bytes)", path, size)
             else:
+                logger.debug("因容量淘汰刪除: %s (%d bytes)", path, size)
+                deleter.add(path)
+                evicted.add(path)
+        return usage
+
+    def record_write(self, nbytes: int) -> bool:
+        """記錄應用程式剛寫入的檔案大小，使用量達容量上限（高水位）時在背景清理
+
+        使用量由上次清理的掃描結果累加而來，不需每次重新掃描目錄。
+
+        Args:
+            nbytes (int): 寫入的位元組數
+
+        Returns:
+            bool: 是否啟動了背景清理
+        """
+        if self.max_bytes is None:
+            return False
+        with self._usage_lock:
+            if self.usage_bytes is not None:
+                self.usage_bytes += nbytes
+            due = self.usage_bytes is None or self.usage_bytes > self.max_bytes
+        return self.purge_in_background() if due else False
+
+    def purge_in_background(self) -> bool:
+        """在背景執行緒執行一次檔案清理，同時最多一個
+
+        Returns:
+            bool: 是否啟動了清理；已有清理進行中時為 False
+        """
+        if not self._purging.acquire(blocking=False):
+            return False
+
+        def _run():
+            try:
+                self.purge_files()
+            except Exception:
+                logger.exception("背景清理失敗")
+            finally:
+                self._purging.release()
+
+        threading.Thread(target=_run, name="purger-quota", daemon=True).start()
+        return True
+
+    def check_disk_pressure(self) -> int:
+        """檢查磁碟可用空間，低於下限時立即清理
+
+        除了過期檔案，再由最舊的檔案開始淘汰，直到釋放的空間補足可用空間的不足量。
+
+        Returns:
+            int: 已清理的檔案與工作區數量；可用空間足夠時為 0
+        """
+        if not self.enabled or self.min_free_bytes is None:
+            return 0
+        try:
+            free = shutil.disk_usage(self.dump_dir).free
+        except OSError as e:
+            logger.warning("無法取得磁碟可用空間: %s - %s", self.dump_dir, e)
+            return 0
+        if free >= self.min_free_bytes:
+            return 0
+        logger.warning("磁碟可用空間 %d bytes 低於下限 %d bytes，立即清理", free, self.min_free_bytes)
+        return self.purge_files(free_bytes=self.min_free_bytes - free)
+
+    def run_exclusive(self, job: Callable[[], int]) -> int:
+        """執行一次清理工作，與其他清理（包含背景清理）同時最多一個
+
+        供排程器呼叫：已有清理進行中時略過本次，工作失敗只記錄錯誤，不中斷排程器。
+
+        Args:
+            job (Callable[[], int]): 清理工作，例如 `purge_all`
+
+        Returns:
+            int: 清理工作的回傳值；略過或失敗時為 0
+        """
+        if not self._purging.acquire(blocking=False):
+            logger.info("已有清理進行中，略過本次排程")
+            return 0
+        try:
+            return job()
+        except Exception:
+            logger.exception("排程清理失敗")
+            return 0
+        finally:
+            self._purging.release()
+
+    def purge_cache(self) -> int:
+        """依 LRU 淘汰逐字稿快取，直到低於容量上限
+
+        Returns:
+            int: 已淘汰的快取項目數量
+        """
+        if not self.enabled or self.cache_dir is None:
+            return 0
+
+        cache = TranscriptCache(self.cache_dir, self.cache_max_bytes)
+        if self.dry_run:
+            logger.info("[DRY RUN] 將淘汰快取: 目錄=%s, 容量上限=%s bytes", cache.cache_dir, cache.max_bytes)
+            return 0
+
+        evicted = cache.evict()
+        logger.info("快取淘汰完成: 目錄=%s, 已淘汰 %d 個項目", cache.cache_dir, evicted)
+        return evicted
+
+    def purge_all(self) -> int:
+        """執行檔案清理與快取淘汰
+
+        Returns:
+            int: 已清理的檔案與快取項目數量
+        """
+        return self.purge_files() + self.purge_cache()
+
+
+def _iter_files(root: str, skip: Set[str] = frozenset()) -> Iterator[os.DirEntry]:
+    """以堆疊迭代走訪目錄，產生所有檔案的 `DirEntry`
+
+    不跟隨目錄的符號連結，避免循環。
+
+    Args:
+        root (str): 起始目錄
+        skip (Set[str], optional): 不走訪的目錄絕對路徑，例如另行以單位清理的工作區根目錄
+
+    Yields:
+        os.DirEntry: 檔案項目，其 `stat()` 結果會被快取
+    """
+    stack = [root]
+    while stack:
+        path = stack.pop()
+        try:
+            entries = os.scandir(path)
+        except OSError as e:
+            logger.warning("無法讀取目錄: %s - %s", path, e)
+            continue
+        with entries:
+            for entry in entries:
                 try:
-                    logger.info(f"刪除檔案: {file_path} (已存在 {file_age_days:.1f} 天)")
-                    file_path.unlink()
-                    purged_count += 1
-                except Exception as e:
-                    logger.error(f"刪除檔案時出錯: {file_path} - {e}")
-        
-        logger.info(f"清理完成: 已刪除 {purged_count} 個檔案, 已跳過 {skipped_count} 個檔案")
-        return purged_count
+                    if entry.is_dir(follow_symlinks=False):
+                        if not skip or os.path.abspath(entry.path) not in skip:
+                            stack.append(entry.path)
+                    elif entry.is_file():
+                        yield entry
+                except OSError:
+                    continue
+
+
+def _unlink_batch(paths: List[str]) -> int:
+    """刪除一批檔案
+
+    Args:
+        paths (List[str]): 檔案路徑
+
+    Returns:
+        int: 成功刪除的檔案數量
+    """
+    deleted = 0
+    for path in paths:
+        try:
+            os.unlink(path)
+            deleted += 1
+            logger.debug("刪除檔案: %s", path)
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            logger.error("刪除檔案時出錯: %s - %s", path, e)
+    return deleted
+
+
+class _BatchDeleter:
+    """將檔案分批交給有上限的執行緒池刪除
+
+    Args:
+        workers (int): 執行緒數
+        batch_size (int): 每批的檔案數
+    """
+
+    def __init__(self, workers: int, batch_size: int):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.deleted = 0
+        self._batch: List[str] = []
+        self._pending = set()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="purger")
+
+    def add(self, path: str):
+        """排入一個要刪除的檔案"""
+        self._batch.append(path)
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+            # 限制排隊中的批次，避免掃描遠快於刪除時佔用大量記憶體
+            if len(self._pending) >= 2 * self.workers:
+                done, self._pending = wait(self._pending, return_when=FIRST_COMPLETED)
+                self.deleted += sum(f.result() for f in done)
+
+    def _flush(self):
+        if self._batch:
+            self._pending.add(self._pool.submit(_unlink_batch, self._batch))
+            self._batch = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._flush()
+        self._pool.shutdown(wait=True)
+        self.deleted += sum(f.result() for f in self._pending)
+        self._pending = set()
 
 
 def _run_scheduler():
-    """在排程器執行緒中運行排程器"""
-    global is_running
-    is_running = True
-    while is_running:
-        schedule.run_pending()
-        time.sleep(1)
+    """在排程器執行緒中運行排程器
+
+    每次執行到期的工作後，睡到下一個工作的排程時間，而非每秒輪詢；停止時由事件立即喚醒。
+    """
+    while not _stop_event.is_set():
+        scheduler.run_pending()
+        idle = scheduler.idle_seconds
+        _stop_event.wait(None if idle is None else max(0.0, idle))
+
+
+def _purge_on_first_of_month(purger: Purger) -> int:
+    """每日觸發，只在每月1日清理（schedule 不支援以月為單位的排程）"""
+    if datetime.now().day != 1:
+        return 0
+    return purger.run_exclusive(purger.purge_all)
 
 
 def setup_purger(
@@ -158,7 +644,18 @@ def setup_purger(
     file_types: Optional[List[str]] = None,
     enabled: bool = None,
     dry_run: bool = None,
-    log_level: str = None
+    log_level: str = None,
+    cache_dir: Optional[Union[str, Path]] = None,
+    cache_max_bytes: Optional[int] = None,
+    workers: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    low_water: Optional[float] = None,
+    order_by: Optional[str] = None,
+    use_index: Optional[bool] = None,
+    rescan_hours: Optional[float] = None,
+    interval_minutes: Optional[float] = None,
+    min_free_bytes: Optional[int] = None,
+    disk_check_seconds: Optional[float] = None
 ) -> Purger:
     """設置清理器
 
@@ -170,6 +667,17 @@ def setup_purger(
         enabled (bool, optional): 是否啟用自動清理。
         dry_run (bool, optional): 是否僅模擬清理（不實際刪除）。
         log_level (str, optional): 日誌級別。
+        cache_dir (Optional[Union[str, Path]], optional): 逐字稿快取目錄，如果為 None，則使用環境變數 TRANSCRIPT_CACHE_DIR。
+        cache_max_bytes (Optional[int], optional): 逐字稿快取容量上限，如果為 None，則使用環境變數 TRANSCRIPT_CACHE_MAX_BYTES。
+        workers (Optional[int], optional): 刪除檔案的執行緒數，如果為 None，則使用環境變數 PURGE_WORKERS。
+        max_bytes (Optional[int], optional): 目錄容量上限（位元組），如果為 None，則使用環境變數 PURGE_MAX_BYTES。
+        low_water (Optional[float], optional): 淘汰至容量上限的比例，如果為 None，則使用環境變數 PURGE_LOW_WATER。
+        order_by (Optional[str], optional): 淘汰順序依據 "mtime" 或 "atime"，如果為 None，則使用環境變數 PURGE_ORDER_BY。
+        use_index (Optional[bool], optional): 是否使用清理索引，如果為 None，則使用環境變數 PURGE_USE_INDEX（預設為 True）。
+        rescan_hours (Optional[float], optional): 完整掃描的間隔（小時），如果為 None，則使用環境變數 PURGE_RESCAN_HOURS。
+        interval_minutes (Optional[float], optional): 排程清理的間隔（分鐘），如果為 None，則使用環境變數 PURGE_INTERVAL_MINUTES。
+        min_free_bytes (Optional[int], optional): 磁碟可用空間下限（位元組），如果為 None，則使用環境變數 PURGE_MIN_FREE_BYTES。
+        disk_check_seconds (Optional[float], optional): 檢查磁碟可用空間的間隔（秒），如果為 None，則使用環境變數 PURGE_DISK_CHECK_SECONDS。
 
     Returns:
         Purger: 清理器實例
@@ -195,6 +703,39 @@ def setup_purger(
     
     if log_level is None:
         log_level = os.getenv("PURGE_LOG_LEVEL", DEFAULT_PURGE_LOG_LEVEL)
+
+    if cache_dir is None and os.getenv("TRANSCRIPT_CACHE_DIR"):
+        cache_dir = os.path.expanduser(os.getenv("TRANSCRIPT_CACHE_DIR"))
+
+    if cache_max_bytes is None and os.getenv("TRANSCRIPT_CACHE_MAX_BYTES"):
+        cache_max_bytes = int(os.getenv("TRANSCRIPT_CACHE_MAX_BYTES"))
+
+    if workers is None:
+        workers = int(os.getenv("PURGE_WORKERS", DEFAULT_PURGE_WORKERS))
+
+    if max_bytes is None and os.getenv("PURGE_MAX_BYTES"):
+        max_bytes = int(os.getenv("PURGE_MAX_BYTES"))
+
+    if low_water is None:
+        low_water = float(os.getenv("PURGE_LOW_WATER", DEFAULT_PURGE_LOW_WATER))
+
+    if order_by is None:
+        order_by = os.getenv("PURGE_ORDER_BY", DEFAULT_PURGE_ORDER_BY).lower()
+
+    if use_index is None:
+        use_index = os.getenv("PURGE_USE_INDEX", "True").lower() == "true"
+
+    if rescan_hours is None:
+        rescan_hours = float(os.getenv("PURGE_RESCAN_HOURS", DEFAULT_PURGE_RESCAN_HOURS))
+
+    if interval_minutes is None and os.getenv("PURGE_INTERVAL_MINUTES"):
+        interval_minutes = float(os.getenv("PURGE_INTERVAL_MINUTES"))
+
+    if min_free_bytes is None and os.getenv("PURGE_MIN_FREE_BYTES"):
+        min_free_bytes = int(os.getenv("PURGE_MIN_FREE_BYTES"))
+
+    if disk_check_seconds is None:
+        disk_check_seconds = float(os.getenv("PURGE_DISK_CHECK_SECONDS", DEFAULT_PURGE_DISK_CHECK_SECONDS))
     
     # 創建清理器實例
     return Purger(
@@ -204,46 +745,111 @@ def setup_purger(
         file_types=file_types,
         enabled=enabled,
         dry_run=dry_run,
-        log_level=log_level
+        log_level=log_level,
+        cache_dir=cache_dir,
+        cache_max_bytes=cache_max_bytes,
+        workers=workers,
+        max_bytes=max_bytes,
+        low_water=low_water,
+        order_by=order_by,
+        index_path=get_index_path(str(dump_dir)) if use_index else None,
+        rescan_hours=rescan_hours,
+        interval_minutes=interval_minutes,
+        min_free_bytes=min_free_bytes,
+        disk_check_seconds=disk_check_seconds
     )
 
 
+def get_shared_purger(dump_dir: Union[str, Path] = None) -> Purger:
+    """取得行程共用的清理器，供伺服器內的排程器與上傳時的容量清理共用
+
+    Args:
+        dump_dir (Union[str, Path], optional): 要清理的目錄路徑，如果為 None，則使用環境變數 APP_FILE_DUMP。
+
+    Returns:
+        Purger: 清理器實例
+    """
+    global _shared_purger
+    with _shared_purger_lock:
+        if _shared_purger is None:
+            _shared_purger = setup_purger(dump_dir=dump_dir)
+        return _shared_purger
+
+
+def get_quota_purger(dump_dir: Union[str, Path] = None) -> Optional[Purger]:
+    """取得行程共用的容量上限清理器，讓上傳檔案時可依使用量即時清理
+
+    Args:
+        dump_dir (Union[str, Path], optional): 要清理的目錄路徑，如果為 None，則使用環境變數 APP_FILE_DUMP。
+
+    Returns:
+        Optional[Purger]: 清理器實例；未設定 PURGE_MAX_BYTES 時為 None
+    """
+    if not os.getenv("PURGE_MAX_BYTES"):
+        return None
+    return get_shared_purger(dump_dir)
+
+
 def start_scheduler(purger: Purger) -> bool:
     """啟動排程器
 
+    設定 `interval_minutes` 時每隔固定分鐘清理，否則依頻率於 03:00 清理；設定
+    `min_free_bytes` 時另外每隔 `disk_check_seconds` 秒檢查磁碟可用空間。排程的
+    清理與上傳觸發的背景清理同時最多一個。
+
     Args:
         purger (Purger): 清理器實例
 
     Returns:
         bool: 是否成功啟動
     """
-    global scheduler, scheduler_thread, is_running
-    
-    if scheduler_thread and scheduler_thread.is_alive():
-        logger.warning("排程器已在運行中")
-        return False
-    
-    # 清除現有排程
-    schedule.clear()
-    
-    # 根據頻率設定排程
-    if purger.frequency.lower() == "daily":
-        schedule.every().day.at("03:00").do(purger.purge_files)
-        logger.info("已設定每日清理排程 (03:00)")
-    elif purger.frequency.lower() == "weekly":
-        schedule.every().monday.at("03:00").do(purger.purge_files)
-        logger.info("已設定每週清理排程 (週一 03:00)")
-    elif purger.frequency.lower() == "monthly":
-        schedule.every().month.day(1).at("03:00").do(purger.purge_files)
-        logger.info("已設定每月清理排程 (每月1日 03:00)")
-    else:
-        logger.error(f"無效的頻率: {purger.frequency}")
-        return False
-    
-    # 啟動排程器執行緒
-    scheduler_thread = threading.Thread(target=_run_scheduler, daemon=True)
-    scheduler_thread.start()
-    
+    global scheduler_thread
+
+    with _scheduler_lock:
+        if scheduler_thread and scheduler_thread.is_alive():
+            logger.warning("排程器已在運行中")
+            return False
+
+        # 清除現有排程
+        scheduler.clear()
+
+        def purge_all() -> int:
+            return purger.run_exclusive(purger.purge_all)
+
+        # 根據間隔或頻率設定排程
+        frequency = purger.frequency.lower()
+        if purger.interval_minutes is not None:
+            if purger.interval_minutes <= 0:
+                logger.error("無效的清理間隔: %s 分鐘", purger.interval_minutes)
+                return False
+            scheduler.every(purger.interval_minutes).minutes.do(purge_all)
+            logger.info("已設定清理排程 (每 %s 分鐘)", purger.interval_minutes)
+        elif frequency == "daily":
+            scheduler.every().day.at("03:00").do(purge_all)
+            logger.info("已設定每日清理排程 (03:00)")
+        elif frequency == "weekly":
+            scheduler.every().monday.at("03:00").do(purge_all)
+            logger.info("已設定每週清理排程 (週一 03:00)")
+        elif frequency == "monthly":
+            scheduler.every().day.at("03:00").do(_purge_on_first_of_month, purger)
+            logger.info("已設定每月清理排程 (每月1日 03:00)")
+        else:
+            logger.error("無效的頻率: %s", purger.frequency)
+            return False
+
+        if purger.min_free_bytes is not None:
+            scheduler.every(purger.disk_check_seconds).seconds.do(
+                purger.run_exclusive, purger.check_disk_pressure
+            )
+            logger.info(
+                "已設定磁碟空間檢查 (每 %s 秒，可用空間下限 %d bytes)", purger.disk_check_seconds, purger.min_free_bytes
+            )
+
+        # 啟動排程器執行緒
+        _stop_event.clear()
+        scheduler_thread = threading.Thread(target=_run_scheduler, name="purger-scheduler", daemon=True)
+        scheduler_thread.start()
+
     logger.info("清理排程器已啟動")
     return True
 
@@ -254,22 +860,46 @@ def stop_scheduler() -> bool:
     Returns:
         bool: 是否成功停止
     """
-    global scheduler_thread, is_running
-    
-    if not scheduler_thread or not scheduler_thread.is_alive():
-        logger.warning("排程器未在運行中")
-        return False
-    
-    is_running = False
-    schedule.clear()
-    
-    # 等待排程器執行緒結束
-    scheduler_thread.join(timeout=2.0)
-    
+    with _scheduler_lock:
+        if not scheduler_thread or not scheduler_thread.is_alive():
+            logger.warning("排程器未在運行中")
+            return False
+
+        _stop_event.set()
+        scheduler.clear()
+
+        # 等待排程器執行緒結束（執行中的清理完成後才會結束）
+        scheduler_thread.join(timeout=2.0)
+
     logger.info("清理排程器已停止")
     return True
 
 
+def wait_scheduler():
+    """阻塞直到排程器停止，供命令行工具保持運行
+
+    等待停止事件而非 join 排程器執行緒：部分 Python 版本中，被 Ctrl+C 中斷的 join 會把執行緒誤標為已結束。
+    """
+    if scheduler_thread is not None and scheduler_thread.is_alive():
+        _stop_event.wait()
+
+
+def start_in_process_scheduler(dump_dir: Union[str, Path] = None) -> bool:
+    """在目前的行程（例如 Streamlit 伺服器）中啟動排程器，取代另外執行的清理行程
+
+    可重複呼叫：排程器已在運行時不做任何事。排程器與上傳時的容量清理共用同一個清理器。
+
+    Args:
+        dump_dir (Union[str, Path], optional): 要清理的目錄路徑，如果為 None，則使用環境變數 APP_FILE_DUMP。
+
+    Returns:
+        bool: 排程器是否在運行
+    """
+    if scheduler_thread is None or not scheduler_thread.is_alive():
+        start_scheduler(get_shared_purger(dump_dir))
+    return scheduler_thread is not None and scheduler_thread.is_alive()
+
+
 def purge_now(purger: Purger) -> int:
     """立即執行清理
 
@@ -283,6 +913,19 @@ def purge_now(purger: Purger) -> int:
     return purger.purge_files()
 
 
+def purge_cache_now(purger: Purger) -> int:
+    """立即淘汰逐字稿快取
+
+    Args:
+        purger (Purger): 清理器實例
+
+    Returns:
+        int: 已淘汰的快取項目數量
+    """
+    logger.info("立即淘汰逐字稿快取")
+    return purger.purge_cache()
+
+
 # 使用範例
 if __name__ == "__main__":
     # 初始化清理器
@@ -297,8 +940,7 @@ if __name__ == "__main__":
     
     try:
         # 保持程式運行
-        while True:
-            time.sleep(1)
+        wait_scheduler()
     except KeyboardInterrupt:
         # 停止排程器
         stop_scheduler()
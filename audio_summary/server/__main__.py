@@ -1,13 +1,23 @@
 import os
-import audio_summary.server.run as main_script
+import sys
 from dotenv import load_dotenv
 load_dotenv()
 
 def main():
-    __target = os.path.realpath(main_script.__file__)
+    # Resolve the script by path: importing it here would load Streamlit into the launcher.
+    __target = os.path.realpath(os.path.join(os.path.dirname(__file__), "run.py"))
     MAX_UPLOAD_SIZE = os.getenv("MAX_FILE_SIZE", "1024")
+    if os.getenv("PURGE_IN_PROCESS", "False").lower() == "true":
+        # Serve from this process and start the purge schedule with it, not with the first page visit:
+        # a restarted server that nobody opens must still purge. The script's own call is then a no-op.
+        from streamlit.web import cli as stcli
+        from audio_summary.purger import start_in_process_scheduler
+
+        start_in_process_scheduler()
+        sys.argv = ["streamlit", "run", __target, "--server.maxUploadSize", MAX_UPLOAD_SIZE]
+        sys.exit(stcli.main())
     cmd = ' '.join(["streamlit", "run",  f"{repr(__target)}", "--server.maxUploadSize", MAX_UPLOAD_SIZE])
     os.system(cmd)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,102 @@
+"""
+Summary exports for the Streamlit server.
+
+Conversions are memoized by content hash: the file of a summary is named
+after the SHA-256 of its format and text, so a rerun with an unchanged
+summary finds it on disk instead of starting pandoc again. Exports are
+only rendered when a download is requested, into a directory per session,
+and are registered in the purge index.
+"""
+import os
+import hashlib
+import tempfile
+from dataclasses import dataclass
+
+from audio_summary.purger.index import register_file
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    """
+    One download format of the summary.
+
+    Attributes:
+        label (str): Button label.
+        ext (str): File extension.
+        mime (str): MIME type of the download.
+        pandoc_to (str): pandoc output format.
+        extra_args (tuple[str, ...]): Extra pandoc arguments.
+    """
+    label: str
+    ext: str
+    mime: str
+    pandoc_to: str
+    extra_args: tuple[str, ...] = ()
+
+
+EXPORT_FORMATS: dict[str, ExportFormat] = {
+    "docx": ExportFormat(
+        "docx", ".docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", "docx"
+    ),
+    "html": ExportFormat("HTML", ".html", "text/html", "html", ("--standalone", "--metadata", "pagetitle=Summary")),
+    # Needs a PDF engine, LaTeX by default; set APP_PDF_ENGINE to use e.g. wkhtmltopdf instead.
+    "pdf": ExportFormat("PDF", ".pdf", "application/pdf", "pdf"),
+}
+
+
+def export_key(text: str, fmt: str) -> str:
+    """
+    Compute the content hash naming an export.
+
+    Args:
+        text (str): Markdown to export.
+        fmt (str): Key of `EXPORT_FORMATS`.
+
+    Returns:
+        str: Hex digest of the format and the text.
+    """
+    return hashlib.sha256(f"{fmt}\0{text}".encode()).hexdigest()
+
+
+def _convert(text: str, spec: ExportFormat, output: str):
+    import pypandoc  # only needed once an export is requested
+
+    extra_args = list(spec.extra_args)
+    if spec.pandoc_to == "pdf" and (engine := os.getenv("APP_PDF_ENGINE")):
+        extra_args.append(f"--pdf-engine={engine}")
+    pypandoc.convert_text(text, spec.pandoc_to, format="md", outputfile=output, extra_args=extra_args)
+
+
+def render_export(text: str, fmt: str, out_dir: str | os.PathLike) -> str:
+    """
+    Get the file of a summary export, converting it only if this content was never exported.
+
+    Args:
+        text (str): Markdown to export.
+        fmt (str): Key of `EXPORT_FORMATS`.
+        out_dir (str | os.PathLike): Export directory, e.g. one per session.
+
+    Raises:
+        KeyError: Raised if the format is unknown.
+        RuntimeError: Raised if pandoc fails, e.g. without a PDF engine.
+
+    Returns:
+        str: Path to the export.
+    """
+    spec = EXPORT_FORMATS[fmt]
+    path = os.path.join(out_dir, export_key(text, fmt) + spec.ext)
+    if os.path.exists(path):
+        return path
+    os.makedirs(out_dir, exist_ok=True)
+    # Converted under a temporary name and moved into place, so a half-written file is never served.
+    fd, tmp = tempfile.mkstemp(dir=out_dir, prefix=".", suffix=spec.ext)
+    os.close(fd)
+    try:
+        _convert(text, spec, tmp)
+        os.replace(tmp, path)
+    except Exception as e:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise RuntimeError(f"Could not export the summary as {spec.label}: {e}") from e
+    register_file(path)
+    return path
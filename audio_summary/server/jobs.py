@@ -0,0 +1,391 @@
+"""
+Background jobs for the Streamlit server.
+
+Pipelines run on a bounded worker pool shared by every session of the
+server process, and their status, progress and results live in a SQLite
+table. A browser that reconnects or refreshes picks its job up again by id,
+and a failed job can be retried under the same id, which resumes it from
+its checkpoint. The API keys of a job are captured when it is submitted and
+handed to its pipeline only; they are never stored or exported to the
+process environment shared by all sessions. The inputs of queued, running
+and failed jobs are pinned in the purge index, so quota and disk-pressure
+eviction never deletes an upload that a job still needs or may retry.
+Each job records the process that runs it, so several server processes can
+share one table: a starting server only fails the jobs whose process is gone.
+"""
+import os
+import json
+import time
+import socket
+import sqlite3
+import asyncio
+import threading
+import contextlib
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Iterable, Iterator
+from uuid import uuid4
+
+from audio_summary.app import main
+from audio_summary.cache import TranscriptCache
+from audio_summary.purger.index import pin_files, register_file, unpin_files
+from audio_summary.workspace import owner_alive, process_owner, sweep_orphans
+
+DEFAULT_JOB_DB = os.path.join("~", ".cache", "audio_summary", "jobs.sqlite3")
+DEFAULT_MAX_CONCURRENT_JOBS = 2
+# Streamed summary tokens are written to the table at most this often.
+_PARTIAL_FLUSH_SECONDS = 0.5
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    stage TEXT NOT NULL DEFAULT '',
+    progress REAL NOT NULL DEFAULT 0,
+    params TEXT NOT NULL,
+    transcript TEXT NOT NULL DEFAULT '',
+    summary TEXT NOT NULL DEFAULT '',
+    error TEXT NOT NULL DEFAULT '',
+    stats TEXT NOT NULL DEFAULT '{}',
+    owner TEXT NOT NULL DEFAULT '{}',
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL
+)
+"""
+
+
+def get_job_db() -> str:
+    """Get the job table path from APP_JOB_DB or the default."""
+    return os.path.expanduser(os.getenv("APP_JOB_DB", DEFAULT_JOB_DB))
+
+
+def get_max_concurrent_jobs() -> int:
+    """Get the global job concurrency from APP_MAX_CONCURRENT_JOBS or the default."""
+    return int(os.getenv("APP_MAX_CONCURRENT_JOBS", DEFAULT_MAX_CONCURRENT_JOBS))
+
+
+@dataclass
+class Job:
+    """
+    One row of the job table.
+
+    Attributes:
+        id (str): Job id.
+        status (str): "queued", "running", "done" or "failed".
+        stage (str): Pipeline stage of a running job, e.g. "transcribing".
+        progress (float): Progress between 0 and 1.
+        params (dict): Keyword arguments of `main`.
+        transcript (str): Transcript once available.
+        summary (str): Summary, partial while it streams.
+        error (str): Error message of a failed job.
+        stats (dict): Timing, cache and VAD statistics.
+        owner (dict): Pid and host of the process running the job, and when it claimed it.
+        created (float): Submission time.
+        started (float | None): Start time.
+        finished (float | None): End time.
+    """
+    id: str
+    status: str
+    stage: str = ""
+    progress: float = 0.0
+    params: dict = field(default_factory=dict)
+    transcript: str = ""
+    summary: str = ""
+    error: str = ""
+    stats: dict = field(default_factory=dict)
+    owner: dict = field(default_factory=dict)
+    created: float = 0.0
+    started: float | None = None
+    finished: float | None = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+
+class JobStore:
+    """SQLite job table, safe to use from several threads and processes."""
+
+    def __init__(self, path: str | os.PathLike | None = None):
+        """
+        Args:
+            path (str | os.PathLike | None, optional): Database file. Defaults to APP_JOB_DB or
+                "~/.cache/audio_summary/jobs.sqlite3".
+        """
+        self.path = os.fspath(path if path is not None else get_job_db())
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            # Tables created before jobs had owners.
+            if "owner" not in {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}:
+                conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT NOT NULL DEFAULT '{}'")
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create(self, job_id: str, params: dict, owner: dict | None = None):
+        """
+        Insert a queued job.
+
+        Args:
+            job_id (str): Job id.
+            params (dict): Keyword arguments of `main`.
+            owner (dict | None, optional): Process that runs the job. Defaults to the current process.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, params, owner, created) VALUES (?, ?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(params), json.dumps(owner or process_owner()), time.time()),
+            )
+
+    def update(self, job_id: str, **values: Any):
+        """
+        Update columns of a job.
+
+        Args:
+            job_id (str): Job id.
+            **values: Column values; `params`, `stats` and `owner` are stored as JSON.
+        """
+        for key in ("params", "stats", "owner"):
+            if key in values:
+                values[key] = json.dumps(values[key])
+        columns = ", ".join(f"{k} = ?" for k in values)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*values.values(), job_id))
+
+    def get(self, job_id: str) -> Job | None:
+        """
+        Look up a job.
+
+        Args:
+            job_id (str): Job id.
+
+        Returns:
+            Job | None: The job, or None if it does not exist.
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        data = dict(row)
+        data["params"] = json.loads(data["params"])
+        data["stats"] = json.loads(data["stats"])
+        data["owner"] = json.loads(data["owner"])
+        return Job(**data)
+
+    def fail_interrupted(self, *, stale_after: float | None = None) -> int:
+        """
+        Mark jobs left queued or running by a server process that is gone as failed.
+
+        Jobs of a process on this host fail once that process has exited, and
+        jobs without an owner always do. Jobs of another host are left to it,
+        as are those of another server process sharing the table.
+
+        Args:
+            stale_after (float | None, optional): Age in seconds of a claim after which jobs of other
+                hosts, whose owner cannot be checked, fail too. Defaults to None, which keeps them.
+
+        Returns:
+            int: Number of jobs marked.
+        """
+        host = socket.gethostname()
+        now = time.time()
+        with self._connect() as conn:
+            rows = conn.execute("SELECT id, owner FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)).fetchall()
+            gone = []
+            for row in rows:
+                owner = json.loads(row["owner"])
+                if not owner:
+                    gone.append(row["id"])
+                elif owner.get("host") == host:
+                    if not owner_alive(owner):
+                        gone.append(row["id"])
+                elif stale_after is not None and now - owner.get("created", now) > stale_after:
+                    gone.append(row["id"])
+            conn.executemany(
+                "UPDATE jobs SET status = ?, error = ?, finished = ? WHERE id = ? AND status IN (?, ?)",
+                [(FAILED, "Interrupted by a server restart.", now, job_id, QUEUED, RUNNING) for job_id in gone],
+            )
+        return len(gone)
+
+
+class JobManager:
+    """
+    Run `main` pipelines on a bounded worker pool and record them in a `JobStore`.
+
+    Each worker thread runs its pipeline on its own event loop, so at most
+    `max_workers` jobs run at once across every session of the server.
+    """
+
+    def __init__(
+        self,
+        store: JobStore | None = None,
+        max_workers: int | None = None,
+        runner: Callable[..., Awaitable[tuple[str, str]]] = main,
+    ):
+        """
+        Args:
+            store (JobStore | None, optional): Job table. Defaults to one at APP_JOB_DB.
+            max_workers (int | None, optional): Jobs running at once. Defaults to APP_MAX_CONCURRENT_JOBS or 2.
+            runner (Callable[..., Awaitable[tuple[str, str]]], optional): Pipeline to run. Defaults to `main`.
+        """
+        self.store = store or JobStore()
+        self.max_workers = max_workers or get_max_concurrent_jobs()
+        self._runner = runner
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="audio-summary-job")
+        self.store.fail_interrupted()
+        # Jobs interrupted by a restart left their workspaces behind; those of live processes are kept.
+        sweep_orphans()
+
+    def submit(self, params: dict, *, cleanup: Iterable[str] = (), api_keys: dict[str, str | None] | None = None) -> str:
+        """
+        Queue a pipeline run.
+
+        Args:
+            params (dict): JSON-serializable keyword arguments of `main`.
+            cleanup (Iterable[str], optional): Files to remove once the job succeeds, e.g. the upload.
+                They are pinned against purge eviction until then; a failed job keeps them for `retry`.
+                Defaults to ().
+            api_keys (dict[str, str | None] | None, optional): Key arguments of `main` (`openai_api_key`,
+                `google_api_key`) of the submitting session. Kept in memory for this run only, never
+                written to the job table. Defaults to None, which uses the server environment.
+
+        Returns:
+            str: Job id.
+        """
+        job_id = uuid4().hex
+        cleanup = list(cleanup)
+        pin_files(cleanup)
+        self.store.create(job_id, params)
+        self._executor.submit(self._run, job_id, params, cleanup, dict(api_keys or {}))
+        return job_id
+
+    def retry(
+        self, job_id: str, *, cleanup: Iterable[str] = (), api_keys: dict[str, str | None] | None = None
+    ) -> bool:
+        """
+        Queue a failed job again under the same id.
+
+        The pipeline resumes from the job's checkpoint, so chunks that were
+        already transcribed are not sent again.
+
+        Args:
+            job_id (str): Id of a failed job.
+            cleanup (Iterable[str], optional): Files to remove once the job succeeds. Defaults to ().
+            api_keys (dict[str, str | None] | None, optional): Key arguments of `main` of the retrying
+                session, as for `submit`. Defaults to None.
+
+        Returns:
+            bool: False if the job does not exist or has not failed.
+        """
+        job = self.store.get(job_id)
+        if job is None or job.status != FAILED:
+            return False
+        cleanup = list(cleanup)
+        pin_files(cleanup)
+        self.store.update(
+            job_id, status=QUEUED, stage="", progress=0.0, error="", finished=None, owner=process_owner()
+        )
+        self._executor.submit(self._run, job_id, job.params, cleanup, dict(api_keys or {}))
+        return True
+
+    def get(self, job_id: str) -> Job | None:
+        """Look up a job by id."""
+        return self.store.get(job_id)
+
+    def _run(self, job_id: str, params: dict, cleanup: list[str], api_keys: dict[str, str | None]):
+        t0 = time.time()
+        self.store.update(job_id, status=RUNNING, started=t0)
+        cache = TranscriptCache()
+        tokens: list[str] = []
+        stats: dict = {}
+        last_flush = 0.0
+
+        def _on_summary_token(token: str):
+            nonlocal last_flush
+            if not tokens:
+                stats["ttft"] = time.time() - t0
+            tokens.append(token)
+            if time.time() - last_flush >= _PARTIAL_FLUSH_SECONDS:
+                last_flush = time.time()
+                self.store.update(job_id, summary="".join(tokens))
+
+        def _on_progress(stage: str, fraction: float):
+            self.store.update(job_id, stage=stage, progress=fraction)
+
+        try:
+            transcript, summary = asyncio.run(self._runner(
+                **params,
+                **api_keys,
+                cache=cache,
+                stream_summary=True,
+                on_summary_token=_on_summary_token,
+                on_progress=_on_progress,
+                job_id=job_id,
+            ))
+        except (Exception, SystemExit) as e:
+            # A runner may still exit instead of raising; either way the worker survives.
+            self.store.update(
+                job_id, status=FAILED, error=str(e) or e.__class__.__name__, finished=time.time()
+            )
+            return
+        if params.get("summarize") and not summary:
+            # The transcript is kept in the checkpoint; a retry only makes the summary.
+            self.store.update(
+                job_id, status=FAILED, transcript=transcript, error="Summarization failed.", finished=time.time()
+            )
+            return
+        stats.update(elapsed=time.time() - t0, cache_hits=cache.hits, cache_misses=cache.misses)
+        vad_report = os.path.splitext(params.get("output") or "")[0] + ".vad.json"
+        if params.get("vad") and os.path.exists(vad_report):
+            with open(vad_report, "r", encoding="utf8") as f:
+                report = json.load(f)
+            stats["vad"] = [report["seconds_saved"], report["bytes_saved"]]
+        self.store.update(
+            job_id, status=DONE, stage="", progress=1.0, transcript=transcript,
+            summary=summary, stats=stats, finished=time.time(),
+        )
+        # Outputs in the dump directory expire through the purge index instead of a full scan.
+        for fn in (params.get("output"), params.get("summary_output"), vad_report):
+            if fn and os.path.exists(fn):
+                register_file(fn)
+        for fn in cleanup:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(fn)
+        unpin_files(cleanup)
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs and optionally wait for the running ones."""
+        self._executor.shutdown(wait=wait)
+
+
+_job_manager: JobManager | None = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """
+    Get the process-wide job manager, so every session shares one worker pool.
+
+    Returns:
+        JobManager: Shared manager.
+    """
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            _job_manager = JobManager()
+        return _job_manager
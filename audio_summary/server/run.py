@@ -1,12 +1,20 @@
 import os
 import asyncio
-import time
 from uuid import uuid4
 import streamlit as st
 from streamlit.runtime.uploaded_file_manager import UploadedFile
-from audio_summary.app import main
+from audio_summary.server.jobs import FAILED, RUNNING, Job, get_job_manager
 from audio_summary.server import html
-import pypandoc
+from audio_summary.server.exports import EXPORT_FORMATS, export_key, render_export
+from audio_summary.purger import get_quota_purger, start_in_process_scheduler
+from audio_summary.purger.index import register_file
+from audio_summary.transcode import aextract_audio
+from audio_summary.workspace import Workspace
+
+# How often a page with an active job refreshes its status.
+_POLL_SECONDS = 1.0
+# Uploads are written to disk in slices of this size, never copied whole.
+_UPLOAD_CHUNK_BYTES = 1024 * 1024
 
 def _upload_file():
     """Widget for uploading a file"""
@@ -35,12 +43,24 @@ def _get_dump_dir():
     os.makedirs(dump_dir, exist_ok=True)
     return dump_dir
 
-def _dump_audio(uploaded_file:UploadedFile)->str:
+async def _dump_audio(uploaded_file:UploadedFile)->str:
     """Dump the uploaded file and return the file path.
 
+    The upload is written in fixed-size slices of a view on its buffer,
+    so it is never copied in memory. A video is saved in a workspace that
+    is removed once an awaited ffmpeg subprocess has extracted its audio
+    track, or by the startup sweep if the server dies meanwhile.
+    With PURGE_MAX_BYTES set, an upload that takes the dump directory past
+    the quota starts a background purge down to the low-water mark. The
+    saved file is registered in the purge index.
+
     Args:
         uploaded_file (UploadedFile): The file uploaded.
 
+    Raises:
+        FileNotFoundError: Raised if no file is selected.
+        RuntimeError: Raised if ffmpeg cannot extract the audio of a video.
+
     Returns:
         str: File path of the dumped audio file.
     """
@@ -51,18 +71,27 @@ def _dump_audio(uploaded_file:UploadedFile)->str:
     dump_dir = _get_dump_dir()
          
     rdm_name = str(uuid4())
-    output_fn = os.path.join(dump_dir, f"{rdm_name}@{uploaded_file.name}")
-    with open(output_fn, "wb") as f:
-        f.write(uploaded_file.getvalue())
-
     _fn, ext = os.path.splitext(uploaded_file.name)
-    if ext.lower() in [".mp4", ".webm"]:
-        mp3_fn = os.path.join(dump_dir, f"{rdm_name}@{_fn}.mp3")
-        os.system(f"ffmpeg -i {repr(output_fn)} -vn -ab 192k -ar 44100 -f mp3 {repr(mp3_fn)}")
-        while not os.path.exists(mp3_fn):
-            time.sleep(0.1)
-        os.remove(output_fn)
-        return mp3_fn
+    is_video = ext.lower() in [".mp4", ".webm"]
+    with Workspace(rdm_name) as workspace:
+        output_fn = os.path.join(workspace.dir if is_video else dump_dir, f"{rdm_name}@{uploaded_file.name}")
+        view = uploaded_file.getbuffer()
+        try:
+            with open(output_fn, "wb") as f:
+                for offset in range(0, len(view), _UPLOAD_CHUNK_BYTES):
+                    f.write(view[offset:offset + _UPLOAD_CHUNK_BYTES])
+        finally:
+            # An exported buffer pins the upload's BytesIO until the view is released.
+            view.release()
+
+        if is_video:
+            mp3_fn = os.path.join(dump_dir, f"{rdm_name}@{_fn}.mp3")
+            await aextract_audio(output_fn, mp3_fn)
+            output_fn = mp3_fn
+
+    register_file(output_fn, dump_dir)
+    if (purger := get_quota_purger(dump_dir)) is not None:
+        purger.record_write(os.path.getsize(output_fn))
     return output_fn
 
 def _output_lang():
@@ -110,6 +139,7 @@ def _dual_col():
     with col2:
         _duration()
         st.toggle("Use local Whisper", value=False, key="local_transcription")
+        st.toggle("Skip silence (VAD)", value=False, key="vad")
 
 
 def side_bar():
@@ -130,42 +160,112 @@ def side_bar():
             value=os.getenv("GOOGLE_API_KEY")
         )
 
+def _export_dir() -> str:
+    """Export directory of this browser session, so sessions never overwrite each other's files.
+
+    Returns:
+        str: Path to the directory.
+    """
+    session_id = st.session_state.setdefault("session_id", uuid4().hex)
+    return os.path.join(_get_dump_dir(), ".exports", session_id)
+
+
+def _export_button(text:str, fmt:str, stem:str):
+    """Button that renders an export on request, then offers it for download.
+
+    Args:
+        text (str): Markdown to export.
+        fmt (str): Key of `EXPORT_FORMATS`.
+        stem (str): Download file name without extension.
+    """
+    spec = EXPORT_FORMATS[fmt]
+    ready:dict = st.session_state.setdefault("exports", {})
+    digest = export_key(text, fmt)
+    if ready.get(fmt) == digest:
+        # Rendered earlier for this exact summary: served from the file, pandoc is not run again.
+        with open(render_export(text, fmt, _export_dir()), "rb") as f:
+            st.download_button(f"↓ Download {spec.label}", f.read(), f"{stem}{spec.ext}", mime=spec.mime, key=f"download_{fmt}")
+    elif st.button(f"Prepare {spec.label}", key=f"prepare_{fmt}", disabled=len(text)==0):
+        try:
+            render_export(text, fmt, _export_dir())
+        except RuntimeError as e:
+            st.error(str(e), icon="🟥")
+        else:
+            ready[fmt] = digest
+            st.rerun()
+
+
 def _output_container():
-    """Container for displaying and downloading the transcript and summary"""
+    """Container for displaying and downloading the transcript and summary
+
+    Markdown and the transcript are downloaded straight from memory. Other
+    formats are converted only when requested, once per summary content.
+    """
     ready_transcript = st.session_state.get('transcript', '')
     ready_summary = st.session_state.get('summary', '')
-    dump_dir = _get_dump_dir()
+    src_file = st.session_state.get('src_file')
+    stem = os.path.splitext(src_file.name)[0] if src_file else 'summary'
 
     with st.container(border=True):
         tab_summary, tab_transcript  = st.tabs(["Summary", "Transcript", ])
         with tab_summary:
-            col1, col2, _ = st.columns([1, 1, 2])
-            with col1:
-                md_filename = f"{st.session_state.get('src_file').name if st.session_state.get('src_file') else 'summary'}.md"
-                md_path = os.path.join(dump_dir, md_filename)
-                # 寫入 md 檔案
-                with open(md_path, "w", encoding="utf-8") as f:
-                    f.write(ready_summary)
-                st.download_button("↓ Download markdown", ready_summary, md_filename, disabled=len(ready_summary)==0)
-            with col2:
-                output_file = f"{st.session_state.get('src_file').name if st.session_state.get('src_file') else 'summary'}.docx"
-                output_path = os.path.join(dump_dir, output_file)
-                pypandoc.convert_text(ready_summary, 'docx', format='md', outputfile=output_path)
-                st.download_button("↓ Download docx", open(output_path, "rb").read() if len(ready_summary) > 0 else b"", output_file, disabled=len(ready_summary)==0)
+            cols = st.columns([1] * (len(EXPORT_FORMATS) + 1) + [1])
+            with cols[0]:
+                st.download_button("↓ Download markdown", ready_summary, f"{stem}.md", mime="text/markdown", disabled=len(ready_summary)==0)
+            for col, fmt in zip(cols[1:], EXPORT_FORMATS):
+                with col:
+                    _export_button(ready_summary, fmt, stem)
             st.markdown(ready_summary)
             
 
         with tab_transcript:
-            txt_filename = 'transcript.txt'
-            txt_path = os.path.join(dump_dir, txt_filename)
-            # 寫入 txt 檔案
-            if len(ready_transcript) > 0:
-                with open(txt_path, "w", encoding="utf-8") as f:
-                    f.write(ready_transcript)
-            st.download_button("↓ Download", ready_transcript, txt_filename, disabled=len(ready_transcript)==0)
+            st.download_button("↓ Download", ready_transcript, f"transcript_{stem}.txt", disabled=len(ready_transcript)==0)
             st.markdown(ready_transcript)
 
 
+def _api_keys() -> dict[str, str | None]:
+    """API keys of the sidebar, handed to the job of this session only.
+
+    They are never exported to `os.environ`, which every session and job of
+    the server process shares.
+
+    Returns:
+        dict[str, str | None]: Key arguments of `main`.
+    """
+    return {
+        "openai_api_key": st.session_state.get("openai_api_key"),
+        "google_api_key": st.session_state.get("gemini_api_key"),
+    }
+
+
+def _job_status(job:Job):
+    """Show the status of the job and load its results into the session.
+
+    Args:
+        job (Job): The job of this session.
+    """
+    st.session_state['transcript'] = job.transcript
+    st.session_state['summary'] = job.summary
+    if job.active:
+        label = f"{job.stage.capitalize() or 'Queued'} ..." if job.status == RUNNING else "Waiting for a free worker ..."
+        st.progress(job.progress, text=label)
+    elif job.status == FAILED:
+        st.error(f"Job failed: {job.error}", icon="🟥")
+        if st.button("↻ Retry", key="retry_job", help="Resume the job: only missing chunks are transcribed again."):
+            get_job_manager().retry(job.id, cleanup=[job.params["fp"]], api_keys=_api_keys())
+            st.rerun()
+    else:
+        perf = job.stats.get('elapsed', 0)
+        _ttft = job.stats.get('ttft', 0)
+        st.success(
+            f"Done! ⏱️{round(perf, 2)}s." + (f" First summary token after {round(_ttft, 2)}s." if _ttft else ""),
+            icon="✅",
+        )
+        st.caption(f"Transcript cache: {job.stats.get('cache_hits', 0)} hit(s), {job.stats.get('cache_misses', 0)} miss(es)")
+        if vad_stats := job.stats.get('vad'):
+            st.caption(f"Silence skipped: {round(vad_stats[0], 1)}s, {vad_stats[1]} bytes")
+
+
 async def run():
     """Start Web UI server
 
@@ -181,35 +281,50 @@ async def run():
         _dual_col()
         if_submit = st.form_submit_button("Start",)
 
+    manager = get_job_manager()
+    if os.getenv("PURGE_IN_PROCESS", "False").lower() == "true":
+        # Purge from this server instead of a separate purger process; a no-op once running.
+        start_in_process_scheduler(_get_dump_dir())
     if if_submit:
-        os.environ["GOOGLE_API_KEY"] = st.session_state.get("gemini_api_key")
-        os.environ["OPENAI_API_KEY"] = st.session_state.get("openai_api_key")
         src_file:UploadedFile = st.session_state.get("src_file")
-        fn = _dump_audio(src_file)
+        try:
+            fn = await _dump_audio(src_file)
+        except (FileNotFoundError, RuntimeError) as e:
+            st.error(str(e), icon="🟥")
+            st.stop()
         dump_dir = _get_dump_dir()
-        output_fn = os.path.join(dump_dir, f"transcript_{src_file.name}.txt")
-        t0 = time.time()
-        with st.spinner("work work ..."):
-            transcript, summary = await main(
+        output_fn = os.path.join(dump_dir, f"transcript_{os.path.basename(fn)}.txt")
+        job_id = manager.submit(
+            dict(
                 fp=fn,
                 duration=st.session_state.get("duration", 600),
                 lang_=st.session_state.get("lang", ("Original", "original"))[1],
                 output=output_fn,
+                summary_output=os.path.join(dump_dir, f"meeting-minutes_{os.path.basename(fn)}.md"),
                 summarize=st.session_state.get("do_summarize", True),
                 summarize_by=st.session_state.get("summarize_by_api", "OpenAI").lower(), # Pass the selected API
-                local_transcription=st.session_state.get("local_transcription", False)
-            )
-            st.session_state['transcript'] = transcript
-            st.session_state['summary'] = summary
-            await asyncio.to_thread(
-                os.remove, fn
-            )
-        st.session_state['perf'] = time.time()-t0
-    if perf:=st.session_state.get('perf', 0):    
-        st.success(f"Done! ⏱️{round(perf, 2)}s.", icon="✅")
+                local_transcription=st.session_state.get("local_transcription", False),
+                vad=st.session_state.get("vad", False),
+                transfer="memory",
+            ),
+            cleanup=[fn],
+            api_keys=_api_keys(),
+        )
+        # The job id lives in the URL, so a refresh or reconnect finds the job again.
+        st.query_params["job"] = job_id
+        st.rerun()
+
+    job = manager.get(job_id) if (job_id := st.query_params.get("job")) else None
+    if job is not None:
+        _job_status(job)
+    elif job_id:
+        st.warning(f"Job {job_id} not found.")
 
     _output_container()
     footer()
+    if job is not None and job.active:
+        await asyncio.sleep(_POLL_SECONDS)
+        st.rerun()
     
 
 if __name__ == "__main__":
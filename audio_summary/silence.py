@@ -0,0 +1,208 @@
+"""
+Silence-aware cut points for splitting long recordings.
+
+The audio is decoded by ffmpeg to a downsampled mono PCM stream and read in
+fixed-size blocks, so memory stays bounded by one block plus one tolerance
+window of frame energies, whatever the length of the recording.
+
+NumPy is imported by the functions that use it, so the split defaults can
+be imported without it.
+"""
+from __future__ import annotations
+
+import os
+import subprocess
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+if TYPE_CHECKING:
+    import numpy as np
+
+DEFAULT_ANALYSIS_SAMPLE_RATE = 8000
+DEFAULT_TOLERANCE = 30.0
+DEFAULT_FRAME_SECONDS = 0.02
+DEFAULT_MIN_PAUSE = 0.3
+DEFAULT_SILENCE_DB = -45.0
+DEFAULT_PAUSE_MARGIN_DB = 6.0
+_BLOCK_SECONDS = 10.0
+
+
+def iter_pcm(
+    fn: os.PathLike,
+    sample_rate: int = DEFAULT_ANALYSIS_SAMPLE_RATE,
+    block_seconds: float = _BLOCK_SECONDS,
+) -> Iterator[np.ndarray]:
+    """
+    Decode an audio file to mono PCM with ffmpeg and yield it block by block.
+
+    Args:
+        fn (os.PathLike): Path to the input audio file.
+        sample_rate (int, optional): Sample rate of the decoded stream. Defaults to 8000.
+        block_seconds (float, optional): Length of each yielded block. Defaults to 10.
+
+    Raises:
+        RuntimeError: Raised if ffmpeg exits with a non-zero status.
+
+    Yields:
+        np.ndarray: float32 samples in [-1, 1).
+    """
+    import numpy as np
+
+    cmd = [
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-nostdin",
+        "-i", os.fspath(fn),
+        "-vn", "-ac", "1", "-ar", str(sample_rate),
+        "-f", "s16le", "-",
+    ]
+    block_bytes = max(1, int(sample_rate * block_seconds)) * 2
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        while data := proc.stdout.read(block_bytes):
+            if len(data) % 2:
+                data = data[:-1]
+            yield np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+        stderr = proc.stderr.read()
+        if proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with status {proc.returncode}: {stderr.decode(errors='replace').strip()}")
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+        proc.stderr.close()
+
+
+def _pick_pause(
+    energy: np.ndarray,
+    target: int,
+    min_pause_frames: int,
+    silence_db: float,
+    pause_margin_db: float,
+) -> int:
+    """
+    Choose the frame to cut at inside one tolerance window.
+
+    Energy is averaged over `min_pause_frames` so a single quiet frame inside
+    a word does not count as a pause. Frames within `pause_margin_db` of the
+    quietest level of the window, or below `silence_db`, are pauses; the one
+    closest to `target` wins.
+    """
+    import numpy as np
+
+    if min_pause_frames > 1 and energy.size > min_pause_frames:
+        csum = np.concatenate(([0.0], np.cumsum(energy, dtype=np.float64)))
+        half = min_pause_frames // 2
+        lo = np.clip(np.arange(energy.size) - half, 0, energy.size)
+        hi = np.clip(lo + min_pause_frames, 0, energy.size)
+        energy = (csum[hi] - csum[lo]) / (hi - lo)
+    db = 10.0 * np.log10(energy + 1e-12)
+    threshold = max(float(db.min()) + pause_margin_db, silence_db)
+    quiet = np.flatnonzero(db <= threshold)
+    return int(quiet[np.argmin(np.abs(quiet - target))])
+
+
+def find_cuts(
+    blocks: Iterable[np.ndarray],
+    sample_rate: int,
+    duration: float,
+    tolerance: float = DEFAULT_TOLERANCE,
+    *,
+    frame_seconds: float = DEFAULT_FRAME_SECONDS,
+    min_pause: float = DEFAULT_MIN_PAUSE,
+    silence_db: float = DEFAULT_SILENCE_DB,
+    pause_margin_db: float = DEFAULT_PAUSE_MARGIN_DB,
+) -> list[float]:
+    """
+    Find cut points near every `duration` seconds, snapped to the nearest pause.
+
+    Each nominal cut is one `duration` after the previous actual cut, and is
+    moved to the nearest pause within `tolerance` seconds on either side.
+    Frame energies are computed per block with NumPy, and only the frames of
+    the current tolerance window are kept, so the pass is linear in time and
+    bounded in memory. No cut is made when the audio ends before the window
+    closes, which avoids a short trailing chunk.
+
+    Args:
+        blocks (Iterable[np.ndarray]): Mono samples in order, e.g. from `iter_pcm`.
+        sample_rate (int): Sample rate of the samples.
+        duration (float): Nominal length of each chunk in seconds.
+        tolerance (float, optional): Largest shift of a cut in seconds, capped at half of
+            `duration`. Defaults to 30.
+        frame_seconds (float, optional): Length of an energy frame. Defaults to 0.02.
+        min_pause (float, optional): Shortest quiet stretch treated as a pause. Defaults to 0.3.
+        silence_db (float, optional): Level in dBFS that always counts as silence. Defaults to -45.
+        pause_margin_db (float, optional): Headroom above the quietest level of a window that
+            still counts as a pause. Defaults to 6.
+
+    Returns:
+        list[float]: Increasing cut times in seconds.
+    """
+    import numpy as np
+
+    frame_len = max(1, int(round(sample_rate * frame_seconds)))
+    hop = frame_len / sample_rate
+    tolerance = max(0.0, min(tolerance, duration / 2))
+    min_pause_frames = max(1, int(round(min_pause / hop)))
+
+    cuts: list[float] = []
+    target = duration
+    window_start = int((target - tolerance) / hop)
+    parts: list[np.ndarray] = []  # energies of frames from `window_start` on
+    seen = 0
+    rest = np.empty(0, dtype=np.float32)
+
+    for block in blocks:
+        samples = np.asarray(block, dtype=np.float32)
+        if rest.size:
+            samples = np.concatenate((rest, samples))
+        n = samples.size // frame_len
+        rest = samples[n * frame_len:]
+        if n == 0:
+            continue
+        energy = np.square(samples[:n * frame_len]).reshape(n, frame_len).mean(axis=1)
+        if seen + n > window_start:
+            parts.append(energy[max(0, window_start - seen):])
+        seen += n
+
+        while seen >= (window_end := max(int(np.ceil((target + tolerance) / hop)), window_start + 1)):
+            window = np.concatenate(parts) if len(parts) != 1 else parts[0]
+            idx = _pick_pause(
+                window[:window_end - window_start],
+                int(target / hop) - window_start,
+                min_pause_frames,
+                silence_db,
+                pause_margin_db,
+            )
+            cut = round((window_start + idx + 0.5) * hop, 3)
+            cuts.append(cut)
+            target = cut + duration
+            next_start = int((target - tolerance) / hop)
+            parts = [window[next_start - window_start:]] if next_start - window_start < window.size else []
+            window_start = next_start
+
+    return cuts
+
+
+def detect_cuts(
+    fn: os.PathLike,
+    duration: float,
+    tolerance: float = DEFAULT_TOLERANCE,
+    sample_rate: int = DEFAULT_ANALYSIS_SAMPLE_RATE,
+    **kwargs,
+) -> list[float]:
+    """
+    Find silence-aware cut points of an audio file in one streaming pass.
+
+    Args:
+        fn (os.PathLike): Path to the input audio file.
+        duration (float): Nominal length of each chunk in seconds.
+        tolerance (float, optional): Largest shift of a cut in seconds. Defaults to 30.
+        sample_rate (int, optional): Analysis sample rate. Defaults to 8000.
+        **kwargs: Extra options of `find_cuts`.
+
+    Raises:
+        RuntimeError: Raised if ffmpeg cannot decode the file.
+
+    Returns:
+        list[float]: Increasing cut times in seconds, for the segment muxer's `-segment_times`.
+    """
+    return find_cuts(iter_pcm(fn, sample_rate), sample_rate, duration, tolerance, **kwargs)
@@ -0,0 +1,211 @@
+import re
+import asyncio
+from typing import Awaitable, Callable, Literal
+
+from audio_summary import prompts
+
+# Provider hook: takes the content to summarize, returns the summary.
+SummarizeFn = Callable[[str], Awaitable[str]]
+
+DEFAULT_CONTEXT_BUDGET_TOKENS = 100_000
+DEFAULT_SECTION_BUDGET_TOKENS = 12_000
+DEFAULT_MAP_CONCURRENCY = 4
+
+_CJK = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯豈-﫿]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the token count of a text without a tokenizer.
+
+    CJK characters count as one token each, everything else as one token
+    per four characters, which errs on the generous side for both.
+
+    Args:
+        text (str): Text to measure.
+
+    Returns:
+        int: Estimated number of tokens.
+    """
+    cjk = len(_CJK.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def _split_oversized(text: str, budget_tokens: int) -> list[str]:
+    """Split a single piece that is larger than the budget on line, then character boundaries."""
+    pieces: list[str] = []
+    current: list[str] = []
+    current_tokens = 0
+    for line in text.splitlines(keepends=True):
+        line_tokens = estimate_tokens(line)
+        if line_tokens > budget_tokens:
+            # A single line over budget: fall back to a hard character cut.
+            step = max(1, len(line) * budget_tokens // line_tokens)
+            sublines = [line[i:i + step] for i in range(0, len(line), step)]
+        else:
+            sublines = [line]
+        for sub in sublines:
+            sub_tokens = estimate_tokens(sub)
+            if current and current_tokens + sub_tokens > budget_tokens:
+                pieces.append("".join(current))
+                current, current_tokens = [], 0
+            current.append(sub)
+            current_tokens += sub_tokens
+    if current:
+        pieces.append("".join(current))
+    return pieces
+
+
+def split_sections(chunks: list[str], budget_tokens: int = DEFAULT_SECTION_BUDGET_TOKENS) -> list[str]:
+    """
+    Pack consecutive transcript chunks into sections that fit a token budget.
+
+    Sections only break between Whisper chunks, unless a single chunk is
+    larger than the budget on its own.
+
+    Args:
+        chunks (list[str]): Transcript of each Whisper chunk, in order.
+        budget_tokens (int, optional): Token budget per section. Defaults to 12000.
+
+    Returns:
+        list[str]: Ordered sections.
+    """
+    sections: list[str] = []
+    current: list[str] = []
+    current_tokens = 0
+    for chunk in chunks:
+        for piece in _split_oversized(chunk, budget_tokens) if estimate_tokens(chunk) > budget_tokens else [chunk]:
+            piece_tokens = estimate_tokens(piece)
+            if current and current_tokens + piece_tokens > budget_tokens:
+                sections.append("\n".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += piece_tokens
+    if current:
+        sections.append("\n".join(current))
+    return sections
+
+
+def split_text_chunks(text: str) -> list[str]:
+    """
+    Split a plain transcript into paragraph chunks for `split_sections`.
+
+    Args:
+        text (str): Transcript without Whisper chunk boundaries, e.g. an uploaded .txt file.
+
+    Returns:
+        list[str]: Non-empty paragraphs.
+    """
+    return [p for p in re.split(r"\n\s*\n", text) if p.strip()]
+
+
+async def amap_reduce_summarize(
+    chunks: list[str],
+    summarize_fn: SummarizeFn,
+    *,
+    section_budget_tokens: int = DEFAULT_SECTION_BUDGET_TOKENS,
+    context_budget_tokens: int = DEFAULT_CONTEXT_BUDGET_TOKENS,
+    concurrency: int = DEFAULT_MAP_CONCURRENCY,
+    final_fn: SummarizeFn | None = None,
+) -> str:
+    """
+    Summarize a long transcript hierarchically.
+
+    The transcript is packed into token-budgeted sections aligned with the
+    Whisper chunks. Sections are summarized concurrently (map), then their
+    minutes are merged into the final meeting minutes (reduce). If the
+    section minutes still exceed the context budget, they are reduced again
+    level by level.
+
+    Args:
+        chunks (list[str]): Transcript of each Whisper chunk, in order.
+        summarize_fn (SummarizeFn): Provider call that turns content into a summary.
+        section_budget_tokens (int, optional): Token budget per map section. Defaults to 12000.
+        context_budget_tokens (int, optional): Largest input sent in one call. Defaults to 100000.
+        concurrency (int, optional): Maximum concurrent provider calls. Defaults to 4.
+        final_fn (SummarizeFn | None, optional): Provider call for the last step only, e.g. a
+            streaming one. Defaults to `summarize_fn`.
+
+    Returns:
+        str: Final meeting minutes.
+    """
+    sem = asyncio.Semaphore(concurrency)
+    final_fn = final_fn or summarize_fn
+
+    async def _call(content: str) -> str:
+        async with sem:
+            return await summarize_fn(content)
+
+    sections = split_sections(chunks, section_budget_tokens)
+    if len(sections) == 1 and estimate_tokens(sections[0]) <= context_budget_tokens:
+        return await final_fn(sections[0])
+
+    total = len(sections)
+    print(f"👉 Map-reduce summarization over {total} section(s)...")
+    partials = await asyncio.gather(*(
+        _call(prompts.SECTION_OF_LONG_MEETING.format(index=i + 1, total=total) + "\n" + section)
+        for i, section in enumerate(sections)
+    ))
+
+    while True:
+        merged = "\n\n".join(f"## Part {i + 1}\n{p}" for i, p in enumerate(partials))
+        if estimate_tokens(merged) <= context_budget_tokens or len(partials) == 1:
+            return await final_fn(prompts.MERGE_SECTION_MINUTES + "\n" + merged)
+        # Too many section minutes for one call: merge them in groups first.
+        groups = split_sections(
+            [f"## Part {i + 1}\n{p}" for i, p in enumerate(partials)], section_budget_tokens
+        )
+        if len(groups) >= len(partials):
+            # Grouping no longer shrinks the input; merge what we have.
+            return await final_fn(prompts.MERGE_SECTION_MINUTES + "\n" + merged)
+        partials = await asyncio.gather(*(
+            _call(prompts.MERGE_SECTION_MINUTES + "\n" + g) for g in groups
+        ))
+
+
+async def asummarize_transcript(
+    chunks: list[str],
+    summarize_fn: SummarizeFn,
+    *,
+    content: str | None = None,
+    mode: Literal["auto", "single", "map-reduce"] = "auto",
+    section_budget_tokens: int = DEFAULT_SECTION_BUDGET_TOKENS,
+    context_budget_tokens: int = DEFAULT_CONTEXT_BUDGET_TOKENS,
+    concurrency: int = DEFAULT_MAP_CONCURRENCY,
+    final_fn: SummarizeFn | None = None,
+) -> str:
+    """
+    Summarize a transcript in one call, or with map-reduce when it is too long.
+
+    Args:
+        chunks (list[str]): Transcript of each Whisper chunk, in order.
+        summarize_fn (SummarizeFn): Provider call that turns content into a summary.
+        content (str | None, optional): Full transcript sent in single-pass mode. Defaults to the
+            chunks joined by newlines.
+        mode (Literal["auto", "single", "map-reduce"], optional): "single" always sends one prompt,
+            "map-reduce" always summarizes by sections, "auto" switches to map-reduce only when
+            the transcript exceeds `context_budget_tokens`. Defaults to "auto".
+        section_budget_tokens (int, optional): Token budget per map section. Defaults to 12000.
+        context_budget_tokens (int, optional): Largest input sent in one call. Defaults to 100000.
+        concurrency (int, optional): Maximum concurrent provider calls. Defaults to 4.
+        final_fn (SummarizeFn | None, optional): Provider call that produces the final minutes,
+            e.g. a streaming one. Defaults to `summarize_fn`.
+
+    Returns:
+        str: Final meeting minutes.
+    """
+    final_fn = final_fn or summarize_fn
+    if mode not in ("auto", "single", "map-reduce"):
+        raise ValueError(f"Unsupported summary mode: {mode}")
+    if content is None:
+        content = "".join(c + "\n" for c in chunks)
+    if mode == "single" or (mode == "auto" and estimate_tokens(content) <= context_budget_tokens):
+        return await final_fn(content)
+    return await amap_reduce_summarize(
+        chunks,
+        summarize_fn,
+        section_budget_tokens=section_budget_tokens,
+        context_budget_tokens=context_budget_tokens,
+        concurrency=concurrency,
+        final_fn=final_fn,
+    )
@@ -0,0 +1,236 @@
+"""
+Chunk format planning that keeps every upload under the Whisper size limit.
+"""
+import os
+import asyncio
+from dataclasses import dataclass
+from typing import Literal
+
+from audio_summary.probe import MediaInfo
+
+WHISPER_CONTENT_LIMIT_IN_BYTES = 26214400
+# Container overhead and VBR peaks eat into the limit; plan for this share of it.
+DEFAULT_HEADROOM = 0.9
+
+
+@dataclass(frozen=True)
+class ChunkFormat:
+    """
+    How chunks are encoded when they are cut.
+
+    Attributes:
+        ext (str | None): Extension of the chunk files; None keeps the source extension.
+        args (tuple[str, ...]): ffmpeg output options for the audio stream.
+        bit_rate (int | None): Target bit rate in bits per second; None for a stream copy or lossless.
+        muxer (str | None): ffmpeg output format when writing to a pipe; None infers it from the codec.
+    """
+    ext: str | None
+    args: tuple[str, ...]
+    bit_rate: int | None
+    muxer: str | None = None
+
+
+# The transcript cache is keyed on chunk bytes, so cutting the same audio twice must give the same
+# bytes. Without this the ogg muxer picks a random stream serial for every chunk.
+BITEXACT = ("-fflags", "+bitexact")
+COPY = ChunkFormat(None, ("-acodec", "copy", *BITEXACT), None)
+FLAC = ChunkFormat(".flac", ("-c:a", "flac", *BITEXACT), None, "flac")
+# Whisper resamples to 16 kHz mono anyway; Opus at 24 kbps keeps speech intelligible at ~10 MB/hour.
+OPUS_16K_MONO = ChunkFormat(
+    ".ogg",
+    ("-ac", "1", "-ar", "16000", "-c:a", "libopus", "-b:a", "24k", "-application", "voip", *BITEXACT),
+    24000,
+    "ogg",
+)
+# Copied codecs whose elementary stream can be written to a pipe in a Whisper-supported container.
+_PIPE_COPY_MUXERS = {
+    "mp3": ("mp3", ".mp3"),
+    "flac": ("flac", ".flac"),
+    "opus": ("ogg", ".ogg"),
+    "vorbis": ("ogg", ".ogg"),
+}
+# Audio track of an uploaded video, as the server has always stored it.
+VIDEO_AUDIO_ARGS = ("-ab", "192k", "-ar", "44100", "-f", "mp3")
+
+
+@dataclass(frozen=True)
+class ChunkPlan:
+    """
+    Chunk duration and format chosen for one recording.
+
+    Attributes:
+        duration (float): Chunk duration in seconds.
+        format (ChunkFormat): Encoding of the chunks.
+        estimated_bytes (int): Estimated size of the largest chunk.
+    """
+    duration: float
+    format: ChunkFormat
+    estimated_bytes: int
+
+    @property
+    def transcode(self) -> bool:
+        return self.format is not COPY
+
+
+def _source_bit_rate(info: MediaInfo) -> float:
+    """Probed bit rate, or the average over the whole file when the headers have none."""
+    if info.bit_rate:
+        return float(info.bit_rate)
+    if info.duration > 0:
+        return info.size * 8 / info.duration
+    return 0.0
+
+
+def plan_chunks(
+    info: MediaInfo,
+    duration: float,
+    *,
+    mode: Literal["auto", "copy", "opus"] = "auto",
+    limit_bytes: int = WHISPER_CONTENT_LIMIT_IN_BYTES,
+    headroom: float = DEFAULT_HEADROOM,
+) -> ChunkPlan:
+    """
+    Pick the chunk duration and format so every chunk fits under `limit_bytes`.
+
+    "auto" keeps a stream copy when chunks of `duration` seconds fit at the
+    probed bit rate, and otherwise transcodes to 16 kHz mono Opus. Either
+    way the duration is shortened if chunks would still be too large.
+
+    Args:
+        info (MediaInfo): Probe result of the recording.
+        duration (float): Requested chunk duration in seconds.
+        mode (Literal["auto", "copy", "opus"], optional): "copy" never transcodes, "opus" always
+            does. Defaults to "auto".
+        limit_bytes (int, optional): Upload size limit. Defaults to 25 MiB.
+        headroom (float, optional): Share of the limit to plan for. Defaults to 0.9.
+
+    Returns:
+        ChunkPlan: Chunk duration and format.
+    """
+    if mode not in ("auto", "copy", "opus"):
+        raise ValueError(f"Unsupported transcode mode: {mode}")
+    budget = limit_bytes * headroom
+    source_rate = _source_bit_rate(info)
+    fmt = COPY
+    if mode == "opus" or (mode == "auto" and source_rate * duration / 8 > budget):
+        fmt = OPUS_16K_MONO
+    rate = fmt.bit_rate or source_rate
+    if rate > 0:
+        duration = min(duration, budget * 8 / rate)
+    return ChunkPlan(duration=duration, format=fmt, estimated_bytes=int(rate * duration / 8))
+
+
+def pipe_format(codec: str | None, fmt: ChunkFormat) -> ChunkFormat:
+    """
+    Get a variant of `fmt` that ffmpeg can write to a pipe.
+
+    MP4/M4A containers need a seekable output, so a stream copy of such a
+    codec is replaced: PCM becomes lossless FLAC, anything else Opus.
+
+    Args:
+        codec (str | None): Codec of the source audio stream.
+        fmt (ChunkFormat): Planned chunk format.
+
+    Returns:
+        ChunkFormat: Format with a known extension and pipe muxer.
+    """
+    if fmt.muxer:
+        return fmt
+    if fmt is COPY and codec in _PIPE_COPY_MUXERS:
+        muxer, ext = _PIPE_COPY_MUXERS[codec]
+        return ChunkFormat(ext, fmt.args, fmt.bit_rate, muxer)
+    if fmt is COPY and codec and codec.startswith("pcm_"):
+        return FLAC
+    return OPUS_16K_MONO
+
+
+async def ashrink_chunk(audio: str, fmt: ChunkFormat = OPUS_16K_MONO) -> str:
+    """
+    Re-encode one oversized chunk next to it with an ffmpeg subprocess.
+
+    Args:
+        audio (str): Path to the chunk.
+        fmt (ChunkFormat, optional): Target format. Defaults to 16 kHz mono Opus.
+
+    Raises:
+        RuntimeError: Raised if ffmpeg exits with a non-zero status.
+
+    Returns:
+        str: Path to the re-encoded chunk.
+    """
+    output = os.path.splitext(audio)[0] + ".small" + (fmt.ext or os.path.splitext(audio)[1])
+    proc = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+        "-i", audio,
+        "-vn", *fmt.args,
+        output,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg exited with status {proc.returncode}: {stderr.decode(errors='replace').strip()}")
+    return output
+
+
+async def ashrink_bytes(data: bytes, fmt: ChunkFormat = OPUS_16K_MONO) -> bytes:
+    """
+    Re-encode one oversized in-memory chunk through ffmpeg's stdin and stdout.
+
+    Args:
+        data (bytes): Encoded chunk.
+        fmt (ChunkFormat, optional): Target format; must have a pipe muxer. Defaults to 16 kHz mono Opus.
+
+    Raises:
+        RuntimeError: Raised if ffmpeg exits with a non-zero status.
+
+    Returns:
+        bytes: Re-encoded chunk.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-hide_banner", "-loglevel", "error",
+        "-i", "pipe:0",
+        "-vn", *fmt.args,
+        "-f", fmt.muxer, "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    out, stderr = await proc.communicate(data)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg exited with status {proc.returncode}: {stderr.decode(errors='replace').strip()}")
+    return out
+
+
+async def aextract_audio(video: str, output: str, args: tuple[str, ...] = VIDEO_AUDIO_ARGS) -> str:
+    """
+    Extract the audio track of a video file with an awaited ffmpeg subprocess.
+
+    ffmpeg reads the saved file itself, so the video is never loaded into
+    memory, and the call returns once ffmpeg has exited.
+
+    Args:
+        video (str): Path to the video file.
+        output (str): Path of the audio file to write.
+        args (tuple[str, ...], optional): ffmpeg output options. Defaults to 192 kbps 44.1 kHz MP3.
+
+    Raises:
+        RuntimeError: Raised if ffmpeg exits with a non-zero status; a partial output is removed.
+
+    Returns:
+        str: Path to the audio file.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-nostdin", "-y",
+        "-i", video,
+        "-vn", *args,
+        output,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        if os.path.exists(output):
+            os.remove(output)
+        raise RuntimeError(f"ffmpeg exited with status {proc.returncode}: {stderr.decode(errors='replace').strip()}")
+    return output
@@ -0,0 +1,262 @@
+import os
+import time
+import random
+import asyncio
+import weakref
+from abc import ABC, abstractmethod
+from typing import IO, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+DEFAULT_WHISPER_MODEL = "whisper-1"
+DEFAULT_MAX_IN_FLIGHT = 4
+DEFAULT_REQUESTS_PER_MINUTE = 50
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_BASE = 1.0
+DEFAULT_BACKOFF_MAX = 60.0
+
+
+
+def _retryable_errors() -> tuple[type[Exception], ...]:
+    """Errors worth another attempt: throttling, timeouts, dropped connections and 5xx."""
+    import openai
+
+    return (
+        openai.RateLimitError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.InternalServerError,
+    )
+
+
+class TokenBucket:
+    """Asyncio token bucket that refills `rate` tokens per second up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        """
+        Args:
+            rate (float): Tokens added per second.
+            capacity (float | None, optional): Maximum burst size. Defaults to `max(rate, 1)`.
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0):
+        """Wait until `tokens` are available and take them."""
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= tokens
+
+
+class TranscriptionBackend(ABC):
+    """
+    Pluggable speech-to-text engine used by the transcription pipeline.
+
+    Attributes:
+        model (str): Model identifier, also part of the transcript cache key.
+        concurrency (int): Number of chunks the backend transcribes at once.
+    """
+
+    model: str
+    concurrency: int = 1
+
+    @abstractmethod
+    async def transcribe(self, file: str | tuple[str, bytes] | IO[bytes]) -> str:
+        """
+        Transcribe one audio chunk.
+
+        Args:
+            file (str | tuple[str, bytes] | IO[bytes]): Path to the chunk, a `(filename, bytes)`
+                pair or a binary file object.
+
+        Returns:
+            str: Raw transcribed text.
+        """
+
+    async def aclose(self):
+        """Release the resources held by the backend."""
+
+
+class WhisperDispatcher(TranscriptionBackend):
+    """
+    Send audio chunks to Whisper through one pooled client.
+
+    Requests are bounded by an in-flight limit and a token-bucket rate limit.
+    Each chunk is retried on its own with jittered exponential backoff, so a
+    transient error only re-sends the chunk that failed.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = DEFAULT_BACKOFF_BASE,
+        backoff_max: float = DEFAULT_BACKOFF_MAX,
+        model: str = DEFAULT_WHISPER_MODEL,
+        api_key: str | None = None,
+        base_url: str | None = None,
+    ):
+        """
+        Args:
+            max_in_flight (int, optional): Maximum concurrent Whisper requests. Defaults to 4.
+            requests_per_minute (float, optional): Token-bucket request rate. Defaults to 50.
+            max_retries (int, optional): Retries per chunk after the first attempt. Defaults to 5.
+            backoff_base (float, optional): First backoff ceiling in seconds. Defaults to 1.
+            backoff_max (float, optional): Largest backoff ceiling in seconds. Defaults to 60.
+            model (str, optional): Whisper model name. Defaults to "whisper-1".
+            api_key (str | None, optional): OpenAI API key. Defaults to OPENAI_API_KEY.
+            base_url (str | None, optional): OpenAI-compatible endpoint. Defaults to the client default.
+        """
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.model = model
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._bucket = TokenBucket(requests_per_minute / 60.0, capacity=max_in_flight)
+        self._api_key = api_key
+        self._base_url = base_url
+        self._client: "AsyncOpenAI | None" = None
+
+    @property
+    def concurrency(self) -> int:
+        return self.max_in_flight
+
+    @property
+    def client(self) -> "AsyncOpenAI":
+        """The pooled client, created on first use so that building a dispatcher is cheap and never fails."""
+        if self._client is None:
+            from openai import AsyncOpenAI
+
+            # Our own retry loop replaces the SDK's, so the client must not retry on its own.
+            self._client = AsyncOpenAI(
+                api_key=self._api_key if self._api_key is not None else os.environ.get("OPENAI_API_KEY", ''),
+                base_url=self._base_url,
+                max_retries=0,
+            )
+        return self._client
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        """Full-jitter exponential backoff, honouring a server Retry-After hint."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        try:
+            delay = max(delay, float(retry_after))
+        except (TypeError, ValueError):
+            pass
+        return delay
+
+    async def _send(self, file: str | tuple[str, bytes] | IO[bytes]) -> str:
+        async with self._semaphore:
+            await self._bucket.acquire()
+            if isinstance(file, str):
+                with open(file, "rb") as audio_file:
+                    transcription = await self.client.audio.transcriptions.create(
+                        model=self.model, file=audio_file
+                    )
+            else:
+                transcription = await self.client.audio.transcriptions.create(
+                    model=self.model, file=file
+                )
+        return transcription.text
+
+    async def transcribe(self, file: str | tuple[str, bytes] | IO[bytes]) -> str:
+        """
+        Transcribe one chunk, retrying transient failures.
+
+        Args:
+            file (str | tuple[str, bytes] | IO[bytes]): Path to the chunk, a `(filename, bytes)`
+                pair or a binary file object, which is rewound before every attempt.
+
+        Raises:
+            openai.OpenAIError: Raised when a non-retryable error occurs or retries are exhausted.
+
+        Returns:
+            str: Raw transcribed text.
+        """
+        attempt = 0
+        while True:
+            if hasattr(file, "seek"):
+                # A failed attempt may have read the file object to the end.
+                file.seek(0)
+            try:
+                return await self._send(file)
+            except _retryable_errors() as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt, e)
+                attempt += 1
+                print(f"🟡 Whisper request failed ({e.__class__.__name__}), retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def aclose(self):
+        """Close the pooled HTTP client."""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+_default_dispatchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, WhisperDispatcher]" = weakref.WeakKeyDictionary()
+
+
+def make_dispatcher(
+    *, max_in_flight: int | None = None, requests_per_minute: float | None = None, **kwargs
+) -> WhisperDispatcher:
+    """
+    Build a dispatcher for one run or one batch, e.g. with the limits given on the command line.
+
+    The caller owns the dispatcher and closes it with `aclose()`. Unset limits
+    fall back to WHISPER_MAX_IN_FLIGHT, WHISPER_RPM and WHISPER_MAX_RETRIES.
+
+    Args:
+        max_in_flight (int | None, optional): Maximum concurrent Whisper requests.
+        requests_per_minute (float | None, optional): Token-bucket request rate.
+        **kwargs: Other keyword arguments of `WhisperDispatcher`, e.g. `api_key`.
+
+    Returns:
+        WhisperDispatcher: New dispatcher.
+    """
+    config = {
+        "max_in_flight": int(os.getenv("WHISPER_MAX_IN_FLIGHT", DEFAULT_MAX_IN_FLIGHT)),
+        "requests_per_minute": float(os.getenv("WHISPER_RPM", DEFAULT_REQUESTS_PER_MINUTE)),
+        "max_retries": int(os.getenv("WHISPER_MAX_RETRIES", DEFAULT_MAX_RETRIES)),
+    }
+    if max_in_flight is not None:
+        config["max_in_flight"] = max_in_flight
+    if requests_per_minute is not None:
+        config["requests_per_minute"] = requests_per_minute
+    return WhisperDispatcher(**{**config, **kwargs})
+
+
+def get_dispatcher() -> WhisperDispatcher:
+    """
+    Get the shared dispatcher of the running event loop.
+
+    Used by the transcription helpers when no dispatcher is passed; `main`
+    builds its own with `make_dispatcher`. The HTTP pool of an async client
+    belongs to one loop, so one dispatcher is kept per loop.
+
+    Returns:
+        WhisperDispatcher: Shared dispatcher.
+    """
+    loop = asyncio.get_running_loop()
+    dispatcher = _default_dispatchers.get(loop)
+    if dispatcher is None:
+        dispatcher = make_dispatcher()
+        _default_dispatchers[loop] = dispatcher
+    return dispatcher
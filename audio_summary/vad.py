@@ -0,0 +1,305 @@
+"""
+Energy-based voice activity trimming before transcription.
+
+Long non-speech stretches (waiting for people to join, breaks, muted
+microphones) are compressed to a short gap before the audio is sent to
+Whisper. The recording is decoded, gated and re-encoded as one stream, so
+memory stays bounded by one block plus one silence window. Transcript
+timestamps refer to the trimmed audio; a `TimeMap` translates them back to
+the original recording.
+"""
+import os
+import json
+import bisect
+import subprocess
+from dataclasses import dataclass, field, asdict
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from audio_summary.silence import iter_pcm
+
+DEFAULT_VAD_SAMPLE_RATE = 16000
+DEFAULT_THRESHOLD_DB = -45.0
+DEFAULT_NOISE_MARGIN_DB = 10.0
+# The noise-floor threshold never rises above this, so a first block of pure speech is not taken as noise.
+_MAX_ADAPTIVE_THRESHOLD_DB = -35.0
+DEFAULT_MIN_SILENCE = 2.0
+DEFAULT_PADDING = 0.25
+DEFAULT_FRAME_SECONDS = 0.02
+# Speech-grade mono MP3, well under the Whisper upload limit for long chunks.
+ENCODE_BIT_RATE = 48000
+ENCODE_ARGS = ["-c:a", "libmp3lame", "-b:a", str(ENCODE_BIT_RATE)]
+
+
+@dataclass
+class TimeMap:
+    """
+    Mapping from offsets in the trimmed audio to offsets in the original recording.
+
+    Attributes:
+        spans (list[tuple[float, float, float]]): Kept spans as `(trimmed_start, original_start, length)`
+            in seconds, in order.
+    """
+    spans: list[tuple[float, float, float]] = field(default_factory=list)
+
+    def to_original(self, t: float) -> float:
+        """
+        Translate an offset of the trimmed audio to the original recording.
+
+        Args:
+            t (float): Offset in the trimmed audio in seconds.
+
+        Returns:
+            float: Offset in the original recording in seconds.
+        """
+        if not self.spans:
+            return t
+        i = max(0, bisect.bisect_right([s[0] for s in self.spans], t) - 1)
+        trimmed_start, original_start, length = self.spans[i]
+        return original_start + min(max(0.0, t - trimmed_start), length)
+
+
+@dataclass
+class VadResult:
+    """
+    Outcome of one trimming pass.
+
+    Attributes:
+        path (str): Path to the trimmed audio.
+        time_map (TimeMap): Trimmed-to-original offset mapping.
+        original_seconds (float): Duration of the decoded recording.
+        kept_seconds (float): Duration of the trimmed audio.
+        original_bytes (int): Size of the original file.
+        kept_bytes (int): Size of the trimmed file.
+        bit_rate (int): Bit rate the trimmed audio is encoded at, in bits per second.
+    """
+    path: str
+    time_map: TimeMap
+    original_seconds: float
+    kept_seconds: float
+    original_bytes: int
+    kept_bytes: int
+    bit_rate: int = ENCODE_BIT_RATE
+
+    @property
+    def seconds_saved(self) -> float:
+        return self.original_seconds - self.kept_seconds
+
+    @property
+    def bytes_saved(self) -> int:
+        """
+        Upload bytes saved by dropping silence, at the bit rate of the trimmed audio.
+
+        Comparing `original_bytes` with `kept_bytes` would mix the re-encoding
+        into the figure, and go negative for sources below the encode bit rate.
+        """
+        return int(self.seconds_saved * self.bit_rate / 8)
+
+    def save(self, path: os.PathLike):
+        """Write the statistics and the time map as JSON."""
+        data = asdict(self)
+        data["seconds_saved"] = self.seconds_saved
+        data["bytes_saved"] = self.bytes_saved
+        with open(path, "w", encoding="utf8") as f:
+            json.dump(data, f, indent=2)
+
+
+class SpeechGate:
+    """
+    Streaming gate that compresses long silences to `2 * padding` seconds.
+
+    Frames whose energy is below the threshold are silence. A silence run
+    shorter than `min_silence` is kept whole; a longer one keeps `padding`
+    seconds on each side and drops the middle. Only the current silence run
+    is held back, and at most `min_silence` seconds of it.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        *,
+        threshold_db: float = DEFAULT_THRESHOLD_DB,
+        noise_margin_db: float = DEFAULT_NOISE_MARGIN_DB,
+        min_silence: float = DEFAULT_MIN_SILENCE,
+        padding: float = DEFAULT_PADDING,
+        frame_seconds: float = DEFAULT_FRAME_SECONDS,
+    ):
+        """
+        Args:
+            sample_rate (int): Sample rate of the fed samples.
+            threshold_db (float, optional): Level in dBFS below which a frame is always silence. Defaults to -45.
+            noise_margin_db (float, optional): Frames within this margin above the quietest noise floor
+                seen so far are silence too, up to -35 dBFS. Defaults to 10.
+            min_silence (float, optional): Shortest silence in seconds that gets compressed. Defaults to 2.
+            padding (float, optional): Silence kept on each side of speech in seconds. Defaults to 0.25.
+            frame_seconds (float, optional): Length of an energy frame. Defaults to 0.02.
+        """
+        self.sample_rate = sample_rate
+        self.frame_len = max(1, int(round(sample_rate * frame_seconds)))
+        self.threshold_db = threshold_db
+        self.noise_margin_db = noise_margin_db
+        self.min_silence_frames = max(1, int(round(min_silence * sample_rate / self.frame_len)))
+        self.pad_frames = min(int(round(padding * sample_rate / self.frame_len)), self.min_silence_frames // 2)
+        self.floor_db = np.inf
+        self.spans: list[list[int]] = []  # [out_frame, in_frame, n_frames]
+        self.in_frames = 0
+        self.out_frames = 0
+        self._rest = np.empty(0, dtype=np.float32)
+        self._run = 0  # length of the open silence run in frames
+        self._held = np.empty((0, self.frame_len), dtype=np.float32)
+        self._held_start = 0  # input frame index of the first held frame
+
+    def _emit(self, start: int, frames: np.ndarray, out: list[np.ndarray]):
+        if not len(frames):
+            return
+        if self.spans and self.spans[-1][1] + self.spans[-1][2] == start:
+            self.spans[-1][2] += len(frames)
+        else:
+            self.spans.append([self.out_frames, start, len(frames)])
+        self.out_frames += len(frames)
+        out.append(frames.reshape(-1))
+
+    def _close_run(self, out: list[np.ndarray]):
+        self._emit(self._held_start, self._held, out)
+        self._held = self._held[:0]
+        self._run = 0
+
+    def _silence(self, start: int, frames: np.ndarray, out: list[np.ndarray]):
+        lead = max(0, min(len(frames), self.pad_frames - self._run))
+        self._emit(start, frames[:lead], out)
+        if not len(self._held):
+            self._held_start = start + lead
+        self._held = np.concatenate((self._held, frames[lead:]))
+        self._run += len(frames)
+        if self._run >= self.min_silence_frames and len(self._held) > self.pad_frames:
+            # Long enough to compress: only the trailing padding can still be kept.
+            drop = len(self._held) - self.pad_frames
+            self._held = self._held[drop:]
+            self._held_start += drop
+
+    def feed(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Gate the next block of samples.
+
+        Args:
+            samples (np.ndarray): Mono float samples in [-1, 1).
+
+        Returns:
+            np.ndarray: Samples to keep, possibly empty.
+        """
+        samples = np.asarray(samples, dtype=np.float32)
+        if self._rest.size:
+            samples = np.concatenate((self._rest, samples))
+        n = samples.size // self.frame_len
+        self._rest = samples[n * self.frame_len:]
+        if n == 0:
+            return np.empty(0, dtype=np.float32)
+        frames = samples[:n * self.frame_len].reshape(n, self.frame_len)
+        db = 10.0 * np.log10(np.square(frames).mean(axis=1) + 1e-12)
+        self.floor_db = min(self.floor_db, float(np.percentile(db, 10)))
+        threshold = max(self.threshold_db, min(self.floor_db + self.noise_margin_db, _MAX_ADAPTIVE_THRESHOLD_DB))
+        speech = db > threshold
+
+        out: list[np.ndarray] = []
+        # Walk runs of equal speech/silence frames instead of single frames.
+        edges = np.flatnonzero(np.diff(speech.astype(np.int8))) + 1
+        for lo, hi in zip(np.concatenate(([0], edges)), np.concatenate((edges, [n]))):
+            start = self.in_frames + int(lo)
+            if speech[lo]:
+                self._close_run(out)
+                self._emit(start, frames[lo:hi], out)
+            else:
+                self._silence(start, frames[lo:hi], out)
+        self.in_frames += n
+        return np.concatenate(out) if out else np.empty(0, dtype=np.float32)
+
+    def flush(self) -> np.ndarray:
+        """
+        Release the held-back tail of the stream. A partial last frame is dropped.
+
+        Returns:
+            np.ndarray: Remaining samples to keep.
+        """
+        out: list[np.ndarray] = []
+        self._close_run(out)
+        return np.concatenate(out) if out else np.empty(0, dtype=np.float32)
+
+    def time_map(self) -> TimeMap:
+        """Get the trimmed-to-original mapping of everything gated so far."""
+        hop = self.frame_len / self.sample_rate
+        return TimeMap([(o * hop, i * hop, n * hop) for o, i, n in self.spans])
+
+
+def gate_speech(blocks: Iterable[np.ndarray], gate: SpeechGate) -> Iterator[np.ndarray]:
+    """
+    Run a sample stream through a `SpeechGate`.
+
+    Args:
+        blocks (Iterable[np.ndarray]): Mono samples in order.
+        gate (SpeechGate): Gate to feed.
+
+    Yields:
+        np.ndarray: Kept samples.
+    """
+    for block in blocks:
+        if (kept := gate.feed(block)).size:
+            yield kept
+    if (kept := gate.flush()).size:
+        yield kept
+
+
+def trim_silence(
+    fn: os.PathLike,
+    output: os.PathLike,
+    *,
+    sample_rate: int = DEFAULT_VAD_SAMPLE_RATE,
+    **kwargs,
+) -> VadResult:
+    """
+    Write a copy of a recording with long non-speech stretches compressed.
+
+    One ffmpeg decodes the recording to mono PCM, the samples are gated on
+    the CPU in blocks, and a second ffmpeg encodes the kept samples from its
+    stdin, so the recording is never held in memory.
+
+    Args:
+        fn (os.PathLike): Path to the input audio file.
+        output (os.PathLike): Path of the trimmed audio to write, e.g. "*.mp3".
+        sample_rate (int, optional): Sample rate of the trimmed audio. Defaults to 16000.
+        **kwargs: Options of `SpeechGate`.
+
+    Raises:
+        RuntimeError: Raised if either ffmpeg exits with a non-zero status.
+
+    Returns:
+        VadResult: Trimmed path, time map and the seconds and bytes saved.
+    """
+    gate = SpeechGate(sample_rate, **kwargs)
+    cmd = [
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+        "-f", "s16le", "-ar", str(sample_rate), "-ac", "1", "-i", "-",
+        *ENCODE_ARGS,
+        os.fspath(output),
+    ]
+    enc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        for kept in gate_speech(iter_pcm(fn, sample_rate), gate):
+            enc.stdin.write((np.clip(kept, -1.0, 1.0 - 1 / 32768) * 32768).astype("<i2").tobytes())
+    except BaseException:
+        enc.kill()
+        enc.communicate()
+        raise
+    _, stderr = enc.communicate()
+    if enc.returncode != 0:
+        raise RuntimeError(f"ffmpeg exited with status {enc.returncode}: {stderr.decode(errors='replace').strip()}")
+
+    hop = gate.frame_len / sample_rate
+    return VadResult(
+        path=os.fspath(output),
+        time_map=gate.time_map(),
+        original_seconds=gate.in_frames * hop,
+        kept_seconds=gate.out_frames * hop,
+        original_bytes=os.path.getsize(fn),
+        kept_bytes=os.path.getsize(output),
+    )
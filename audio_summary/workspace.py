@@ -0,0 +1,246 @@
+"""
+Per-job workspaces for scratch files.
+
+A job keeps everything it only needs while running (split chunks, per-chunk
+transcript files, a converted video) in one directory under the workspace
+root, which is removed when the job ends, whether it succeeded or failed.
+An owner marker names the process of the job, so a startup sweep and the
+purger can reclaim the workspace of a process that crashed as one unit,
+and never touch the workspace of a job still running.
+"""
+import os
+import json
+import time
+import shutil
+import socket
+import logging
+import tempfile
+import functools
+import contextvars
+from typing import Awaitable, Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+OWNER_FILE = ".owner"
+# A workspace without a readable marker may be one being created right now.
+_MARKER_GRACE_SECONDS = 60
+
+_current: contextvars.ContextVar["Workspace | None"] = contextvars.ContextVar("workspace", default=None)
+
+T = TypeVar("T")
+
+
+def get_workspace_root() -> str:
+    """
+    Get the directory holding the workspaces.
+
+    Returns:
+        str: APP_WORKSPACE_DIR, or "audio_summary/workspaces" in the system temporary directory.
+    """
+    root = os.getenv("APP_WORKSPACE_DIR")
+    if root:
+        return os.path.expanduser(root)
+    return os.path.join(tempfile.gettempdir(), "audio_summary", "workspaces")
+
+
+class Workspace:
+    """
+    Scratch directory of one job, removed when the job ends.
+
+    Used as a context manager, which also makes it the current workspace of
+    the job, so helpers such as `split_audio` put their files in it.
+
+    Example:
+        with Workspace(job_id) as workspace:
+            chunks_dir = workspace.mkdir("chunks")
+    """
+
+    def __init__(self, job_id: str | None = None, root: str | os.PathLike | None = None):
+        """
+        Args:
+            job_id (str | None, optional): Job the workspace belongs to, used in its name. Defaults to None.
+            root (str | os.PathLike | None, optional): Workspace root. Defaults to `get_workspace_root()`.
+        """
+        self.job_id = job_id or "job"
+        self.root = os.fspath(root) if root is not None else get_workspace_root()
+        self.dir = ""
+        self._token: contextvars.Token | None = None
+
+    def create(self) -> "Workspace":
+        """
+        Create the directory and its owner marker.
+
+        Returns:
+            Workspace: This workspace.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        self.dir = tempfile.mkdtemp(prefix=f"{self.job_id}.", dir=self.root)
+        with open(os.path.join(self.dir, OWNER_FILE), "w", encoding="utf8") as f:
+            json.dump(process_owner(), f)
+        return self
+
+    def path(self, *parts: str) -> str:
+        """Path of a file in the workspace."""
+        return os.path.join(self.dir, *parts)
+
+    def mkdir(self, name: str) -> str:
+        """
+        Create a subdirectory, e.g. for the chunks of one split.
+
+        Args:
+            name (str): Prefix of the subdirectory; a unique suffix is added.
+
+        Returns:
+            str: Path to the subdirectory.
+        """
+        return tempfile.mkdtemp(prefix=f"{name}_", dir=self.dir)
+
+    def close(self):
+        """Remove the workspace and everything in it."""
+        if self.dir:
+            shutil.rmtree(self.dir, ignore_errors=True)
+
+    def __enter__(self) -> "Workspace":
+        self.create()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        if self._token is not None:
+            _current.reset(self._token)
+            self._token = None
+        self.close()
+
+
+def current_workspace() -> Workspace | None:
+    """The workspace of the running job, or None outside a job."""
+    return _current.get()
+
+
+def scratch_dir(name: str) -> str:
+    """
+    Create a directory for scratch files of the running job.
+
+    Args:
+        name (str): Prefix of the directory.
+
+    Returns:
+        str: A new directory in the current workspace, which removes it with the job, or in
+            the system temporary directory outside a job.
+    """
+    workspace = current_workspace()
+    if workspace is not None:
+        return workspace.mkdir(name)
+    return tempfile.mkdtemp(prefix=f"audio_summary_{name}_")
+
+
+def in_workspace(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """
+    Run a coroutine function of a job inside its own workspace.
+
+    The workspace is named after the `job_id` keyword argument, if any, and
+    removed when the coroutine returns or raises.
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs) -> T:
+        with Workspace(kwargs.get("job_id")):
+            return await fn(*args, **kwargs)
+
+    return wrapper
+
+
+def process_owner() -> dict:
+    """Owner record of the current process: its pid and host, and when it claimed the work."""
+    return {"pid": os.getpid(), "host": socket.gethostname(), "created": time.time()}
+
+
+def owner_alive(owner: dict) -> bool:
+    """Whether the process on this host named by an owner record still runs."""
+    pid = owner.get("pid")
+    if not isinstance(pid, int):
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    # A process started after the workspace only reuses the pid, e.g. after a container restart.
+    started = _process_start(pid)
+    return started is None or started <= owner.get("created", 0) + 2
+
+
+def _process_start(pid: int) -> float | None:
+    """Start time of a process from /proc, or None where it is not available."""
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/stat", "r") as f:
+            boot = next(int(line.split()[1]) for line in f if line.startswith("btime"))
+        return boot + int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, StopIteration):
+        return None
+
+
+def _workspace_size(path: str) -> int:
+    size = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                size += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                continue
+    return size
+
+
+def sweep_orphans(
+    root: str | os.PathLike | None = None, *, stale_after: float | None = None, dry_run: bool = False
+) -> tuple[int, int]:
+    """
+    Remove the workspaces whose job can no longer finish.
+
+    A workspace is orphaned when its process on this host is gone, when it
+    has had no owner marker for a minute, or, if `stale_after` is given,
+    when it was created on another host longer ago than that.
+
+    Args:
+        root (str | os.PathLike | None, optional): Workspace root. Defaults to `get_workspace_root()`.
+        stale_after (float | None, optional): Age in seconds after which workspaces of other hosts, whose
+            owner cannot be checked, are removed too. Defaults to None, which keeps them.
+        dry_run (bool, optional): Only report the orphans. Defaults to False.
+
+    Returns:
+        tuple[int, int]: Workspaces removed and the bytes they held.
+    """
+    root = os.fspath(root) if root is not None else get_workspace_root()
+    try:
+        entries = list(os.scandir(root))
+    except FileNotFoundError:
+        return 0, 0
+    now = time.time()
+    removed = freed = 0
+    for entry in entries:
+        if not entry.is_dir(follow_symlinks=False):
+            continue
+        try:
+            with open(os.path.join(entry.path, OWNER_FILE), "r", encoding="utf8") as f:
+                owner = json.load(f)
+        except (OSError, ValueError):
+            # The marker is written right after the directory, so only a new workspace may lack it.
+            orphaned = now - entry.stat().st_mtime > _MARKER_GRACE_SECONDS
+        else:
+            if owner.get("host") == socket.gethostname():
+                orphaned = not owner_alive(owner)
+            else:
+                orphaned = stale_after is not None and now - owner.get("created", now) > stale_after
+        if not orphaned:
+            continue
+        size = _workspace_size(entry.path)
+        if dry_run:
+            logger.info("[DRY RUN] Would remove orphaned workspace %s (%d bytes)", entry.path, size)
+        else:
+            shutil.rmtree(entry.path, ignore_errors=True)
+            logger.info("Removed orphaned workspace %s (%d bytes)", entry.path, size)
+        removed += 1
+        freed += size
+    return removed, freed
@@ -0,0 +1,80 @@
+"""
+Benchmark the import time of the entry points with `python -X importtime`.
+
+Each target is imported in a fresh interpreter several times. The best
+cumulative time of the target, the slowest modules it pulls in and any
+heavy optional dependency that got loaded anyway are reported. `--json`
+writes the numbers for tracking across releases.
+
+Example:
+    python benchmarks/bench_import_time.py --repeat 5 --json import_time.json
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+TARGETS = (
+    "audio_summary.app",
+    "audio_summary.batch",
+    "audio_summary.server.jobs",
+    "audio_summary.purger.cli",
+)
+# Dependencies that only specific code paths need; none should load on import.
+HEAVY_MODULES = ("openai", "google.generativeai", "numpy", "librosa", "faster_whisper", "pypandoc", "streamlit")
+
+
+def measure(target: str) -> tuple[int, dict[str, int], list[str]]:
+    """
+    Import `target` in a fresh interpreter.
+
+    Returns:
+        tuple[int, dict[str, int], list[str]]: Cumulative microseconds of the target, self
+            microseconds per imported module, and the heavy modules that were loaded.
+    """
+    code = (
+        f"import sys, json; import {target}; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True)
+    cumulative = 0
+    self_us: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cum, name = line[len("import time:"):].split("|")
+        self_us[name.strip()] = int(own)
+        if name.strip() == target:
+            cumulative = int(cum)
+    return cumulative, self_us, json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark entry point import times.")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per target; the best time is reported.")
+    parser.add_argument("--top", type=int, default=5, help="Slowest modules listed per target.")
+    parser.add_argument("--json", type=str, default=None, help="Write the results to this JSON file.")
+    parser.add_argument("targets", nargs="*", default=TARGETS, help="Modules to import.")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'target':<28}{'ms':>8}  heavy modules loaded")
+    for target in args.targets:
+        runs = [measure(target) for _ in range(args.repeat)]
+        cumulative, self_us, heavy = min(runs, key=lambda r: r[0])
+        results[target] = {
+            "ms": cumulative / 1000,
+            "heavy": heavy,
+            "slowest": dict(sorted(self_us.items(), key=lambda kv: -kv[1])[:args.top]),
+        }
+        print(f"{target:<28}{cumulative / 1000:>8.1f}  {', '.join(heavy) or '-'}")
+        for name, us in results[target]["slowest"].items():
+            print(f"    {name:<40}{us / 1000:>8.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf8") as f:
+            json.dump({"python": sys.version.split()[0], "targets": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
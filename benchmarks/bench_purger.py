@@ -0,0 +1,113 @@
+"""
+Benchmark `Purger.purge_files` on a generated tree of old and new files.
+
+The tree holds `--files` files spread over nested directories, two thirds
+of them older than the retention period. The previous scanner (pathlib
+`glob('**/*')` with `is_file()` and `stat()` per path and one `unlink` at a
+time) is timed against the current scandir scan and against a purge from
+the purge index, which only visits expired entries. Each runs as a dry run
+and deleting, on a fresh tree, then once more on the purged tree ("repeat"),
+which is the usual scheduled run with few or no expired files.
+
+Example:
+    python benchmarks/bench_purger.py --files 100000 --workers 8
+"""
+import os
+import time
+import shutil
+import contextlib
+import argparse
+import tempfile
+from pathlib import Path
+
+from audio_summary.purger.purger import Purger, _iter_files
+
+AGE_DAYS = 7
+
+
+def make_tree(root: str, files: int, per_dir: int = 500):
+    """Write `files` empty files, `per_dir` per directory, two levels deep."""
+    old = time.time() - (AGE_DAYS + 3) * 86400
+    for i in range(files):
+        d = os.path.join(root, f"d{i // (per_dir * 20)}", f"e{i // per_dir}")
+        if i % per_dir == 0:
+            os.makedirs(d, exist_ok=True)
+        path = os.path.join(d, f"f{i}.mp3" if i % 2 else f"f{i}.txt")
+        with open(path, "wb"):
+            pass
+        if i % 3:
+            os.utime(path, (old, old))
+
+
+def legacy_purge(dump_dir: Path, age_days: int, dry_run: bool) -> int:
+    """The scanner before the rewrite, without its logging."""
+    cutoff = time.time() - age_days * 86400
+    purged = 0
+    for file_path in dump_dir.glob('**/*'):
+        if not file_path.is_file():
+            continue
+        if file_path.stat().st_mtime >= cutoff:
+            continue
+        if not dry_run:
+            file_path.unlink()
+            purged += 1
+    return purged
+
+
+def scandir_purger(root: str, dry: bool, workers: int) -> Purger:
+    """A purger that scans the tree. Its workspace root is inside the tree, so the real one is never swept."""
+    return Purger(
+        root, age_days=AGE_DAYS, dry_run=dry, workers=workers, log_level="WARNING",
+        workspace_root=os.path.join(root, ".work"),
+    )
+
+
+def indexed_purger(root: str, dry: bool, workers: int) -> Purger:
+    """A purger whose index holds every file of the tree, as if the app had registered them."""
+    purger = Purger(
+        root, age_days=AGE_DAYS, dry_run=dry, workers=workers, log_level="WARNING",
+        index_path=root + ".index.sqlite3", rescan_hours=1e9, workspace_root=os.path.join(root, ".work"),
+    )
+    rows = []
+    for entry in _iter_files(root):
+        st = entry.stat()
+        rows.append((entry.path, st.st_size, st.st_mtime, st.st_mtime + AGE_DAYS * 86400))
+    purger.index.replace_all(rows, time.time())
+    return purger
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the purger scan and delete.")
+    parser.add_argument("--files", type=int, default=100_000, help="Files in the generated tree.")
+    parser.add_argument("--workers", type=int, default=8, help="Delete threads of the purger.")
+    parser.add_argument("--dir", type=str, default=None, help="Where to generate the tree, e.g. on network storage.")
+    args = parser.parse_args()
+
+    # Each scanner prepares a purge of a tree; only the purge itself is timed.
+    scanners = (
+        ("legacy", lambda root, dry: lambda: legacy_purge(Path(root), AGE_DAYS, dry)),
+        ("scandir", lambda root, dry: scandir_purger(root, dry, args.workers).purge_files),
+        ("indexed", lambda root, dry: indexed_purger(root, dry, args.workers).purge_files),
+    )
+    print(f"{'scanner':<10}{'mode':<8}{'files/s':>12}{'seconds':>10}{'deleted':>10}")
+    for name, prepare in scanners:
+        for mode in ("dry-run", "delete"):
+            root = tempfile.mkdtemp(prefix="bench_purger_", dir=args.dir)
+            try:
+                make_tree(root, args.files)
+                purge = prepare(root, mode == "dry-run")
+                runs = [mode] if mode == "dry-run" else [mode, "repeat"]
+                for label in runs:
+                    t0 = time.perf_counter()
+                    deleted = purge()
+                    elapsed = time.perf_counter() - t0
+                    print(f"{name:<10}{label:<8}{args.files / elapsed:>12.0f}{elapsed:>10.2f}{deleted:>10}")
+            finally:
+                shutil.rmtree(root, ignore_errors=True)
+                for suffix in ("", "-wal", "-shm"):
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(root + ".index.sqlite3" + suffix)
+
+
+if __name__ == "__main__":
+    main()
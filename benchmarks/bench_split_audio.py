@@ -0,0 +1,68 @@
+"""
+Benchmark `split_audio` modes on synthetic long recordings.
+
+Generates WAV and MP3 files locally with ffmpeg's lavfi sources and compares
+the wall-clock time of the per-chunk loop against the single-pass segmenter,
+with and without the silence-aware cut detection.
+
+Example:
+    python benchmarks/bench_split_audio.py --minutes 180 --duration 600
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+from audio_summary.app import split_audio
+
+
+def make_fixture(path: str, minutes: float) -> str:
+    """Render a synthetic tone + noise recording of the given length."""
+    cmd = [
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+        "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=44100:duration={minutes * 60}",
+        "-f", "lavfi", "-i", f"anoisesrc=color=pink:sample_rate=44100:amplitude=0.05:duration={minutes * 60}",
+        "-filter_complex", "amix=inputs=2:duration=shortest",
+        "-ac", "2", path,
+    ]
+    subprocess.run(cmd, check=True)
+    return path
+
+
+def bench(fn: str, duration: float, mode: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        out_dir = tempfile.mkdtemp(prefix=".bench_split_")
+        try:
+            t0 = time.perf_counter()
+            split_audio(fn, duration=duration, output_dir=out_dir, mode=mode)
+            best = min(best, time.perf_counter() - t0)
+        finally:
+            shutil.rmtree(out_dir, ignore_errors=True)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark split_audio modes.")
+    parser.add_argument("--minutes", type=float, default=180, help="Length of the synthetic recording.")
+    parser.add_argument("--duration", type=float, default=600, help="Chunk length in seconds.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode; the best time is reported.")
+    parser.add_argument("--formats", type=str, default="wav,mp3", help="Comma separated fixture formats.")
+    args = parser.parse_args()
+
+    fixture_dir = tempfile.mkdtemp(prefix=".bench_fixture_")
+    try:
+        print(f"{'format':<8}{'mode':<10}{'seconds':>10}")
+        for ext in args.formats.split(","):
+            fn = make_fixture(os.path.join(fixture_dir, f"synthetic.{ext}"), args.minutes)
+            for mode in ("loop", "segment", "silence"):
+                elapsed = bench(fn, args.duration, mode, args.repeat)
+                print(f"{ext:<8}{mode:<10}{elapsed:>10.2f}")
+    finally:
+        shutil.rmtree(fixture_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
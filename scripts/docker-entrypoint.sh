@@ -1,7 +1,10 @@
 #!/bin/bash
 
+# 清理排程在伺服器行程內執行，伺服器啟動時即開始排程，不另外啟動 audio_summary_purger
+export PURGE_IN_PROCESS=${PURGE_IN_PROCESS:-true}
+export PURGE_AGE_DAYS=${PURGE_AGE_DAYS:-$APP_FILE_DUMP_AGE_DAYS}
+
 audio_summary > /dev/stdout 2>&1 &
-audio_summary_purger --start-scheduler --dump-dir $APP_FILE_DUMP --age-days $APP_FILE_DUMP_AGE_DAYS > /dev/stdout 2>&1 &
 
 # 保持容器運行
-tail -f /dev/null
\ No newline at end of file
+tail -f /dev/null
@@ -1,10 +1,21 @@
+import os
+import time
 import pytest
 import asyncio
 from unittest.mock import patch, AsyncMock, MagicMock
 
+# The app imports the SDKs lazily; import the ones patched below up front, before
+# any test replaces `os.environ.get` that their own imports read.
+import google.generativeai  # noqa: F401
+import openai  # noqa: F401
+
 # Assuming your application structure allows this import
 # Adjust the import path based on your project structure
-from audio_summary.app import _summarize
+from audio_summary.app import (
+    MemoryChunk, _summarize, _asummarize_stream, clear_summary_provider_cache, adump_transcription,
+    agather_transcription, asplit_audio, astream_transcription, split_audio,
+)
+from audio_summary.probe import MediaInfo
 from audio_summary.api_utils import (
     get_openai_prompt_parts,
     get_openai_default_config,
@@ -13,11 +24,19 @@ from audio_summary.api_utils import (
     get_gemini_default_safety_setting
 )
 from audio_summary.exceptions import OpenaiApiKeyNotFound
+from audio_summary.workspace import Workspace
 
 # Mock environment variables before imports that might use them at module level
 # or ensure they are set before tests run that rely on them.
 # For _summarize, API keys are checked inside, so direct os.environ patching is better.
 
+@pytest.fixture(autouse=True)
+def _fresh_summary_providers():
+    clear_summary_provider_cache()
+    yield
+    clear_summary_provider_cache()
+
+
 @pytest.mark.asyncio
 async def test_summarize_function_calls_openai_when_specified():
     """
@@ -97,10 +116,315 @@ async def test_summarize_openai_raises_exception_if_no_key():
         
         mock_async_openai_client_constructor.assert_not_called()
 
+@pytest.mark.asyncio
+async def test_summarize_uses_the_key_of_the_run_over_the_environment():
+    """
+    Tests that a key passed for a run builds its own client, so concurrent
+    runs with different keys never use each other's.
+    """
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "sk-server"}), \
+         patch('openai.AsyncOpenAI') as mock_async_openai_client_constructor:
+        mock_openai_instance = AsyncMock()
+        mock_async_openai_client_constructor.return_value = mock_openai_instance
+        mock_openai_instance.chat.completions.create.return_value.choices = [MagicMock(message=MagicMock(content="ok"))]
+
+        await asyncio.gather(
+            _summarize(content="a", by_="openai", resp_lang="en", api_key="sk-alice"),
+            _summarize(content="b", by_="openai", resp_lang="en", api_key="sk-bob"),
+            _summarize(content="c", by_="openai", resp_lang="en"),
+        )
+
+    assert [c.kwargs["api_key"] for c in mock_async_openai_client_constructor.call_args_list] == [
+        "sk-alice", "sk-bob", "sk-server",
+    ]
+
 # It might be good to add a test for by_ being an invalid value,
 # but the function signature uses Literal, which should ideally be caught by type checkers.
 # A runtime check is also present.
 
+def test_split_audio_segment_mode_returns_ordered_chunks(tmp_path):
+    """
+    Tests that the segment mode runs ffmpeg once and returns the chunks in
+    the order written to the segment list.
+    """
+    def fake_run(cmd, **kwargs):
+        segment_list = cmd[cmd.index("-segment_list") + 1]
+        with open(segment_list, "w") as f:
+            f.write("talk_1.mp3\ntalk_2.mp3\ntalk_3.mp3\n")
+        return MagicMock(returncode=0, stderr="")
+
+    with patch('audio_summary.app.subprocess.run', side_effect=fake_run) as mock_run:
+        result = split_audio("talk.mp3", duration=600, output_dir=str(tmp_path), mode="segment")
+
+    mock_run.assert_called_once()
+    assert result == [str(tmp_path / f"talk_{i}.mp3") for i in (1, 2, 3)]
+
+
+def test_split_audio_segment_mode_raises_on_ffmpeg_failure(tmp_path):
+    """
+    Tests that a non-zero ffmpeg exit status is surfaced as RuntimeError.
+    """
+    with patch('audio_summary.app.subprocess.run', return_value=MagicMock(returncode=1, stderr="boom")):
+        with pytest.raises(RuntimeError, match="boom"):
+            split_audio("talk.mp3", duration=600, output_dir=str(tmp_path), mode="segment")
+
+
+@pytest.mark.asyncio
+async def test_asplit_audio_bounds_concurrent_ffmpeg_processes(tmp_path):
+    """
+    Tests that the parallel split mode yields every chunk once while never
+    running more ffmpeg processes than `workers`.
+    """
+    running = 0
+    peak = 0
+
+    async def fake_extract(fn, start_time, duration, output, fmt=None):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return output
+
+    with patch('audio_summary.app.get_duration', return_value=50), \
+         patch('audio_summary.app._aextract_chunk', side_effect=fake_extract):
+        chunks = [c async for c in asplit_audio("talk.mp3", duration=10, output_dir=str(tmp_path), workers=2)]
+
+    assert sorted(i for i, _ in chunks) == [0, 1, 2, 3, 4]
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_adump_transcription_orders_streamed_chunks(tmp_path, monkeypatch):
+    """
+    Tests that the deprecated wrapper still transcribes chunks streamed out
+    of order and returns their files in sequence order, in a directory of
+    the job workspace.
+    """
+    monkeypatch.chdir(tmp_path)
+
+    async def stream():
+        for i in (2, 0, 1):
+            yield i, f"chunk_{i}.mp3"
+
+    async def fake_transcribe(audio, dispatcher=None, cache=None):
+        return f"text of {audio}"
+
+    dispatcher = MagicMock(model="whisper-1", concurrency=4)
+    with patch('audio_summary.app.get_duration', return_value=60), \
+         patch('audio_summary.app._atranscribe', side_effect=fake_transcribe), \
+         Workspace("job1", tmp_path / "work") as workspace:
+        with pytest.warns(DeprecationWarning, match="adump_transcription"):
+            result = await adump_transcription(stream(), now="test", dispatcher=dispatcher)
+        with pytest.warns(DeprecationWarning):
+            other = await adump_transcription(stream(), now="test", dispatcher=dispatcher)
+        texts = [open(fn).read() for fn in result]
+
+    tmp_dir = os.path.dirname(result[0])
+    assert os.path.basename(tmp_dir).startswith("transcriptions_test_")
+    assert os.path.dirname(tmp_dir) == workspace.dir and not os.path.exists(workspace.dir)
+    assert os.listdir(tmp_path) == ["work"]
+    assert result == [f"{tmp_dir}/.{i}.txt" for i in range(3)]
+    assert texts == [f"text of chunk_{i}.mp3" for i in range(3)]
+    # Jobs started in the same second still get their own directory.
+    assert os.path.dirname(other[0]) != tmp_dir
+
+
+@pytest.mark.asyncio
+async def test_asplit_audio_in_memory_pipes_chunks_at_cut_times(tmp_path):
+    """
+    Tests that the in-memory mode reads every chunk from the ffmpeg pipe in a
+    pipe-friendly format, honours explicit cut times and writes nothing.
+    """
+    calls = []
+
+    async def fake_extract_bytes(fn, start_time, duration, fmt):
+        calls.append((start_time, duration, fmt.muxer))
+        return f"audio@{start_time}".encode()
+
+    info = MediaInfo(path="talk.wav", duration=50, codec="pcm_s16le", bit_rate=256000, channels=1, sample_rate=16000, size=1)
+    with patch('audio_summary.app.get_duration', return_value=50), \
+         patch('audio_summary.app.probe', return_value=info), \
+         patch('audio_summary.app._aextract_chunk_bytes', side_effect=fake_extract_bytes):
+        chunks = dict([
+            c async for c in asplit_audio(
+                "talk.wav", duration=20, output_dir=str(tmp_path / "unused"), segment_times=[18.5, 41.0], in_memory=True
+            )
+        ])
+
+    assert sorted(calls) == [(0.0, 18.5, "flac"), (18.5, 22.5, "flac"), (41.0, 9.0, "flac")]
+    assert chunks[1] == MemoryChunk("talk_2.flac", b"audio@18.5", 22.5)
+    assert not (tmp_path / "unused").exists()
+
+
+@pytest.mark.asyncio
+async def test_agather_transcription_uploads_memory_chunks_in_order():
+    """
+    Tests that in-memory chunks are uploaded as `(name, bytes)` pairs, short
+    ones are skipped and transcripts come back in chunk order.
+    """
+    chunks = [MemoryChunk(f"talk_{i}.mp3", f"audio {i}".encode(), 1 if i == 2 else 60) for i in range(4)]
+
+    async def fake_transcribe(upload):
+        name, data = upload
+        await asyncio.sleep(0.01 * (4 - int(name[-5])))
+        return data.decode().replace("audio", "text")
+
+    dispatcher = MagicMock(model="whisper-1", concurrency=4)
+    dispatcher.transcribe = AsyncMock(side_effect=fake_transcribe)
+    texts = await agather_transcription(chunks, dispatcher=dispatcher)
+
+    assert texts == ["text 0", "text 1", "text 3"]
+    assert dispatcher.transcribe.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_agather_transcription_bounds_chunks_in_flight():
+    """
+    Tests that no more chunks are pulled from a streamed split than the
+    backend transcribes at once, so the rest never pile up in memory.
+    """
+    pulled = finished = peak = 0
+
+    async def stream():
+        nonlocal pulled, peak
+        for i in range(8):
+            pulled += 1
+            peak = max(peak, pulled - finished)
+            yield i, MemoryChunk(f"talk_{i}.mp3", f"audio {i}".encode(), 60)
+
+    async def fake_transcribe(upload):
+        nonlocal finished
+        await asyncio.sleep(0.01)
+        finished += 1
+        return upload[1].decode()
+
+    dispatcher = MagicMock(model="whisper-1", concurrency=2)
+    dispatcher.transcribe = AsyncMock(side_effect=fake_transcribe)
+    texts = await agather_transcription(stream(), dispatcher=dispatcher)
+
+    assert texts == [f"audio {i}" for i in range(8)]
+    # Two chunks in flight plus the one waiting for a free slot.
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_astream_transcription_reassembles_in_order(tmp_path):
+    """
+    Tests that the streaming pipeline writes transcripts in chunk order,
+    skips short chunks and deletes transcribed chunks when asked.
+    """
+    chunks = {i: tmp_path / f"chunk_{i}.mp3" for i in range(4)}
+    for c in chunks.values():
+        c.write_bytes(b"audio")
+
+    async def stream():
+        for i in (3, 1, 0, 2):
+            yield i, str(chunks[i])
+
+    async def fake_transcribe(audio, dispatcher=None, cache=None):
+        await asyncio.sleep(0.01 * (4 - int(audio[-5])))
+        return f"text {audio[-5]}"
+
+    output = tmp_path / "out.txt"
+    with patch('audio_summary.app.get_duration', side_effect=lambda a: 1 if a.endswith("_2.mp3") else 60), \
+         patch('audio_summary.app._atranscribe', side_effect=fake_transcribe):
+        chunk_texts = await astream_transcription(stream(), output, workers=2, remove_chunks=True)
+
+    assert chunk_texts == ["text 0", "text 1", "text 3"]
+    assert output.read_text(encoding="utf8") == "text 0\ntext 1\ntext 3\n"
+    assert [c.exists() for c in chunks.values()] == [False, False, True, False]
+
+
+@pytest.mark.asyncio
+async def test_astream_transcription_propagates_worker_errors(tmp_path):
+    """
+    Tests that a failing transcription cancels the pipeline and re-raises.
+    """
+    async def fake_transcribe(audio, dispatcher=None, cache=None):
+        raise RuntimeError("whisper down")
+
+    with patch('audio_summary.app.get_duration', return_value=60), \
+         patch('audio_summary.app._atranscribe', side_effect=fake_transcribe):
+        with pytest.raises(RuntimeError, match="whisper down"):
+            await astream_transcription([f"chunk_{i}.mp3" for i in range(10)], tmp_path / "out.txt", workers=2)
+
+
+@pytest.mark.asyncio
+async def test_summarize_gemini_does_not_block_event_loop_and_reuses_model():
+    """
+    Tests that the synchronous Gemini call is offloaded from the event loop
+    and that the configured model is built only once.
+    """
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        for _ in range(10):
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    def slow_generate(prompt_parts):
+        time.sleep(0.2)
+        return MagicMock(text="Gemini summary")
+
+    with patch('os.environ.get', return_value='fake_api_key'), \
+         patch('google.generativeai.GenerativeModel') as mock_generative_model_constructor, \
+         patch('google.generativeai.configure') as mock_gemini_configure:
+        mock_generative_model_constructor.return_value.generate_content.side_effect = slow_generate
+
+        results = await asyncio.gather(
+            _summarize(content="a", by_="gemini", resp_lang="en"),
+            _summarize(content="b", by_="gemini", resp_lang="en"),
+            ticker(),
+        )
+
+    assert results[:2] == ["Gemini summary", "Gemini summary"]
+    assert ticks == 10
+    mock_gemini_configure.assert_called_once_with(api_key='fake_api_key')
+    mock_generative_model_constructor.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_summarize_stream_yields_openai_deltas():
+    """
+    Tests that the streaming API requests a stream and yields the deltas.
+    """
+    async def fake_stream():
+        for delta in ("Open", None, "AI"):
+            yield MagicMock(choices=[MagicMock(delta=MagicMock(content=delta))])
+
+    with patch('os.environ.get', return_value='fake_api_key'), \
+         patch('openai.AsyncOpenAI') as mock_async_openai_client_constructor, \
+         patch('audio_summary.app.get_openai_default_config', return_value={"model": "test-model"}):
+        mock_create = AsyncMock(return_value=fake_stream())
+        mock_async_openai_client_constructor.return_value.chat.completions.create = mock_create
+
+        tokens = [t async for t in _asummarize_stream(content="Test content", by_="openai", resp_lang="en")]
+
+    assert tokens == ["Open", "AI"]
+    assert mock_create.call_args.kwargs["stream"] is True
+
+
+@pytest.mark.asyncio
+async def test_summarize_stream_yields_gemini_chunks():
+    """
+    Tests that Gemini's blocking stream is consumed off the event loop and
+    re-yielded chunk by chunk.
+    """
+    with patch('os.environ.get', return_value='fake_api_key'), \
+         patch('google.generativeai.GenerativeModel') as mock_generative_model_constructor, \
+         patch('google.generativeai.configure'):
+        mock_generative_model_constructor.return_value.generate_content.return_value = iter(
+            [MagicMock(text="Gem"), MagicMock(text="ini")]
+        )
+
+        tokens = [t async for t in _asummarize_stream(content="Test content", by_="gemini", resp_lang="en")]
+
+    assert tokens == ["Gem", "ini"]
+    assert mock_generative_model_constructor.return_value.generate_content.call_args.kwargs == {"stream": True}
+
+
 def main():
     """
     Main function to run pytest.
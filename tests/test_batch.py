@@ -0,0 +1,86 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from audio_summary.batch import DONE, FAILED, arun_batch, collect_inputs
+from audio_summary.probe import MediaInfo
+
+
+def test_collect_inputs_scans_directories_for_media_and_expands_globs(tmp_path):
+    """
+    Tests that a directory yields its media files only, and that a glob
+    pattern yields whatever files it matches, sorted.
+    """
+    for name in ("b.mp3", "a.M4A", "notes.txt", "cover.jpg"):
+        (tmp_path / name).write_bytes(b"x")
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "nested" / "c.mp3").write_bytes(b"x")
+
+    assert collect_inputs(str(tmp_path)) == [str(tmp_path / "a.M4A"), str(tmp_path / "b.mp3")]
+    assert collect_inputs(str(tmp_path / "**" / "*.mp3")) == [str(tmp_path / "b.mp3"), str(tmp_path / "nested" / "c.mp3")]
+    assert collect_inputs(str(tmp_path / "*.wav")) == []
+
+
+@pytest.mark.asyncio
+async def test_arun_batch_shares_pools_and_reports_every_file(tmp_path):
+    """
+    Tests that at most `files_in_flight` files run at once, that every file
+    gets the same shared limiters, including one Whisper dispatcher with the
+    batch limits, and its own outputs, and that a failed
+    file is reported without stopping the others.
+    """
+    inputs = [f"in/{name}.mp3" for name in ("talk", "demo", "broken", "talk")] + ["other/talk.mp3"]
+    running = 0
+    peak = 0
+    calls = []
+
+    async def fake_main(*, fp, output, summary_output, ffmpeg_limiter, summary_limiter, **kwargs):
+        nonlocal running, peak
+        calls.append((output, summary_output, ffmpeg_limiter, summary_limiter, kwargs["summarize"], kwargs["dispatcher"]))
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        if "broken" in fp:
+            raise RuntimeError("whisper down")
+        return "transcript", "minutes"
+
+    info = MediaInfo(path="x", duration=600, codec="mp3", bit_rate=64000, channels=1, sample_rate=16000, size=1)
+    with patch('audio_summary.batch.probe', return_value=info):
+        report = await arun_batch(
+            inputs, str(tmp_path / "out"), files_in_flight=2, ffmpeg_workers=3, whisper_concurrency=5,
+            runner=fake_main, summarize=True,
+        )
+
+    assert peak == 2
+    assert [f.status for f in report.files] == [DONE, DONE, FAILED, DONE, DONE]
+    assert report.files[2].error == "whisper down"
+    assert [f.transcript for f in report.files][3:] == [str(tmp_path / "out" / "talk_2.txt"), str(tmp_path / "out" / "talk_3.txt")]
+    assert report.files[0].summary == str(tmp_path / "out" / "meeting-minutes_talk.md")
+    assert len({id(c[2]) for c in calls}) == 1 and len({id(c[3]) for c in calls}) == 1
+    assert calls[0][2]._value == 3
+    assert len({id(c[5]) for c in calls}) == 1 and calls[0][5].max_in_flight == 5
+    assert report.audio_seconds == 3000
+    assert report.files[0].speed > 0 and report.speed > 0
+    assert "4/5" in report.format().splitlines()[-1]
+
+
+@pytest.mark.asyncio
+async def test_arun_batch_reports_an_empty_summary_as_failed(tmp_path):
+    """
+    Tests that a file whose summarization returned nothing is reported as
+    failed with its transcript, while an unsummarized run is done.
+    """
+    async def fake_main(*, fp, **kwargs):
+        return "transcript", ""
+
+    info = MediaInfo(path="x", duration=600, codec="mp3", bit_rate=64000, channels=1, sample_rate=16000, size=1)
+    with patch('audio_summary.batch.probe', return_value=info):
+        summarized = await arun_batch(["in/talk.mp3"], str(tmp_path / "a"), runner=fake_main, summarize=True)
+        transcribed = await arun_batch(["in/talk.mp3"], str(tmp_path / "b"), runner=fake_main, summarize=False)
+
+    assert summarized.files[0].status == FAILED
+    assert summarized.files[0].error == "Summarization failed."
+    assert summarized.files[0].transcript == str(tmp_path / "a" / "talk.txt")
+    assert transcribed.files[0].status == DONE and transcribed.files[0].summary == ""
@@ -0,0 +1,85 @@
+import os
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from audio_summary.app import _atranscribe
+from audio_summary.cache import TranscriptCache
+
+
+def test_cache_key_depends_on_content_and_model(tmp_path):
+    """
+    Tests that identical audio maps to the same key per model.
+    """
+    a = tmp_path / "a.mp3"
+    b = tmp_path / "b.mp3"
+    a.write_bytes(b"same audio")
+    b.write_bytes(b"same audio")
+
+    assert TranscriptCache.key(a, "whisper-1") == TranscriptCache.key(b, "whisper-1")
+    assert TranscriptCache.key(a, "whisper-1") != TranscriptCache.key(a, "whisper-2")
+    # In-memory chunks share entries with the same audio on disk.
+    assert TranscriptCache.key(b"same audio", "whisper-1") == TranscriptCache.key(a, "whisper-1")
+
+
+def test_cache_counts_hits_and_evicts_least_recently_used(tmp_path):
+    """
+    Tests hit/miss accounting and that eviction drops the oldest entries first.
+    """
+    cache = TranscriptCache(tmp_path / "cache", max_bytes=10_000)
+    assert cache.get("aa" * 32) is None
+    for i, key in enumerate(("aa" * 32, "bb" * 32, "cc" * 32)):
+        cache.put(key, "x" * 100)
+        path = cache._path(key)
+        os.utime(path, (1000 + i, 1000 + i))
+
+    assert cache.get("aa" * 32) == "x" * 100
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    assert cache.evict(max_bytes=200) == 1
+    assert cache.get("bb" * 32) is None
+    assert cache.get("aa" * 32) is not None
+    assert cache.get("cc" * 32) is not None
+
+
+def test_cache_put_scans_only_past_the_size_bound(tmp_path, monkeypatch):
+    """
+    Tests that `put` tracks the cache size as it writes and only scans the
+    directory on the first write and once the bound is passed.
+    """
+    cache = TranscriptCache(tmp_path / "cache", max_bytes=1000)
+    scans = []
+    evict = cache.evict
+    monkeypatch.setattr(cache, "evict", lambda *args: scans.append(1) or evict(*args))
+
+    for i in range(9):
+        cache.put(f"{i:02d}" * 32, "x" * 100)
+        os.utime(cache._path(f"{i:02d}" * 32), (1000 + i, 1000 + i))
+    cache.put("00" * 32, "x" * 100)  # rewriting an entry does not grow the cache
+    assert len(scans) == 1
+
+    cache.put("aa" * 32, "x" * 300)
+    assert len(scans) == 2
+    # The rewritten entry is the most recent one now.
+    assert cache.get("01" * 32) is None and cache.get("02" * 32) is None
+    assert cache.get("00" * 32) is not None
+    assert cache._usage == sum(p.stat().st_size for p in (tmp_path / "cache").glob("*/*.txt")) == 1000
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_skips_whisper(tmp_path):
+    """
+    Tests that a cached chunk is never sent to Whisper.
+    """
+    chunk = tmp_path / "talk_1.mp3"
+    chunk.write_bytes(b"chunk")
+    cache = TranscriptCache(tmp_path / "cache")
+    dispatcher = MagicMock(model="whisper-1")
+    dispatcher.transcribe = AsyncMock(return_value="hello world")
+
+    first = await _atranscribe(str(chunk), dispatcher, cache)
+    second = await _atranscribe(str(chunk), dispatcher, cache)
+
+    assert first == second == "hello world"
+    dispatcher.transcribe.assert_awaited_once()
+    assert (cache.hits, cache.misses) == (1, 1)
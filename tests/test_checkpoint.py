@@ -0,0 +1,199 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from audio_summary.app import main
+from audio_summary.checkpoint import FAILED, JobCheckpoint, derive_job_id
+from audio_summary.exceptions import TranscriptionFailed
+from audio_summary.probe import MediaInfo
+
+
+def test_checkpoint_keeps_transcripts_until_the_source_changes(tmp_path):
+    """
+    Tests that reopening a job keeps its chunk starts and transcripts, and
+    that a changed source recording starts the checkpoint over.
+    """
+    source = tmp_path / "talk.mp3"
+    source.write_bytes(b"audio")
+    root = tmp_path / "jobs"
+
+    checkpoint = JobCheckpoint.open({"fp": str(source), "duration": 600}, "job1", root)
+    checkpoint.set_starts([0, 600, 1200])
+    checkpoint.save_transcript(2, "third")
+    checkpoint.save_transcript(0, "first")
+    checkpoint.update(status=FAILED, error="whisper down")
+
+    reopened = JobCheckpoint.open({"fp": str(source), "duration": 600}, "job1", root)
+    assert reopened.starts == [0.0, 600.0, 1200.0]
+    assert reopened.transcripts() == {0: "first", 2: "third"}
+    assert reopened.read()["status"] == "running"
+    assert JobCheckpoint.load("job1", root).params == {"fp": str(source), "duration": 600}
+
+    source.write_bytes(b"another recording")
+    restarted = JobCheckpoint.open({"fp": str(source)}, "job1", root)
+    assert restarted.starts is None and restarted.transcripts() == {}
+
+    restarted.remove()
+    with pytest.raises(FileNotFoundError):
+        JobCheckpoint.load("job1", root)
+
+
+def test_derived_job_id_follows_source_and_options_but_not_outputs(tmp_path):
+    """
+    Tests that a run without a job id gets the same id for the same source
+    and options, whatever its output paths, and a new one otherwise.
+    """
+    source = tmp_path / "talk.mp3"
+    source.write_bytes(b"audio")
+    params = {"fp": str(source), "duration": 600, "output": "a.txt"}
+
+    job_id = derive_job_id(params)
+    assert derive_job_id({**params, "output": "b.txt", "summary_output": "b.md"}) == job_id
+    assert derive_job_id({**params, "duration": 300}) != job_id
+    source.write_bytes(b"another recording")
+    assert derive_job_id(params) != job_id
+
+
+@pytest.mark.asyncio
+async def test_main_resumes_only_missing_chunks_then_summarizes(tmp_path, monkeypatch):
+    """
+    Tests that a transcription failing at the last chunk raises without
+    losing the finished chunks, and that resuming the job cuts and sends
+    only the missing chunk before summarizing.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("APP_CHECKPOINT_DIR", str(tmp_path / "jobs"))
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    source = tmp_path / "talk.mp3"
+    source.write_bytes(b"audio")
+    info = MediaInfo(path=str(source), duration=150, codec="mp3", bit_rate=64000, channels=1, sample_rate=16000, size=5)
+    cut = []
+    sent = []
+    whisper_up = False
+
+    async def fake_extract_bytes(fn, start_time, duration, fmt):
+        cut.append(start_time)
+        return f"audio@{start_time}".encode()
+
+    async def fake_transcribe(audio, dispatcher=None, cache=None):
+        sent.append(audio.name)
+        if audio.name == "talk_3.mp3" and not whisper_up:
+            await asyncio.sleep(0.05)
+            raise RuntimeError("whisper down")
+        return f"text of {audio.name}"
+
+    params = dict(
+        fp=str(source), duration=60, lang_="en", output=str(tmp_path / "talk.txt"), summarize=True,
+        local_transcription=False, transfer="memory", cache=False, summary_mode="single", job_id="job1",
+    )
+    with patch('audio_summary.app.get_duration', return_value=150), \
+         patch('audio_summary.app.probe', return_value=info), \
+         patch('audio_summary.app._aextract_chunk_bytes', side_effect=fake_extract_bytes), \
+         patch('audio_summary.app._atranscribe', side_effect=fake_transcribe), \
+         patch('audio_summary.app._summarize', AsyncMock(return_value="# Minutes")):
+        with pytest.raises(TranscriptionFailed, match="whisper down"):
+            await main(**params)
+        checkpoint = JobCheckpoint.load("job1")
+        assert checkpoint.read()["status"] == FAILED
+        assert checkpoint.transcripts() == {0: "text of talk_1.mp3", 1: "text of talk_2.mp3"}
+
+        cut.clear()
+        sent.clear()
+        whisper_up = True
+        transcript, summary = await main(**params)
+
+    assert cut == [120.0]
+    assert sent == ["talk_3.mp3"]
+    assert transcript == "text of talk_1.mp3\ntext of talk_2.mp3\ntext of talk_3.mp3\n"
+    assert (tmp_path / "talk.txt").read_text(encoding="utf8") == transcript
+    assert summary == "# Minutes"
+    assert not checkpoint.dir.exists()
+
+
+@pytest.mark.asyncio
+async def test_main_whisper_limits_apply_to_its_own_dispatcher_only(tmp_path, monkeypatch):
+    """
+    Tests that the Whisper limits of one run build a dispatcher for that run,
+    which is closed at the end, and leave the shared dispatcher of the event
+    loop untouched for other jobs.
+    """
+    from audio_summary.transcriber import DEFAULT_MAX_IN_FLIGHT, WhisperDispatcher, get_dispatcher
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("APP_CHECKPOINT_DIR", str(tmp_path / "jobs"))
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.delenv("WHISPER_MAX_IN_FLIGHT", raising=False)
+    source = tmp_path / "talk.mp3"
+    source.write_bytes(b"audio")
+    info = MediaInfo(path=str(source), duration=60, codec="mp3", bit_rate=64000, channels=1, sample_rate=16000, size=5)
+    shared = get_dispatcher()
+    used = []
+
+    async def fake_transcribe(audio, dispatcher=None, cache=None):
+        used.append(dispatcher)
+        dispatcher.client  # opens the pool, which the run must close
+        return "text"
+
+    with patch('audio_summary.app.get_duration', return_value=60), \
+         patch('audio_summary.app.probe', return_value=info), \
+         patch('audio_summary.app._atranscribe', side_effect=fake_transcribe):
+        await main(
+            fp=str(source), duration=600, lang_="en", output=str(tmp_path / "talk.txt"), summarize=False,
+            local_transcription=False, cache=False, whisper_concurrency=2, whisper_rpm=10,
+        )
+
+    assert isinstance(used[0], WhisperDispatcher) and used[0] is not shared
+    assert used[0].max_in_flight == 2 and used[0]._client is None
+    assert get_dispatcher() is shared and shared.max_in_flight == DEFAULT_MAX_IN_FLIGHT
+
+
+@pytest.mark.asyncio
+async def test_rerunning_a_failed_run_without_job_id_sends_only_the_missing_chunk(tmp_path, monkeypatch):
+    """
+    Tests that a run without a job id or APP_CHECKPOINT_DIR keeps the
+    checkpoint of a failure under the default root, and that running the
+    same command again, even with another output path, sends only the
+    missing chunk and removes the checkpoint once it succeeds.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("APP_CHECKPOINT_DIR", raising=False)
+    monkeypatch.delenv("APP_FILE_DUMP", raising=False)
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    source = tmp_path / "talk.mp3"
+    source.write_bytes(b"audio")
+    info = MediaInfo(path=str(source), duration=150, codec="mp3", bit_rate=64000, channels=1, sample_rate=16000, size=5)
+    sent = []
+    whisper_up = False
+
+    async def fake_extract_bytes(fn, start_time, duration, fmt):
+        return f"audio@{start_time}".encode()
+
+    async def fake_transcribe(audio, dispatcher=None, cache=None):
+        sent.append(audio.name)
+        if audio.name == "talk_3.mp3" and not whisper_up:
+            await asyncio.sleep(0.05)
+            raise RuntimeError("whisper down")
+        return f"text of {audio.name}"
+
+    params = dict(
+        fp=str(source), duration=60, lang_="en", summarize=False,
+        local_transcription=False, transfer="memory", cache=False,
+    )
+    with patch('audio_summary.app.get_duration', return_value=150), \
+         patch('audio_summary.app.probe', return_value=info), \
+         patch('audio_summary.app._aextract_chunk_bytes', side_effect=fake_extract_bytes), \
+         patch('audio_summary.app._atranscribe', side_effect=fake_transcribe):
+        with pytest.raises(TranscriptionFailed, match="whisper down"):
+            await main(**params, output=str(tmp_path / "first.txt"))
+        (job_dir,) = (tmp_path / "file_dump.jobs").iterdir()
+        checkpoint = JobCheckpoint.load(job_dir.name)
+        assert checkpoint.transcripts() == {0: "text of talk_1.mp3", 1: "text of talk_2.mp3"}
+
+        sent.clear()
+        whisper_up = True
+        transcript, _ = await main(**params, output=str(tmp_path / "second.txt"))
+
+    assert sent == ["talk_3.mp3"]
+    assert transcript == "text of talk_1.mp3\ntext of talk_2.mp3\ntext of talk_3.mp3\n"
+    assert not checkpoint.dir.exists()
@@ -0,0 +1,35 @@
+from unittest.mock import patch
+
+import pytest
+
+from audio_summary.server.exports import export_key, render_export
+
+
+def test_render_export_converts_each_content_once(tmp_path):
+    """
+    Tests that an export is converted once per content and format, that a
+    changed summary gets a new file, and that a failed conversion leaves no
+    partial file behind.
+    """
+    calls = []
+
+    def fake_convert(text, spec, output):
+        calls.append((text, spec.pandoc_to))
+        with open(output, "w", encoding="utf8") as f:
+            f.write(f"<{spec.pandoc_to}>{text}")
+
+    with patch('audio_summary.server.exports._convert', side_effect=fake_convert):
+        first = render_export("# Minutes", "html", tmp_path / "session")
+        again = render_export("# Minutes", "html", tmp_path / "session")
+        docx = render_export("# Minutes", "docx", tmp_path / "session")
+        edited = render_export("# Minutes v2", "html", tmp_path / "session")
+
+    assert first == again and first.endswith(export_key("# Minutes", "html") + ".html")
+    assert calls == [("# Minutes", "html"), ("# Minutes", "docx"), ("# Minutes v2", "html")]
+    assert len({first, docx, edited}) == 3
+    assert open(first, encoding="utf8").read() == "<html># Minutes"
+
+    with patch('audio_summary.server.exports._convert', side_effect=OSError("no pdflatex")):
+        with pytest.raises(RuntimeError, match="PDF.*no pdflatex"):
+            render_export("# Minutes", "pdf", tmp_path / "session")
+    assert sorted(p.suffix for p in (tmp_path / "session").iterdir()) == [".docx", ".html", ".html"]
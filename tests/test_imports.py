@@ -0,0 +1,20 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+# Loaded only by the code paths that need them: the selected API, `--vad`, silence splitting, local Whisper.
+HEAVY_MODULES = ("openai", "google.generativeai", "numpy", "librosa", "faster_whisper")
+
+
+@pytest.mark.parametrize("target", ["audio_summary.app", "audio_summary.batch", "audio_summary.server.jobs"])
+def test_entry_points_do_not_import_heavy_dependencies(target):
+    """
+    Tests that importing an entry point in a fresh interpreter, as the CLI,
+    `--help` and the Streamlit script do, loads none of the heavy SDKs.
+    """
+    code = f"import sys, json; import {target}; print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert json.loads(proc.stdout) == []
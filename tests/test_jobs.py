@@ -0,0 +1,252 @@
+import asyncio
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from audio_summary.server.jobs import DONE, FAILED, QUEUED, RUNNING, JobManager, JobStore
+
+
+def _wait(manager: JobManager, job_id: str, timeout: float = 5.0):
+    deadline = time.time() + timeout
+    while (job := manager.get(job_id)).active:
+        assert time.time() < deadline, f"job still {job.status}"
+        time.sleep(0.01)
+    return job
+
+
+def test_job_store_round_trips_rows(tmp_path):
+    """
+    Tests that params and stats survive the JSON columns and unknown ids
+    return None.
+    """
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    store.create("a", {"fp": "talk.mp3", "duration": 600})
+    store.update("a", status=RUNNING, stage="transcribing", progress=0.05, stats={"ttft": 1.5})
+
+    job = store.get("a")
+    assert (job.status, job.stage, job.progress) == (RUNNING, "transcribing", 0.05)
+    assert job.params == {"fp": "talk.mp3", "duration": 600}
+    assert job.stats == {"ttft": 1.5}
+    assert store.get("missing") is None
+
+
+def test_job_manager_bounds_concurrency_and_records_results(tmp_path):
+    """
+    Tests that jobs run on at most `max_workers` threads, report progress and
+    partial summaries, store their results and clean up their uploads.
+    """
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+    uploads = []
+
+    async def fake_main(*, fp, on_progress, on_summary_token, cache, stream_summary, **kwargs):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        on_progress("transcribing", 0.05)
+        await asyncio.sleep(0.05)
+        on_progress("summarizing", 0.6)
+        for token in ("# Minutes ", fp):
+            on_summary_token(token)
+        with lock:
+            running -= 1
+        return f"transcript of {fp}", f"# Minutes {fp}"
+
+    manager = JobManager(JobStore(tmp_path / "jobs.sqlite3"), max_workers=2, runner=fake_main)
+    job_ids = []
+    for i in range(5):
+        upload = tmp_path / f"upload_{i}.mp3"
+        upload.write_bytes(b"audio")
+        uploads.append(upload)
+        job_ids.append(manager.submit({"fp": str(upload)}, cleanup=[str(upload)]))
+
+    jobs = [_wait(manager, job_id) for job_id in job_ids]
+    manager.shutdown()
+
+    assert peak == 2
+    assert [j.status for j in jobs] == [DONE] * 5
+    assert jobs[3].transcript == f"transcript of {uploads[3]}"
+    assert jobs[3].summary == f"# Minutes {uploads[3]}"
+    assert jobs[3].progress == 1.0
+    assert "elapsed" in jobs[3].stats and "ttft" in jobs[3].stats
+    assert not any(u.exists() for u in uploads)
+
+
+def test_job_manager_records_failures_including_system_exit(tmp_path):
+    """
+    Tests that a pipeline error or `sys.exit` marks the job failed instead
+    of killing the worker.
+    """
+    async def fake_main(*, fp, **kwargs):
+        if fp == "exit":
+            raise SystemExit(1)
+        raise RuntimeError("whisper down")
+
+    manager = JobManager(JobStore(tmp_path / "jobs.sqlite3"), max_workers=1, runner=fake_main)
+    failed = _wait(manager, manager.submit({"fp": "boom"}))
+    exited = _wait(manager, manager.submit({"fp": "exit"}))
+    manager.shutdown()
+
+    assert (failed.status, failed.error) == (FAILED, "whisper down")
+    assert exited.status == FAILED
+
+
+def test_jobs_survive_a_new_manager_and_interrupted_ones_fail(tmp_path):
+    """
+    Tests that finished jobs can be read by a later manager on the same table
+    (e.g. after a reconnect or restart) and that jobs left unfinished by a
+    previous process are marked failed.
+    """
+    db = tmp_path / "jobs.sqlite3"
+
+    async def fake_main(**kwargs):
+        return "t", "s"
+
+    first = JobManager(JobStore(db), max_workers=1, runner=fake_main)
+    done_id = first.submit({"fp": "a"})
+    _wait(first, done_id)
+    first.shutdown()
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    JobStore(db).create("orphan", {"fp": "b"}, owner={"pid": dead.pid, "host": socket.gethostname(), "created": time.time()})
+    assert JobStore(db).get("orphan").status == QUEUED
+
+    second = JobManager(JobStore(db), max_workers=1, runner=fake_main)
+
+    assert second.get(done_id).summary == "s"
+    assert second.get("orphan").status == FAILED
+    second.shutdown()
+
+
+def test_a_second_server_leaves_jobs_of_live_processes_alone(tmp_path):
+    """
+    Tests that a server starting on a shared job table only fails jobs whose
+    process is gone, not those another live server process is running.
+    """
+    db = tmp_path / "jobs.sqlite3"
+    other = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        store = JobStore(db)
+        store.create("theirs", {"fp": "a"}, owner={"pid": other.pid, "host": socket.gethostname(), "created": time.time()})
+        store.update("theirs", status=RUNNING)
+        store.create("remote", {"fp": "b"}, owner={"pid": 1, "host": "elsewhere", "created": time.time() - 86400})
+
+        async def fake_main(**kwargs):
+            return "t", "s"
+
+        manager = JobManager(JobStore(db), max_workers=1, runner=fake_main)
+        assert manager.get("theirs").status == RUNNING
+        assert manager.get("remote").status == QUEUED
+        manager.shutdown()
+
+        other.kill()
+        other.wait()
+        assert JobStore(db).fail_interrupted(stale_after=3600) == 2
+        assert JobStore(db).get("theirs").status == FAILED
+        assert JobStore(db).get("remote").status == FAILED
+    finally:
+        other.kill()
+        other.wait()
+
+
+def test_retry_resumes_failed_job_under_same_id(tmp_path, monkeypatch):
+    """
+    Tests that a failed job keeps its upload pinned against purge eviction,
+    and that a retry runs the pipeline again with the same job id, which
+    names its checkpoint, and unpins the upload once it succeeds.
+    """
+    from audio_summary.purger.index import PurgeIndex, get_index_path
+
+    monkeypatch.setenv("APP_FILE_DUMP", str(tmp_path))
+    monkeypatch.delenv("PURGE_INDEX_DB", raising=False)
+    pins = PurgeIndex(get_index_path(str(tmp_path)))
+    upload = tmp_path / "upload.mp3"
+    upload.write_bytes(b"audio")
+    seen = []
+
+    async def fake_main(*, fp, job_id, **kwargs):
+        seen.append(job_id)
+        if len(seen) == 1:
+            raise RuntimeError("whisper down")
+        return "t", "s"
+
+    manager = JobManager(JobStore(tmp_path / "jobs.sqlite3"), max_workers=1, runner=fake_main)
+    job_id = manager.submit({"fp": str(upload)}, cleanup=[str(upload)])
+    assert _wait(manager, job_id).status == FAILED
+    assert upload.exists()
+    assert pins.pinned() == {str(upload)}
+
+    assert manager.retry(job_id, cleanup=[str(upload)])
+    job = _wait(manager, job_id)
+    assert not manager.retry(job_id)
+    manager.shutdown()
+
+    assert (job.status, job.summary, job.error) == (DONE, "s", "")
+    assert seen == [job_id, job_id]
+    assert not upload.exists()
+    assert pins.pinned() == set()
+
+
+def test_api_keys_reach_only_their_own_job_and_are_never_stored(tmp_path, monkeypatch):
+    """
+    Tests that the keys of each submission are handed to that job's pipeline
+    only, including on retry, without touching the process environment or
+    the job table.
+    """
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-server")
+    seen = {}
+    release = threading.Event()
+
+    async def fake_main(*, fp, openai_api_key=None, **kwargs):
+        await asyncio.to_thread(release.wait, 5)
+        seen.setdefault(fp, []).append(openai_api_key)
+        if len(seen[fp]) == 1 and fp == "b":
+            raise RuntimeError("whisper down")
+        return "t", "s"
+
+    manager = JobManager(JobStore(tmp_path / "jobs.sqlite3"), max_workers=1, runner=fake_main)
+    # Both are queued behind the first before either runs, as on a busy server.
+    a = manager.submit({"fp": "a"}, api_keys={"openai_api_key": "sk-alice"})
+    b = manager.submit({"fp": "b"}, api_keys={"openai_api_key": "sk-bob"})
+    release.set()
+    _wait(manager, a)
+    assert _wait(manager, b).status == FAILED
+    assert manager.retry(b, api_keys={"openai_api_key": "sk-bob-2"})
+    _wait(manager, b)
+    manager.shutdown()
+
+    assert seen == {"a": ["sk-alice"], "b": ["sk-bob", "sk-bob-2"]}
+    assert os.environ["OPENAI_API_KEY"] == "sk-server"
+    assert "sk-" not in (tmp_path / "jobs.sqlite3").read_bytes().decode("latin-1")
+    assert manager.get(b).params == {"fp": "b"}
+
+
+def test_job_store_adds_owners_to_an_older_table(tmp_path):
+    """
+    Tests that a table created before jobs had owners gains the column and
+    that its unowned unfinished jobs are failed as interrupted.
+    """
+    db = tmp_path / "jobs.sqlite3"
+    with sqlite3.connect(db) as conn:
+        conn.execute(
+            "CREATE TABLE jobs (id TEXT PRIMARY KEY, status TEXT NOT NULL, stage TEXT NOT NULL DEFAULT '', "
+            "progress REAL NOT NULL DEFAULT 0, params TEXT NOT NULL, transcript TEXT NOT NULL DEFAULT '', "
+            "summary TEXT NOT NULL DEFAULT '', error TEXT NOT NULL DEFAULT '', stats TEXT NOT NULL DEFAULT '{}', "
+            "created REAL NOT NULL, started REAL, finished REAL)"
+        )
+        conn.execute("INSERT INTO jobs (id, status, params, created) VALUES ('old', 'running', '{}', 0)")
+    conn.close()
+
+    store = JobStore(db)
+
+    assert store.get("old").owner == {}
+    assert store.fail_interrupted() == 1
+    assert store.get("old").status == FAILED
@@ -0,0 +1,78 @@
+import sys
+import types
+from unittest.mock import MagicMock
+
+import pytest
+
+from audio_summary import local_whisper
+from audio_summary.local_whisper import LocalWhisperBackend
+
+
+@pytest.fixture
+def fake_faster_whisper(monkeypatch):
+    """Stand-in `faster_whisper` module whose model records its load count."""
+    module = types.ModuleType("faster_whisper")
+    module.loads = 0
+    module.languages = []
+
+    class WhisperModel:
+        def __init__(self, model_size, device, compute_type, cpu_threads):
+            module.loads += 1
+            self.args = (model_size, device, compute_type)
+
+        def transcribe(self, audio, language=None):
+            module.languages.append(language)
+            name = audio if isinstance(audio, str) else "bytes"
+            return iter([MagicMock(text=f" hello from {name}"), MagicMock(text=" bye")]), None
+
+    module.WhisperModel = WhisperModel
+    monkeypatch.setitem(sys.modules, "faster_whisper", module)
+    local_whisper.load_model.cache_clear()
+    yield module
+    local_whisper.load_model.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_local_backend_loads_model_once_and_reuses_it(fake_faster_whisper):
+    """
+    Tests that chunks share one loaded int8 CPU model and that both paths
+    and in-memory chunks are accepted.
+    """
+    backend = LocalWhisperBackend(model_size="tiny", use_processes=False)
+    try:
+        first = await backend.transcribe("talk_1.mp3")
+        second = await backend.transcribe(("talk_2.mp3", b"audio"))
+    finally:
+        await backend.aclose()
+
+    assert first == "hello from talk_1.mp3 bye"
+    assert second == "hello from bytes bye"
+    assert fake_faster_whisper.loads == 1
+    assert backend.model == "faster-whisper-tiny-int8"
+
+
+@pytest.mark.asyncio
+async def test_local_backends_of_one_process_share_the_model(fake_faster_whisper):
+    """
+    Tests that a second backend in the same process, e.g. of the next job,
+    reuses the loaded model and passes its language to every chunk.
+    """
+    for _ in range(2):
+        backend = LocalWhisperBackend(model_size="tiny", language="de", use_processes=False)
+        try:
+            assert await backend.transcribe("talk.wav") == "hello from talk.wav bye"
+        finally:
+            await backend.aclose()
+
+    assert fake_faster_whisper.loads == 1
+    assert fake_faster_whisper.languages == ["de", "de"]
+
+
+def test_missing_faster_whisper_has_install_hint(monkeypatch):
+    """
+    Tests that a missing optional dependency explains how to install it.
+    """
+    monkeypatch.setitem(sys.modules, "faster_whisper", None)
+    local_whisper.load_model.cache_clear()
+    with pytest.raises(ImportError, match=r"audio-summary\[local\]"):
+        local_whisper.load_model("tiny")
@@ -0,0 +1,81 @@
+import os
+import wave
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from audio_summary import probe as probe_mod
+from audio_summary.probe import probe, get_duration
+
+
+def _write_wav(path, seconds: float, rate: int = 16000, channels: int = 1):
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b"\x00\x00" * channels * int(rate * seconds))
+
+
+@pytest.fixture(autouse=True)
+def _clear_probe_cache():
+    probe_mod._probe_cached.cache_clear()
+    yield
+    probe_mod._probe_cached.cache_clear()
+
+
+def test_probe_reads_wav_header_without_ffprobe(tmp_path):
+    """
+    Tests that PCM WAV files are probed from their header alone.
+    """
+    fn = tmp_path / "talk.wav"
+    _write_wav(fn, seconds=2.5, rate=16000, channels=2)
+
+    with patch("audio_summary.probe.subprocess.run") as mock_run:
+        info = probe(fn)
+
+    mock_run.assert_not_called()
+    assert info.duration == pytest.approx(2.5)
+    assert info.codec == "pcm_s16le"
+    assert info.channels == 2
+    assert info.sample_rate == 16000
+    assert info.bit_rate == 16000 * 2 * 16
+    assert info.size == os.path.getsize(fn)
+
+
+def test_probe_parses_ffprobe_output_and_memoizes(tmp_path):
+    """
+    Tests that non-WAV files go through one ffprobe call, and that repeat
+    probes of an unchanged file are served from the cache.
+    """
+    fn = tmp_path / "talk.mp3"
+    fn.write_bytes(b"\x00" * 128)
+    stdout = (
+        '{"streams": [{"codec_type": "audio", "codec_name": "mp3", "channels": 2,'
+        ' "sample_rate": "44100", "bit_rate": "128000"}],'
+        ' "format": {"duration": "3600.5", "bit_rate": "128100"}}'
+    )
+
+    with patch("audio_summary.probe.subprocess.run", return_value=MagicMock(returncode=0, stdout=stdout)) as mock_run:
+        info = probe(fn)
+        assert get_duration(fn) == pytest.approx(3600.5)
+
+        st = os.stat(fn)
+        os.utime(fn, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        probe(fn)
+
+    assert info.codec == "mp3"
+    assert info.bit_rate == 128000
+    assert info.sample_rate == 44100
+    assert mock_run.call_count == 2
+
+
+def test_probe_raises_on_ffprobe_failure(tmp_path):
+    """
+    Tests that an unreadable file surfaces ffprobe's error.
+    """
+    fn = tmp_path / "broken.m4a"
+    fn.write_bytes(b"")
+
+    with patch("audio_summary.probe.subprocess.run", return_value=MagicMock(returncode=1, stderr="Invalid data")):
+        with pytest.raises(RuntimeError, match="Invalid data"):
+            probe(fn)
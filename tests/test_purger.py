@@ -0,0 +1,235 @@
+import os
+import time
+
+from audio_summary.purger.purger import Purger
+
+
+def _touch(path, age_days):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x")
+    mtime = time.time() - age_days * 86400
+    os.utime(path, (mtime, mtime))
+
+
+def test_purge_files_deletes_old_files_in_batches(tmp_path):
+    """
+    Tests that old files of the selected types are deleted at any depth,
+    in several batches, that newer files and directories are kept, and that
+    a dry run deletes nothing.
+    """
+    old = [tmp_path / f"a{i}.mp3" for i in range(5)] + [tmp_path / "x" / "y" / "deep.TXT"]
+    for path in old:
+        _touch(path, 10)
+    _touch(tmp_path / "new.mp3", 1)
+    _touch(tmp_path / "x" / "old.docx", 10)
+
+    dry = Purger(tmp_path, age_days=7, file_types=[".mp3", ".txt"], dry_run=True)
+    assert dry.purge_files() == 0
+    assert all(path.exists() for path in old)
+
+    purger = Purger(tmp_path, age_days=7, file_types=[".mp3", ".txt"], workers=2, batch_size=2)
+    assert purger.purge_files() == 6
+    assert not any(path.exists() for path in old)
+    assert sorted(p.name for p in tmp_path.rglob("*")) == ["new.mp3", "old.docx", "x", "y"]
+
+    assert Purger(tmp_path, age_days=7).purge_files() == 1
+
+
+def test_quota_evicts_oldest_to_low_water_after_the_age_rule(tmp_path):
+    """
+    Tests that expired files go first, then the oldest remaining files are
+    evicted until usage is under the low-water mark, and that a write past
+    the quota starts one background purge.
+    """
+    def _sized(name, age_days, size):
+        _touch(tmp_path / name, age_days)
+        (tmp_path / name).write_bytes(b"x" * size)
+        mtime = time.time() - age_days * 86400
+        os.utime(tmp_path / name, (mtime, mtime))
+
+    _sized("expired.mp3", 10, 500)
+    for i, age in enumerate((5, 4, 3, 2, 1)):
+        _sized(f"f{i}.mp3", age, 100)
+    _sized("notes.txt", 6, 100)  # counts towards usage, but only .mp3 may be purged
+
+    purger = Purger(tmp_path, age_days=7, file_types=[".mp3"], max_bytes=500, low_water=0.8)
+    assert purger.purge_files() == 3
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["f2.mp3", "f3.mp3", "f4.mp3", "notes.txt"]
+    assert purger.usage_bytes == 400
+
+    assert purger.record_write(100) is False
+    _sized("upload.mp3", 0, 300)
+    assert purger.record_write(300) is True
+    assert purger._purging.acquire(timeout=5)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["notes.txt", "upload.mp3"]
+
+
+def test_indexed_purge_queries_expired_entries_and_rescans_for_drift(tmp_path, monkeypatch):
+    """
+    Tests that after a full scan builds the index, a purge only looks at
+    registered files that expired: unregistered files wait for the next
+    full scan, vanished files are forgotten and rewritten files get a new
+    expiry.
+    """
+    from audio_summary.purger.index import register_file
+
+    dump = tmp_path / "dump"
+    monkeypatch.setenv("APP_FILE_DUMP", str(dump))
+    monkeypatch.delenv("PURGE_INDEX_DB", raising=False)
+    _touch(dump / "kept.mp3", 1)
+    purger = Purger(dump, age_days=7, index_path=str(tmp_path / "dump.index.sqlite3"))
+    assert purger.purge_files() == 0
+    assert purger.index.last_full_scan() is not None
+
+    for name in ("registered.mp3", "vanished.mp3", "rewritten.mp3"):
+        _touch(dump / name, 10)
+        assert register_file(str(dump / name))
+    assert not register_file(str(tmp_path / "outside.mp3"))
+    _touch(dump / "unregistered.mp3", 10)
+    (dump / "vanished.mp3").unlink()
+    _touch(dump / "rewritten.mp3", 0)
+
+    assert purger.purge_files() == 1
+    assert sorted(p.name for p in dump.iterdir()) == ["kept.mp3", "rewritten.mp3", "unregistered.mp3"]
+    assert sorted(os.path.basename(row[0]) for row in purger.index.oldest()) == ["kept.mp3", "rewritten.mp3"]
+
+    purger.rescan_hours = 0
+    assert purger.purge_files() == 1
+    assert sorted(p.name for p in dump.iterdir()) == ["kept.mp3", "rewritten.mp3"]
+
+
+def test_disk_pressure_frees_the_deficit_beyond_expired_files(tmp_path, monkeypatch):
+    """
+    Tests that when free space drops under the minimum, expired files go
+    first and then the oldest files until the deficit is covered, and that
+    nothing is purged while enough space is free.
+    """
+    import shutil
+    from collections import namedtuple
+
+    _touch(tmp_path / "expired.mp3", 10)
+    (tmp_path / "expired.mp3").write_bytes(b"x" * 500)
+    os.utime(tmp_path / "expired.mp3", (time.time() - 10 * 86400,) * 2)
+    for i, age in enumerate((5, 4, 3, 2, 1)):
+        _touch(tmp_path / f"f{i}.mp3", age)
+        (tmp_path / f"f{i}.mp3").write_bytes(b"x" * 100)
+        os.utime(tmp_path / f"f{i}.mp3", (time.time() - age * 86400,) * 2)
+
+    usage = namedtuple("usage", "total used free")
+    free = 300
+    monkeypatch.setattr(shutil, "disk_usage", lambda path: usage(10_000, 10_000 - free, free))
+    purger = Purger(tmp_path, age_days=7, min_free_bytes=1000, workspace_root=tmp_path / "ws")
+    assert purger.check_disk_pressure() == 3
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["f2.mp3", "f3.mp3", "f4.mp3"]
+
+    free = 1000
+    assert purger.check_disk_pressure() == 0
+    assert len(list(tmp_path.iterdir())) == 3
+
+
+def test_eviction_skips_files_pinned_by_jobs(tmp_path, monkeypatch):
+    """
+    Tests that quota eviction, with and without the index, never deletes
+    the inputs that queued, running or failed jobs pinned, and evicts them
+    like any other file once they are unpinned.
+    """
+    from audio_summary.purger.index import pin_files, register_file, unpin_files
+
+    dump = tmp_path / "dump"
+    monkeypatch.setenv("APP_FILE_DUMP", str(dump))
+    monkeypatch.delenv("PURGE_INDEX_DB", raising=False)
+    for i, age in enumerate((5, 4, 3, 2, 1)):
+        _touch(dump / f"f{i}.mp3", age)
+        (dump / f"f{i}.mp3").write_bytes(b"x" * 100)
+        os.utime(dump / f"f{i}.mp3", (time.time() - age * 86400,) * 2)
+        assert register_file(str(dump / f"f{i}.mp3"))
+    assert pin_files([str(dump / "f0.mp3"), str(dump / "f1.mp3")])
+    assert not pin_files([str(tmp_path / "outside.mp3")])
+
+    scan = Purger(dump, age_days=7, max_bytes=400, low_water=0.75)
+    assert scan.purge_files() == 2
+    assert sorted(p.name for p in dump.iterdir()) == ["f0.mp3", "f1.mp3", "f4.mp3"]
+
+    indexed = Purger(dump, age_days=7, max_bytes=150, low_water=0.5, index_path=str(tmp_path / "dump.index.sqlite3"))
+    # Mark the index as freshly scanned, so only its entries are consulted.
+    indexed.index.replace_all(list(indexed.index.oldest()), time.time())
+    assert indexed.purge_files() == 1
+    assert sorted(p.name for p in dump.iterdir()) == ["f0.mp3", "f1.mp3"]
+
+    assert unpin_files([str(dump / "f0.mp3")])
+    assert indexed.purge_files() == 1
+    assert sorted(p.name for p in dump.iterdir()) == ["f1.mp3"]
+    assert indexed.index.pinned() == {str(dump / "f1.mp3")}
+
+
+def test_scheduler_sleeps_until_due_and_stops_promptly(tmp_path, monkeypatch):
+    """
+    Tests that an interval replaces the daily schedule, that disk checks
+    run on their own interval, that monthly purges only run on the first
+    of the month, and that stopping wakes the sleeping runner at once.
+    """
+    import threading
+    from datetime import datetime
+    from audio_summary.purger import purger as module
+
+    checks = threading.Semaphore(0)
+    purger = Purger(
+        tmp_path, interval_minutes=15, min_free_bytes=1, disk_check_seconds=0.05, workspace_root=tmp_path / "ws"
+    )
+    monkeypatch.setattr(purger, "check_disk_pressure", lambda: checks.release() or 0)
+    assert module.start_scheduler(purger)
+    try:
+        assert sorted(job.unit for job in module.scheduler.jobs) == ["minutes", "seconds"]
+        assert checks.acquire(timeout=2) and checks.acquire(timeout=2)
+    finally:
+        started = time.monotonic()
+        assert module.stop_scheduler()
+    assert time.monotonic() - started < 1
+    assert not module.scheduler_thread.is_alive()
+
+    purges = []
+    monkeypatch.setattr(purger, "purge_all", lambda: purges.append(1) or 1)
+    for day, expected in ((2, 0), (1, 1)):
+        monkeypatch.setattr(module, "datetime", type("fake", (), {"now": staticmethod(lambda: datetime(2024, 5, day))}))
+        assert module._purge_on_first_of_month(purger) == expected
+    assert purges == [1]
+
+
+def test_server_launch_starts_the_in_process_scheduler(tmp_path, monkeypatch):
+    """
+    Tests that with PURGE_IN_PROCESS=true the server launcher starts the
+    purge schedule before serving, without waiting for a page visit.
+    """
+    import sys
+    import types
+
+    import pytest
+    from audio_summary.purger import purger as module
+    from audio_summary.server.__main__ import main
+
+    monkeypatch.setenv("PURGE_IN_PROCESS", "true")
+    monkeypatch.setenv("APP_FILE_DUMP", str(tmp_path / "dump"))
+    monkeypatch.setattr(module, "_shared_purger", None)
+    served = []
+
+    def fake_streamlit_main():
+        served.append((list(sys.argv), module.scheduler_thread.is_alive()))
+        return 0
+
+    cli = types.ModuleType("streamlit.web.cli")
+    cli.main = fake_streamlit_main
+    web = types.ModuleType("streamlit.web")
+    web.cli = cli
+    monkeypatch.setitem(sys.modules, "streamlit", types.ModuleType("streamlit"))
+    monkeypatch.setitem(sys.modules, "streamlit.web", web)
+    monkeypatch.setitem(sys.modules, "streamlit.web.cli", cli)
+    monkeypatch.setattr(sys, "argv", ["audio_summary"])
+    try:
+        with pytest.raises(SystemExit):
+            main()
+    finally:
+        module.stop_scheduler()
+
+    ((argv, scheduling),) = served
+    assert argv[:2] == ["streamlit", "run"] and argv[2].endswith("run.py")
+    assert scheduling
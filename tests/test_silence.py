@@ -0,0 +1,98 @@
+from unittest.mock import patch, MagicMock
+
+import numpy as np
+import pytest
+
+from audio_summary.app import split_audio
+from audio_summary.silence import find_cuts, iter_pcm
+
+RATE = 8000
+
+
+def _speech_with_pauses(seconds: float, pauses: list[tuple[float, float]], seed: int = 0) -> np.ndarray:
+    """Loud noise standing in for speech, with near-silent stretches at `pauses`."""
+    rng = np.random.default_rng(seed)
+    samples = rng.uniform(-0.3, 0.3, int(seconds * RATE)).astype(np.float32)
+    for start, end in pauses:
+        samples[int(start * RATE):int(end * RATE)] *= 0.001
+    return samples
+
+
+def _blocks(samples: np.ndarray, block: int = 3331):
+    for i in range(0, samples.size, block):
+        yield samples[i:i + block]
+
+
+def test_find_cuts_snaps_to_nearest_pause():
+    """
+    Tests that each cut moves to the pause nearest to its nominal time, and
+    that the next nominal cut counts from the actual one.
+    """
+    samples = _speech_with_pauses(32, [(7.5, 8.0), (11.5, 12.0), (19.0, 19.5)])
+
+    cuts = find_cuts(_blocks(samples), RATE, duration=10, tolerance=3)
+
+    assert len(cuts) == 2
+    assert 11.5 <= cuts[0] <= 12.0
+    # The second nominal cut is 10 s after the first one; the nearest pause starts at 19 s.
+    assert 19.0 <= cuts[1] <= 19.5
+
+
+def test_find_cuts_falls_back_to_quietest_frame_without_pause():
+    """
+    Tests that a window without any pause still yields a cut inside the
+    tolerance window, and that no cut is made for a short trailing chunk.
+    """
+    samples = _speech_with_pauses(25, [])
+
+    cuts = find_cuts(_blocks(samples), RATE, duration=10, tolerance=2)
+
+    assert len(cuts) == 2
+    assert 8 <= cuts[0] <= 12
+    assert cuts[0] + 8 <= cuts[1] <= cuts[0] + 12
+
+
+def test_find_cuts_result_does_not_depend_on_block_size():
+    """
+    Tests that the streaming pass gives the same cuts however the PCM stream
+    is chunked.
+    """
+    samples = _speech_with_pauses(60, [(9.2, 9.6), (21.0, 21.4), (29.0, 29.8), (41.0, 41.5)])
+
+    expected = find_cuts([samples], RATE, duration=10, tolerance=3)
+    for block in (160, 997, 8000, 50000):
+        assert find_cuts(_blocks(samples, block), RATE, duration=10, tolerance=3) == expected
+
+
+def test_iter_pcm_raises_on_ffmpeg_failure():
+    """
+    Tests that a failing decoder is surfaced as RuntimeError after the
+    stream ends.
+    """
+    proc = MagicMock(returncode=1)
+    proc.stdout.read.side_effect = [np.zeros(4, dtype="<i2").tobytes(), b""]
+    proc.stderr.read.return_value = b"boom"
+    proc.wait.return_value = 1
+    proc.poll.return_value = 1
+
+    with patch('audio_summary.silence.subprocess.Popen', return_value=proc):
+        with pytest.raises(RuntimeError, match="boom"):
+            list(iter_pcm("talk.mp3"))
+
+
+def test_split_audio_silence_mode_passes_cut_list_to_segmenter(tmp_path):
+    """
+    Tests that the silence mode hands the detected cuts to the segment muxer.
+    """
+    def fake_run(cmd, **kwargs):
+        assert cmd[cmd.index("-segment_times") + 1] == "598.420,1203.000"
+        assert "-segment_time" not in cmd
+        with open(cmd[cmd.index("-segment_list") + 1], "w") as f:
+            f.write("talk_1.mp3\ntalk_2.mp3\ntalk_3.mp3\n")
+        return MagicMock(returncode=0, stderr="")
+
+    with patch('audio_summary.app.detect_cuts', return_value=[598.42, 1203.0]), \
+         patch('audio_summary.app.subprocess.run', side_effect=fake_run):
+        result = split_audio("talk.mp3", duration=600, output_dir=str(tmp_path), mode="silence")
+
+    assert result == [str(tmp_path / f"talk_{i}.mp3") for i in (1, 2, 3)]
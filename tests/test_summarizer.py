@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from audio_summary import prompts
+from audio_summary.summarizer import (
+    asummarize_transcript,
+    estimate_tokens,
+    split_sections,
+)
+
+
+class StubProvider:
+    """Records every call and answers with a short summary."""
+
+    def __init__(self, latency: float = 0.0):
+        self.calls: list[str] = []
+        self.latency = latency
+        self.running = 0
+        self.peak = 0
+
+    async def __call__(self, content: str) -> str:
+        self.calls.append(content)
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(self.latency)
+        self.running -= 1
+        return f"summary #{len(self.calls)}"
+
+
+def test_split_sections_breaks_only_between_chunks():
+    """
+    Tests that sections respect the budget and keep Whisper chunks whole.
+    """
+    chunks = ["a" * 400, "b" * 400, "c" * 400, "d" * 400]  # 100 tokens each
+
+    sections = split_sections(chunks, budget_tokens=250)
+
+    assert sections == ["a" * 400 + "\n" + "b" * 400, "c" * 400 + "\n" + "d" * 400]
+
+
+def test_split_sections_cuts_an_oversized_chunk():
+    """
+    Tests that a chunk larger than the budget is cut on line boundaries.
+    """
+    chunk = "\n".join(["x" * 80] * 10)  # ~20 tokens per line
+
+    sections = split_sections([chunk], budget_tokens=50)
+
+    assert all(estimate_tokens(s) <= 50 for s in sections)
+    assert "".join(sections) == chunk
+
+
+@pytest.mark.asyncio
+async def test_auto_mode_sends_short_transcripts_in_one_call():
+    """
+    Tests that transcripts within the context budget are summarized once.
+    """
+    provider = StubProvider()
+
+    result = await asummarize_transcript(["hello", "world"], provider, content="hello\nworld\n")
+
+    assert result == "summary #1"
+    assert provider.calls == ["hello\nworld\n"]
+
+
+@pytest.mark.asyncio
+async def test_map_reduce_summarizes_sections_concurrently_then_merges():
+    """
+    Tests the map step's bounded parallelism and that the reduce step sees
+    every section summary.
+    """
+    provider = StubProvider(latency=0.01)
+    chunks = ["word " * 400 for _ in range(6)]  # ~500 tokens each
+
+    result = await asummarize_transcript(
+        chunks, provider, mode="map-reduce", section_budget_tokens=600, concurrency=2
+    )
+
+    map_calls, reduce_call = provider.calls[:-1], provider.calls[-1]
+    assert len(map_calls) == 6
+    assert all(c.startswith("This is part ") for c in map_calls)
+    assert reduce_call.startswith(prompts.MERGE_SECTION_MINUTES)
+    assert all(f"## Part {i}" in reduce_call for i in range(1, 7))
+    assert provider.peak == 2
+    assert result == "summary #7"
+
+
+@pytest.mark.asyncio
+async def test_map_reduce_reduces_hierarchically_when_summaries_overflow():
+    """
+    Tests that section summaries exceeding the context budget are merged in
+    groups before the final reduce.
+    """
+    provider = StubProvider()
+    chunks = ["word " * 400 for _ in range(8)]
+
+    await asummarize_transcript(
+        chunks, provider, mode="map-reduce", section_budget_tokens=600, context_budget_tokens=20
+    )
+
+    merges = [c for c in provider.calls if c.startswith(prompts.MERGE_SECTION_MINUTES)]
+    assert len(merges) > 1
+
+
+@pytest.mark.asyncio
+async def test_final_fn_only_produces_the_final_minutes():
+    """
+    Tests that the final-step hook (e.g. a streaming provider) is used for
+    the reduce call only.
+    """
+    provider = StubProvider()
+    final = StubProvider()
+    chunks = ["word " * 400 for _ in range(3)]
+
+    result = await asummarize_transcript(
+        chunks, provider, mode="map-reduce", section_budget_tokens=600, final_fn=final
+    )
+
+    assert len(provider.calls) == 3
+    assert len(final.calls) == 1 and final.calls[0].startswith(prompts.MERGE_SECTION_MINUTES)
+    assert result == "summary #1"
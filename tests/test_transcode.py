@@ -0,0 +1,151 @@
+import os
+import shutil
+import subprocess
+from unittest.mock import patch, AsyncMock
+
+import pytest
+
+from audio_summary.app import _atranscribe
+from audio_summary.probe import MediaInfo
+from audio_summary.cache import TranscriptCache
+from audio_summary.transcode import (
+    COPY, FLAC, OPUS_16K_MONO, WHISPER_CONTENT_LIMIT_IN_BYTES, aextract_audio, ashrink_bytes, pipe_format, plan_chunks,
+)
+from audio_summary.transcriber import WhisperDispatcher
+
+
+def _info(bit_rate, duration=3600.0, codec="mp3", size=None):
+    return MediaInfo(
+        path="talk", duration=duration, codec=codec, bit_rate=bit_rate,
+        channels=2, sample_rate=44100, size=size or int((bit_rate or 128000) * duration / 8),
+    )
+
+
+def test_plan_keeps_stream_copy_when_chunks_fit():
+    """
+    Tests that a compressed recording whose chunks fit is not transcoded.
+    """
+    plan = plan_chunks(_info(128000), 600)
+
+    assert plan.format is COPY and not plan.transcode
+    assert plan.duration == 600
+    assert plan.estimated_bytes == 128000 * 600 // 8
+
+
+def test_plan_transcodes_pcm_to_opus():
+    """
+    Tests that a CD-quality WAV is transcoded to 16 kHz mono Opus instead of
+    being uploaded as oversized chunks.
+    """
+    plan = plan_chunks(_info(1411200, codec="pcm_s16le"), 600)
+
+    assert plan.format is OPUS_16K_MONO and plan.transcode
+    assert plan.duration == 600
+    assert plan.estimated_bytes < WHISPER_CONTENT_LIMIT_IN_BYTES
+
+
+def test_plan_shortens_chunks_in_copy_mode():
+    """
+    Tests that "copy" never transcodes and shortens the chunks instead.
+    """
+    plan = plan_chunks(_info(1411200, codec="pcm_s16le"), 600, mode="copy")
+
+    assert plan.format is COPY
+    assert plan.duration < 600
+    assert plan.estimated_bytes <= WHISPER_CONTENT_LIMIT_IN_BYTES * 0.9
+
+
+def test_plan_estimates_bit_rate_from_size_when_headers_have_none():
+    """
+    Tests that the average bit rate is used when the probe reports none.
+    """
+    plan = plan_chunks(_info(None, duration=100, size=20_000_000), 600)
+
+    assert plan.transcode
+
+
+@pytest.mark.asyncio
+async def test_oversized_chunk_is_transcoded_without_prompting(tmp_path):
+    """
+    Tests that an oversized chunk is shrunk and uploaded instead of waiting
+    for input, and that the shrunk copy is removed afterwards.
+    """
+    chunk = tmp_path / "talk_1.wav"
+    with open(chunk, "wb") as f:
+        f.truncate(WHISPER_CONTENT_LIMIT_IN_BYTES + 1)
+    small = tmp_path / "talk_1.small.ogg"
+
+    async def fake_shrink(audio):
+        small.write_bytes(b"ogg")
+        return str(small)
+
+    dispatcher = WhisperDispatcher(api_key="sk-test")
+    dispatcher.transcribe = AsyncMock(return_value="hello")
+    with patch('audio_summary.app.ashrink_chunk', side_effect=fake_shrink), \
+         patch('builtins.input', side_effect=AssertionError("prompted")):
+        text = await _atranscribe(str(chunk), dispatcher)
+
+    assert text == "hello"
+    dispatcher.transcribe.assert_awaited_once_with(str(small))
+    assert not small.exists()
+    assert os.path.exists(chunk)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status", [0, 1])
+async def test_extract_audio_awaits_ffmpeg_and_checks_its_status(tmp_path, monkeypatch, status):
+    """
+    Tests that the video-to-audio extraction returns once ffmpeg exits, and
+    that a failing ffmpeg raises and leaves no partial output behind.
+    """
+    fake_ffmpeg = tmp_path / "ffmpeg"
+    fake_ffmpeg.write_text(
+        "#!/bin/sh\n"
+        "for a; do out=$a; done\n"
+        "echo audio > \"$out\"\n"
+        f"[ {status} -eq 0 ] || echo 'Invalid data found' >&2\n"
+        f"exit {status}\n"
+    )
+    fake_ffmpeg.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    output = tmp_path / "talk.mp3"
+
+    if status == 0:
+        assert await aextract_audio(str(tmp_path / "talk.mp4"), str(output)) == str(output)
+        assert output.read_text() == "audio\n"
+    else:
+        with pytest.raises(RuntimeError, match="status 1: Invalid data found"):
+            await aextract_audio(str(tmp_path / "talk.mp4"), str(output))
+        assert not output.exists()
+
+
+@pytest.mark.parametrize("fmt", [COPY, FLAC, OPUS_16K_MONO, pipe_format("opus", COPY)])
+def test_chunk_formats_are_bit_exact(fmt):
+    """
+    Tests that every chunk format asks ffmpeg for bit-exact output, so the
+    transcript cache key of a chunk does not change between runs.
+    """
+    args = list(fmt.args)
+
+    assert args[args.index("-fflags") + 1] == "+bitexact"
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+async def test_encoding_the_same_audio_twice_gives_identical_bytes(tmp_path):
+    """
+    Tests that re-encoding the same audio to Opus twice gives identical bytes
+    and therefore hits the same transcript cache entry.
+    """
+    wav = tmp_path / "tone.wav"
+    subprocess.run(
+        ["ffmpeg", "-loglevel", "error", "-f", "lavfi", "-i", "sine=frequency=440:duration=2", str(wav)],
+        check=True,
+    )
+    data = wav.read_bytes()
+
+    first = await ashrink_bytes(data)
+    second = await ashrink_bytes(data)
+
+    assert first == second
+    assert TranscriptCache.key(first, "whisper-1") == TranscriptCache.key(second, "whisper-1")
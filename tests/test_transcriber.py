@@ -0,0 +1,163 @@
+import io
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+import openai
+
+from audio_summary.transcriber import TokenBucket, WhisperDispatcher
+
+
+class FakeWhisperServer:
+    """Local OpenAI-compatible `/v1/audio/transcriptions` endpoint.
+
+    `failures` maps a chunk marker found in the upload to the number of 429s
+    to answer before succeeding.
+    """
+
+    def __init__(self, failures: dict[bytes, int] | None = None, latency: float = 0.0):
+        self.failures = dict(failures or {})
+        self.latency = latency
+        self.calls: dict[bytes, int] = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                marker = next((m for m in (b"chunk-0", b"chunk-1", b"chunk-2", b"chunk-3") if m in body), b"?")
+                with server._lock:
+                    server.calls[marker] = server.calls.get(marker, 0) + 1
+                    server.in_flight += 1
+                    server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+                    fail = server.failures.get(marker, 0) > 0
+                    if fail:
+                        server.failures[marker] -= 1
+                time.sleep(server.latency)
+                with server._lock:
+                    server.in_flight -= 1
+                if fail:
+                    payload = {"error": {"message": "Rate limit reached", "type": "requests"}}
+                    self.send_response(429)
+                else:
+                    payload = {"text": f"text of {marker.decode()}"}
+                    self.send_response(200)
+                data = json.dumps(payload).encode()
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def chunks(tmp_path):
+    paths = []
+    for i in range(4):
+        p = tmp_path / f"talk_{i+1}.mp3"
+        p.write_bytes(f"chunk-{i}".encode())
+        paths.append(str(p))
+    return paths
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_retries_only_failed_chunks(chunks):
+    """
+    Tests that a throttled chunk is retried on its own while the other
+    chunks are sent exactly once.
+    """
+    with FakeWhisperServer(failures={b"chunk-1": 2}) as server:
+        dispatcher = WhisperDispatcher(
+            api_key="test", base_url=server.base_url, backoff_base=0.01, requests_per_minute=6000
+        )
+        texts = await asyncio.gather(*(dispatcher.transcribe(c) for c in chunks))
+        await dispatcher.aclose()
+
+    assert texts == [f"text of chunk-{i}" for i in range(4)]
+    assert server.calls == {b"chunk-0": 1, b"chunk-1": 3, b"chunk-2": 1, b"chunk-3": 1}
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_rewinds_file_objects_before_a_retry():
+    """
+    Tests that a file object read to the end by a failed attempt is sent
+    whole again on the retry.
+    """
+    upload = io.BytesIO(b"chunk-1")
+    sent = []
+
+    async def flaky_send(file):
+        sent.append(file.read())
+        if len(sent) == 1:
+            raise ConnectionError("connection reset")
+        return "text of chunk-1"
+
+    dispatcher = WhisperDispatcher(api_key="test", backoff_base=0.01)
+    dispatcher._send = flaky_send
+    with patch('audio_summary.transcriber._retryable_errors', return_value=(ConnectionError,)):
+        text = await dispatcher.transcribe(upload)
+
+    assert text == "text of chunk-1"
+    assert sent == [b"chunk-1", b"chunk-1"]
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_gives_up_after_max_retries(chunks):
+    """
+    Tests that a chunk that keeps failing raises once retries are exhausted.
+    """
+    with FakeWhisperServer(failures={b"chunk-0": 10}) as server:
+        dispatcher = WhisperDispatcher(
+            api_key="test", base_url=server.base_url, backoff_base=0.01, max_retries=2, requests_per_minute=6000
+        )
+        with pytest.raises(openai.RateLimitError):
+            await dispatcher.transcribe(chunks[0])
+        await dispatcher.aclose()
+
+    assert server.calls == {b"chunk-0": 3}
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_bounds_in_flight_requests(chunks):
+    """
+    Tests that no more than `max_in_flight` requests reach the server at once.
+    """
+    with FakeWhisperServer(latency=0.05) as server:
+        dispatcher = WhisperDispatcher(
+            api_key="test", base_url=server.base_url, max_in_flight=2, requests_per_minute=6000
+        )
+        await asyncio.gather(*(dispatcher.transcribe(c) for c in chunks * 2))
+        await dispatcher.aclose()
+
+    assert server.peak_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate():
+    """
+    Tests that requests beyond the burst capacity wait for refills.
+    """
+    bucket = TokenBucket(rate=20, capacity=2)
+    t0 = time.monotonic()
+    for _ in range(6):
+        await bucket.acquire()
+    assert time.monotonic() - t0 >= (6 - 2) / 20 * 0.9
@@ -0,0 +1,180 @@
+import io
+import json
+import shutil
+import subprocess
+from unittest.mock import patch, AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+
+from audio_summary.app import main
+from audio_summary.probe import MediaInfo
+from audio_summary.vad import ENCODE_BIT_RATE, SpeechGate, TimeMap, VadResult, gate_speech, trim_silence
+
+RATE = 16000
+
+
+def _recording(parts: list[tuple[str, float]], seed: int = 0) -> np.ndarray:
+    """Concatenate loud noise ("speech") and near-silent noise ("silence") stretches."""
+    rng = np.random.default_rng(seed)
+    out = []
+    for kind, seconds in parts:
+        noise = rng.uniform(-0.3, 0.3, int(seconds * RATE)).astype(np.float32)
+        out.append(noise if kind == "speech" else noise * 0.0005)
+    return np.concatenate(out)
+
+
+def _blocks(samples: np.ndarray, block: int):
+    for i in range(0, samples.size, block):
+        yield samples[i:i + block]
+
+
+def _gate(samples: np.ndarray, block: int = 4099) -> tuple[np.ndarray, SpeechGate]:
+    gate = SpeechGate(RATE)
+    kept = np.concatenate(list(gate_speech(_blocks(samples, block), gate)))
+    return kept, gate
+
+
+def test_speech_gate_compresses_long_silence_only():
+    """
+    Tests that silences longer than `min_silence` shrink to twice the padding
+    while short pauses and speech are kept whole.
+    """
+    samples = _recording([("silence", 10), ("speech", 5), ("silence", 1), ("speech", 5), ("silence", 20), ("speech", 3)])
+
+    kept, gate = _gate(samples)
+
+    # 13 s of speech, the 1 s pause, and 2 x 0.24 s (12 frames) of padding per compressed gap.
+    assert abs(kept.size / RATE - 14.96) < 0.05
+    assert gate.in_frames * gate.frame_len == samples.size
+
+
+def test_speech_gate_output_does_not_depend_on_block_size():
+    """
+    Tests that the streaming gate keeps the same samples and spans however
+    the PCM stream is chunked.
+    """
+    samples = _recording([("speech", 3), ("silence", 4), ("speech", 2), ("silence", 2.5), ("speech", 1)], seed=1)
+
+    expected, expected_gate = _gate(samples, samples.size)
+    for block in (160, 333, 16000):
+        kept, gate = _gate(samples, block)
+        np.testing.assert_array_equal(kept, expected)
+        assert gate.spans == expected_gate.spans
+
+
+def test_time_map_refers_to_original_offsets():
+    """
+    Tests that offsets in the trimmed audio map back to the original
+    recording across dropped regions.
+    """
+    samples = _recording([("silence", 10), ("speech", 5), ("silence", 20), ("speech", 3)])
+
+    _, gate = _gate(samples)
+    time_map = gate.time_map()
+
+    # Speech starts at 10 s in the original, after 2 x 0.24 s of kept padding.
+    assert abs(time_map.to_original(0.48) - 10.0) < 0.05
+    # One second into the second utterance: 0.48 + 5 + 0.48 + 1 s of trimmed audio.
+    assert abs(time_map.to_original(6.96) - 36.0) < 0.05
+    assert TimeMap().to_original(12.5) == 12.5
+
+
+def test_trim_silence_reports_seconds_and_bytes_saved(tmp_path):
+    """
+    Tests that the gated PCM is piped to the encoder and the saved seconds
+    and bytes are reported from the dropped duration.
+    """
+    samples = _recording([("silence", 10), ("speech", 4)])
+    src = tmp_path / "talk.wav"
+    src.write_bytes(b"\0" * 200_000)
+    out = tmp_path / "talk.speech.mp3"
+    piped = io.BytesIO()
+
+    def fake_popen(cmd, **kwargs):
+        enc = MagicMock(returncode=0)
+        enc.stdin = piped
+
+        def _communicate():
+            out.write_bytes(b"\0" * (len(piped.getvalue()) // 10))
+            return b"", b""
+
+        enc.communicate.side_effect = _communicate
+        return enc
+
+    with patch('audio_summary.vad.iter_pcm', return_value=_blocks(samples, 8000)), \
+         patch('audio_summary.vad.subprocess.Popen', side_effect=fake_popen):
+        result = trim_silence(src, out)
+
+    assert len(piped.getvalue()) == 2 * round(result.kept_seconds * RATE)
+    assert abs(result.original_seconds - 14) < 0.05
+    assert abs(result.seconds_saved - 9.52) < 0.05
+    assert result.bytes_saved == int(result.seconds_saved * ENCODE_BIT_RATE / 8)
+
+    result.save(tmp_path / "talk.vad.json")
+    report = json.loads((tmp_path / "talk.vad.json").read_text())
+    assert report["time_map"]["spans"][0][1] == result.time_map.spans[0][1]
+    assert report["bytes_saved"] == result.bytes_saved
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+def test_trim_silence_savings_stay_positive_for_low_bit_rate_sources(tmp_path):
+    """
+    Tests that trimming a source encoded below the trimmed bit rate reports
+    the bytes of the dropped silence, not the growth from re-encoding.
+    """
+    src = tmp_path / "talk.mp3"
+    subprocess.run(
+        [
+            "ffmpeg", "-loglevel", "error",
+            "-f", "lavfi", "-i", "anullsrc=r=16000:cl=mono:d=10",
+            "-f", "lavfi", "-i", "anoisesrc=r=16000:a=0.3:d=4",
+            "-filter_complex", "[0:a][1:a]concat=n=2:v=0:a=1",
+            "-c:a", "libmp3lame", "-b:a", "8k", str(src),
+        ],
+        check=True,
+    )
+
+    result = trim_silence(src, tmp_path / "talk.speech.mp3")
+
+    assert result.kept_bytes > result.original_bytes
+    assert result.seconds_saved > 9
+    assert result.bytes_saved == int(result.seconds_saved * ENCODE_BIT_RATE / 8)
+
+
+@pytest.mark.asyncio
+async def test_main_with_vad_names_minutes_after_the_source(tmp_path, monkeypatch):
+    """
+    Tests that the minutes of a trimmed recording are named after the source
+    file, not the trimmed copy that was transcribed.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("APP_CHECKPOINT_DIR", str(tmp_path / "jobs"))
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    source = tmp_path / "talk.mp3"
+    source.write_bytes(b"audio")
+    transcribed = []
+
+    def fake_trim_silence(fn, output):
+        with open(output, "wb") as f:
+            f.write(b"speech")
+        return VadResult(str(output), TimeMap(), 60.0, 40.0, 5, 6)
+
+    def fake_probe(fn):
+        transcribed.append(fn)
+        return MediaInfo(path=fn, duration=40, codec="mp3", bit_rate=48000, channels=1, sample_rate=16000, size=6)
+
+    with patch('audio_summary.vad.trim_silence', side_effect=fake_trim_silence), \
+         patch('audio_summary.app.get_duration', return_value=40), \
+         patch('audio_summary.app.probe', side_effect=fake_probe), \
+         patch('audio_summary.app._atranscribe', AsyncMock(return_value="text")), \
+         patch('audio_summary.app._summarize', AsyncMock(return_value="# Minutes")):
+        await main(
+            fp=str(source), duration=60, lang_="en", output=str(tmp_path / "talk.txt"), summarize=True,
+            local_transcription=False, cache=False, summary_mode="single", vad=True,
+        )
+
+    assert transcribed[0].endswith("talk.speech.mp3")
+    minutes = [p.name for p in tmp_path.glob("meeting-minutes_*.md")]
+    assert len(minutes) == 1 and minutes[0].startswith("meeting-minutes_talk_")
+    assert json.loads((tmp_path / "talk.vad.json").read_text())["bytes_saved"] == 20 * ENCODE_BIT_RATE // 8
@@ -0,0 +1,73 @@
+import os
+import sys
+import json
+import time
+import socket
+import subprocess
+
+import pytest
+
+from audio_summary.purger.purger import Purger
+from audio_summary.workspace import OWNER_FILE, Workspace, current_workspace, in_workspace, scratch_dir, sweep_orphans
+
+
+@pytest.mark.asyncio
+async def test_in_workspace_removes_scratch_files_on_failure(tmp_path, monkeypatch):
+    """
+    Tests that scratch directories of a job land in its workspace, which is
+    removed when the job raises, and that nothing is written to the CWD.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("APP_WORKSPACE_DIR", str(tmp_path / "work"))
+    seen = {}
+
+    @in_workspace
+    async def job(*, job_id):
+        seen["chunks"] = scratch_dir("chunks")
+        seen["workspace"] = current_workspace().dir
+        open(os.path.join(seen["chunks"], "talk_1.mp3"), "wb").close()
+        raise RuntimeError("whisper down")
+
+    with pytest.raises(RuntimeError):
+        await job(job_id="job1")
+
+    assert os.path.dirname(seen["chunks"]) == seen["workspace"]
+    assert os.path.basename(seen["workspace"]).startswith("job1.")
+    assert not os.path.exists(seen["workspace"]) and current_workspace() is None
+    assert os.listdir(tmp_path) == ["work"]
+
+
+def test_sweep_and_purger_reclaim_orphaned_workspaces_as_units(tmp_path):
+    """
+    Tests that workspaces of dead processes, without a marker or of another
+    host past the age limit are removed whole, that a running job's
+    workspace is kept, and that the purger never deletes files inside it.
+    """
+    dump = tmp_path / "dump"
+    root = dump / ".work"
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+
+    def _workspace(name, owner, age=0):
+        path = root / name
+        (path / "chunks").mkdir(parents=True)
+        (path / "chunks" / "talk_1.mp3").write_bytes(b"x" * 10)
+        if owner is not None:
+            (path / OWNER_FILE).write_text(json.dumps(owner))
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+        os.utime(path / "chunks" / "talk_1.mp3", (mtime - 30 * 86400,) * 2)
+
+    _workspace("crashed", {"pid": proc.pid, "host": socket.gethostname(), "created": time.time()})
+    _workspace("unmarked", None, age=3600)
+    _workspace("remote", {"pid": 1, "host": "elsewhere", "created": time.time() - 30 * 86400})
+
+    with Workspace("live", root) as live:
+        with open(live.path("talk.mp3"), "wb") as f:
+            f.write(b"x")
+        os.utime(live.path("talk.mp3"), (time.time() - 30 * 86400,) * 2)
+
+        assert sweep_orphans(root, dry_run=True)[0] == 2
+        assert Purger(dump, age_days=7, workspace_root=root).purge_files() == 3
+        assert sorted(os.listdir(root)) == [os.path.basename(live.dir)]
+        assert os.path.exists(live.path("talk.mp3"))